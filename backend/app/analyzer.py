@@ -1,25 +1,147 @@
 # backend/app/analyzer.py
-from transformers import pipeline
+from __future__ import annotations
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
 
-# 1. 감성 분석 (한국어/영어 지원되는 멀티 모델)
-_sentiment = pipeline("sentiment-analysis", model="nlptown/bert-base-multilingual-uncased-sentiment")
+# -----------------------------
+# 설정(ENV로 오버라이드 가능)
+# -----------------------------
+SENTIMENT_MODEL = os.getenv("SENTIMENT_MODEL", "nlptown/bert-base-multilingual-uncased-sentiment")
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "t5-small")
+ANALYZE_MAX_BATCH = int(os.getenv("ANALYZE_MAX_BATCH", "16"))
+ANALYZE_MAX_WAIT_MS = float(os.getenv("ANALYZE_MAX_WAIT_MS", "20"))
+ANALYZE_ON_INGEST = os.getenv("ANALYZE_ON_INGEST", "0") in ("1", "true", "True")
+# torch(fp32) | int8(torch 동적 양자화) | onnx(optimum ORT 모델)
+ANALYZER_BACKEND = os.getenv("ANALYZER_BACKEND", "torch").lower()
 
-# 2. 요약 모델 (작은 T5 사용)
-_summarizer = pipeline("summarization", model="t5-small")
+# -----------------------------
+# 모델 지연 로드 (import 시점에 로드하지 않음)
+#  - preload()로 백그라운드 스레드에서 미리 올릴 수 있음
+# -----------------------------
+_sentiment = None
+_summarizer = None
+_load_lock = threading.Lock()
+_loaded = threading.Event()
+
+def _load() -> None:
+    global _sentiment, _summarizer
+    if _loaded.is_set():
+        return
+    with _load_lock:
+        if _loaded.is_set():
+            return
+        # 1. 감성 분석 (한국어/영어 지원되는 멀티 모델)
+        _sentiment = _pipeline("sentiment-analysis", SENTIMENT_MODEL, ANALYZER_BACKEND)
+        # 2. 요약 모델 (작은 T5 사용)
+        _summarizer = _pipeline("summarization", SUMMARY_MODEL, ANALYZER_BACKEND)
+        _loaded.set()
+        print(f"[analyzer] loaded sentiment={SENTIMENT_MODEL}, summary={SUMMARY_MODEL}, backend={ANALYZER_BACKEND}")
+
+def _pipeline(task: str, model: str, backend: str):
+    from transformers import AutoTokenizer, pipeline
+    if backend == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTModelForSequenceClassification
+            cls = ORTModelForSeq2SeqLM if task == "summarization" else ORTModelForSequenceClassification
+            ort_model = cls.from_pretrained(model, export=True)
+            return pipeline(task, model=ort_model, tokenizer=AutoTokenizer.from_pretrained(model))
+        except Exception as e:
+            print(f"[analyzer][onnx][error] {e} → torch(fp32)로 대체")
+    p = pipeline(task, model=model, device=-1 if backend == "int8" else None)
+    if backend == "int8":
+        from .embeddings import quantize_int8
+        p.model = quantize_int8(p.model)
+    return p
+
+def preload() -> threading.Thread:
+    t = threading.Thread(target=_load, daemon=True, name="analyzer-load")
+    t.start()
+    return t
+
+def is_loaded() -> bool:
+    return _loaded.is_set()
+
+# -----------------------------
+# 일괄 추론 (한 번의 forward pass)
+# -----------------------------
+def _fallback_summary(text: str) -> str:
+    return text[:150] + "..."
+
+def analyze_many(texts: List[str], batch_size: int = ANALYZE_MAX_BATCH) -> List[Tuple[str, str]]:
+    if not texts:
+        return []
+    _load()
 
-def analyze_text(text: str):
     # 감성 분석
     try:
-        sentiment_res = _sentiment(text[:512])[0]  # 긴 본문은 자르기
-        sentiment = sentiment_res["label"]
+        res = _sentiment([t[:512] for t in texts], batch_size=batch_size, truncation=True)  # 긴 본문은 자르기
+        sentiments = [r["label"] for r in res]
     except Exception:
-        sentiment = "unknown"
+        sentiments = ["unknown"] * len(texts)
 
     # 요약
     try:
-        summary_res = _summarizer(text[:1000], max_length=50, min_length=10, do_sample=False)
-        summary = summary_res[0]["summary_text"]
+        res = _summarizer(
+            [t[:1000] for t in texts],
+            max_length=50, min_length=10, do_sample=False, batch_size=batch_size, truncation=True,
+        )
+        summaries = [r["summary_text"] for r in res]
     except Exception:
-        summary = text[:150] + "..."
+        summaries = [_fallback_summary(t) for t in texts]
 
-    return sentiment, summary
+    return list(zip(sentiments, summaries))
+
+# -----------------------------
+# 동적 마이크로배칭: 동시에 들어온 analyze_text 호출을 모아 한 번에 처리
+# -----------------------------
+class _MicroBatcher:
+    def __init__(self, max_batch: int = ANALYZE_MAX_BATCH, max_wait_ms: float = ANALYZE_MAX_WAIT_MS):
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._items: List[Tuple[str, Future]] = []
+        self._cv = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, text: str) -> Future:
+        fut: Future = Future()
+        with self._cv:
+            self._items.append((text, fut))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, daemon=True, name="analyzer-batch")
+                self._thread.start()
+            self._cv.notify()
+        return fut
+
+    def _take(self) -> List[Tuple[str, Future]]:
+        with self._cv:
+            while not self._items:
+                self._cv.wait()
+            # 첫 항목 도착 후 max_wait 동안(또는 배치가 찰 때까지) 더 모음
+            deadline = time.monotonic() + self.max_wait
+            while len(self._items) < self.max_batch:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                self._cv.wait(left)
+            batch, self._items = self._items[: self.max_batch], self._items[self.max_batch:]
+            return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._take()
+            try:
+                results = analyze_many([t for t, _ in batch])
+                for (_, fut), r in zip(batch, results):
+                    fut.set_result(r)
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+
+_BATCHER = _MicroBatcher()
+
+def analyze_text(text: str):
+    return _BATCHER.submit(text).result()
@@ -0,0 +1,192 @@
+# backend/app/answer_cache.py
+from __future__ import annotations
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .embeddings import embed_query
+from . import metrics
+
+# -----------------------------
+# 설정(ENV로 오버라이드 가능)
+# -----------------------------
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE", "1") not in ("0", "false", "False")
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+ANSWER_CACHE_INVALIDATE_THRESHOLD = float(os.getenv("ANSWER_CACHE_INVALIDATE_THRESHOLD", "0.80"))
+ANSWER_CACHE_TTL_SEC = float(os.getenv("ANSWER_CACHE_TTL_SEC", "1800"))
+ANSWER_CACHE_MAX_PER_SCOPE = int(os.getenv("ANSWER_CACHE_MAX_PER_SCOPE", "512"))
+
+def _unit(v) -> np.ndarray:
+    a = np.asarray(v, dtype=np.float32)
+    n = float(np.linalg.norm(a))
+    return a / n if n > 0 else a
+
+@dataclass
+class _Scope:
+    """대화 범위 하나의 캐시: 질문 임베딩 행렬 + 병렬 리스트."""
+    vecs: Optional[np.ndarray] = None
+    entries: List[dict] = field(default_factory=list)
+
+    def drop(self, keep: np.ndarray) -> int:
+        removed = int(len(self.entries) - keep.sum())
+        if removed:
+            self.entries = [e for e, k in zip(self.entries, keep) if k]
+            self.vecs = self.vecs[keep] if self.entries else None
+        return removed
+
+class SemanticAnswerCache:
+    """질문 임베딩 코사인 유사도 기반 답변 캐시.
+
+    - (질문 임베딩, 대화 범위, 답변, 소스, 시각) 저장
+    - threshold 이상이면 hit, TTL 지난 항목은 조회 때 정리
+    - 같은 범위에 새 청크가 들어오면 비슷한 질문의 답변은 폐기
+    """
+    def __init__(
+        self,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        ttl_sec: float = ANSWER_CACHE_TTL_SEC,
+        max_per_scope: int = ANSWER_CACHE_MAX_PER_SCOPE,
+    ):
+        self.threshold = threshold
+        self.ttl_sec = ttl_sec
+        self.max_per_scope = max(1, int(max_per_scope))
+        self._scopes: Dict[str, _Scope] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(conversation_id: Optional[str]) -> str:
+        return conversation_id or ""
+
+    def _expire_locked(self, sc: _Scope, now: float) -> None:
+        if sc.entries:
+            keep = np.array([now - e["ts"] < self.ttl_sec for e in sc.entries], dtype=bool)
+            sc.drop(keep)
+
+    def lookup(self, vec, conversation_id: Optional[str]) -> Optional[dict]:
+        q = _unit(vec)
+        now = time.time()
+        with self._lock:
+            sc = self._scopes.get(self._key(conversation_id))
+            if sc is not None:
+                self._expire_locked(sc, now)
+            if sc is None or sc.vecs is None:
+                self.misses += 1
+                return None
+            sims = sc.vecs @ q
+            i = int(np.argmax(sims))
+            if float(sims[i]) < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            e = sc.entries[i]
+            return {**e, "similarity": float(sims[i])}
+
+    def store(
+        self,
+        vec,
+        conversation_id: Optional[str],
+        question: str,
+        answer: str,
+        sources: list,
+    ) -> None:
+        q = _unit(vec)
+        with self._lock:
+            sc = self._scopes.setdefault(self._key(conversation_id), _Scope())
+            sc.entries.append({"question": question, "answer": answer, "sources": sources, "ts": time.time()})
+            sc.vecs = q[None, :] if sc.vecs is None else np.vstack([sc.vecs, q])
+            if len(sc.entries) > self.max_per_scope:
+                over = len(sc.entries) - self.max_per_scope
+                sc.entries = sc.entries[over:]
+                sc.vecs = sc.vecs[over:]
+            self.stores += 1
+
+    def invalidate(self, vec, conversation_id: Optional[str],
+                   threshold: float = ANSWER_CACHE_INVALIDATE_THRESHOLD) -> int:
+        """conversation_id=None(전역 적재)이면 모든 대화 범위에서 — 대화 질의도 전역 범위를 읽음."""
+        q = _unit(vec)
+        with self._lock:
+            keys = list(self._scopes) if conversation_id is None else [self._key(conversation_id)]
+            n = 0
+            for key in keys:
+                sc = self._scopes.get(key)
+                if sc is None or sc.vecs is None:
+                    continue
+                n += sc.drop((sc.vecs @ q) < threshold)
+            self.invalidations += n
+            return n
+
+    def clear(self, conversation_id: Optional[str] = None) -> None:
+        with self._lock:
+            if conversation_id is None:
+                self._scopes.clear()
+            else:
+                self._scopes.pop(self._key(conversation_id), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = sum(len(sc.entries) for sc in self._scopes.values())
+            total = self.hits + self.misses
+            return {
+                "enabled": ANSWER_CACHE_ENABLED,
+                "scopes": len(self._scopes),
+                "size": size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "stores": self.stores,
+                "invalidations": self.invalidations,
+                "threshold": self.threshold,
+                "ttl_sec": self.ttl_sec,
+            }
+
+_CACHE = SemanticAnswerCache()
+
+# -----------------------------
+# rag에서 쓰는 얇은 헬퍼 (비활성/임베딩 실패 시 조용히 통과)
+# -----------------------------
+def question_vector(question: str) -> Optional[List[float]]:
+    if not ANSWER_CACHE_ENABLED:
+        return None
+    try:
+        return embed_query(question)
+    except Exception as e:
+        print(f"[answer-cache][embed][error] {e}")
+        return None
+
+def lookup(vec, conversation_id: Optional[str]) -> Optional[dict]:
+    if vec is None:
+        return None
+    hit = _CACHE.lookup(vec, conversation_id)
+    metrics.cache_event("answer", hit is not None)
+    if hit is not None:
+        print(f"[answer-cache] hit sim={hit['similarity']:.3f} | {hit['question']}")
+    return hit
+
+def store(vec, conversation_id: Optional[str], question: str, answer: str, sources: list) -> None:
+    if vec is not None:
+        _CACHE.store(vec, conversation_id, question, answer, sources)
+
+def invalidate_for_query(query: str, conversation_id: Optional[str]) -> int:
+    if not ANSWER_CACHE_ENABLED:
+        return 0
+    vec = question_vector(query)
+    if vec is None:
+        return 0
+    n = _CACHE.invalidate(vec, conversation_id)
+    if n:
+        print(f"[answer-cache] invalidated {n} answer(s) for ingest query={query!r}")
+    return n
+
+def clear(conversation_id: Optional[str] = None) -> None:
+    _CACHE.clear(conversation_id)
+
+def stats() -> dict:
+    return _CACHE.stats()
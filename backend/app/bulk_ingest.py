@@ -0,0 +1,426 @@
+# backend/app/bulk_ingest.py
+"""오프라인 대량 적재: URL 목록 또는 저장된 HTML/WARC → 추출 → 분할 → 대량 임베딩 → 업서트.
+
+    cd backend
+    python -m app.bulk_ingest --urls archive.jsonl                 # {"url": ..., "title": ...} 한 줄씩
+    python -m app.bulk_ingest --urls links.csv --workers 16
+    python -m app.bulk_ingest --html-dir dumps/ --conversation-id research
+    python -m app.bulk_ingest --html-dir crawl.warc.gz              # WARC는 warcio 필요
+
+- 추출(trafilatura)은 프로세스 풀, 임베딩은 메인 프로세스에서 --embed-batch 청크씩
+- 체크포인트(sqlite)에 끝난 항목을 기록 → 중단 후 같은 명령으로 재실행하면 이어서 진행
+- Chroma(0.4+)는 업서트 시점에 디스크에 쓰이므로 persist는 마지막에 한 번만
+- 원장(ingest_ledger)에도 기록해 이후 라이브 질의가 같은 기사를 다시 가져오지 않음
+- SimHash 인덱스(neardup)도 채움 → 통신사 재배포본은 한 번만 임베딩, 라이브 크롤도 같은 본문을 건너뜀
+"""
+from __future__ import annotations
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 작업 단위: (체크포인트 키, url, title, html bytes 또는 None)
+Job = Tuple[str, str, str, Optional[bytes]]
+
+# -----------------------------
+# 입력
+# -----------------------------
+def _iter_url_file(path: str) -> Iterator[Job]:
+    from .ledger import canonical_url
+    if path.endswith((".jsonl", ".json")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                row = json.loads(line)
+                url = row.get("url") or row.get("link") or ""
+                if url:
+                    yield canonical_url(url), url, row.get("title") or "", None
+    else:
+        with open(path, encoding="utf-8", newline="") as f:
+            rows = csv.reader(f)
+            header = next(rows, None) or []
+            cols = [h.strip().lower() for h in header]
+            ui = cols.index("url") if "url" in cols else 0
+            ti = cols.index("title") if "title" in cols else None
+            if "url" not in cols and header and header[0].startswith("http"):
+                yield canonical_url(header[0]), header[0], "", None  # 헤더 없는 CSV
+            for r in rows:
+                if len(r) > ui and r[ui].strip():
+                    url = r[ui].strip()
+                    title = r[ti] if ti is not None and len(r) > ti else ""
+                    yield canonical_url(url), url, title, None
+
+def _html_url(content: bytes, fallback: str) -> str:
+    import re
+    head = content[:20000].decode("utf-8", "ignore")
+    for pat in (r'<link[^>]+rel=["\']canonical["\'][^>]+href=["\']([^"\']+)',
+                r'<meta[^>]+property=["\']og:url["\'][^>]+content=["\']([^"\']+)'):
+        m = re.search(pat, head, re.I)
+        if m:
+            return m.group(1)
+    return fallback
+
+def _iter_warc(path: str) -> Iterator[Job]:
+    try:
+        from warcio.archiveiterator import ArchiveIterator
+    except ImportError:
+        raise SystemExit("WARC 입력에는 warcio가 필요합니다: pip install warcio")
+    with open(path, "rb") as f:
+        for rec in ArchiveIterator(f):
+            if rec.rec_type != "response":
+                continue
+            ctype = (rec.http_headers.get_header("Content-Type") or "") if rec.http_headers else ""
+            if "html" not in ctype:
+                continue
+            url = rec.rec_headers.get_header("WARC-Target-URI") or ""
+            yield f"{path}#{url}", url, "", rec.content_stream().read()
+
+def _iter_html_dir(root: str) -> Iterator[Job]:
+    paths = [root] if os.path.isfile(root) else [
+        os.path.join(d, fn) for d, _, fns in os.walk(root) for fn in sorted(fns)
+    ]
+    for p in paths:
+        low = p.lower()
+        if low.endswith((".warc", ".warc.gz")):
+            yield from _iter_warc(p)
+        elif low.endswith((".html", ".htm")):
+            with open(p, "rb") as f:
+                content = f.read()
+            yield p, _html_url(content, "file://" + os.path.abspath(p)), "", content
+
+# -----------------------------
+# 워커 (별도 프로세스, spawn) — 무거운 import는 여기서만
+# -----------------------------
+def _extract_job(job: Job) -> Tuple[str, str, str, str]:
+    key, url, title, content = job
+    # 언론사 셀렉터(fast) → trafilatura. 학습 표(extract_router)는 서버 프로세스 몫이라 기록하지 않음
+    from .crawler_google import NaverNewsCrawler, extract_html, extract_steps, run_extract
+    if content is None:
+        landed: List[str] = []
+
+        def _fetch(target: str, headers: dict):
+            r = NaverNewsCrawler._http_get(target, headers)
+            landed.append(r.url)
+            return r
+
+        text = run_extract(extract_steps(url, offline=True), _fetch, lambda target, source: "")
+        final_url = landed[-1] if landed else url
+    else:
+        text, final_url = extract_html(content, url)[0], url
+    if not title and content is not None:
+        import re
+        m = re.search(rb"<title[^>]*>(.*?)</title>", content[:20000], re.I | re.S)
+        if m:
+            import html
+            title = html.unescape(m.group(1).decode("utf-8", "ignore")).strip()
+    return key, final_url or url, title, text or ""
+
+# -----------------------------
+# 체크포인트
+# -----------------------------
+class Checkpoint:
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS bulk_done (
+            key TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            chunks INTEGER NOT NULL,
+            done_at REAL NOT NULL
+        )
+        """)
+        self._conn.commit()
+
+    def done_keys(self, retry_failed: bool) -> set:
+        sql = "SELECT key FROM bulk_done" + (" WHERE status = 'ok'" if retry_failed else "")
+        return {r[0] for r in self._conn.execute(sql)}
+
+    def mark(self, rows: List[Tuple[str, str, int]]) -> None:
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO bulk_done (key, status, chunks, done_at) VALUES (?, ?, ?, ?)",
+            [(k, s, n, now) for k, s, n in rows],
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+# -----------------------------
+# 적재기
+# -----------------------------
+@dataclass
+class _Pending:
+    """임베딩 대기 중인 기사 하나."""
+    key: str
+    url: str
+    title: str
+    digest: str
+    body_hash: int
+    chunks: List[str] = field(default_factory=list)     # 새로 임베딩할 청크
+    ids: List[str] = field(default_factory=list)
+    metas: List[dict] = field(default_factory=list)
+    all_ids: List[str] = field(default_factory=list)    # 원장용 (거의 같은 청크는 기존 id)
+    chunk_hashes: List[Tuple[int, str, Optional[str]]] = field(default_factory=list)
+    # 이 기사의 재배포본 (key, url, digest, title) — 원본 업서트가 성공한 뒤에 별칭/원장/체크포인트 기록
+    aliases: List[Tuple[str, str, str, str]] = field(default_factory=list)
+
+class BulkIngester:
+    def __init__(self, conversation_id: Optional[str], collection: Optional[str], embed_batch: int,
+                 query: str, ckpt: Checkpoint):
+        from . import rag
+        from .embeddings import get_embeddings
+        self.rag = rag
+        self.conversation_id = conversation_id
+        persist_dir = rag._persist_dir(conversation_id)
+        name = collection or (
+            f"{rag.COLLECTION}__{conversation_id}" if conversation_id and not rag.SHARED_VS else rag.COLLECTION
+        )
+        # 대량 적재는 flat 백엔드를 거치지 않고 바로 HNSW 컬렉션으로
+        self.vs = rag._open_chroma(persist_dir, name)
+        self.persist_dir = persist_dir
+        self.emb = get_embeddings(rag.EMBED_MODEL, batch_size=embed_batch)
+        self.embed_batch = embed_batch
+        self.query = query
+        self.ckpt = ckpt
+        self.neardup = rag.neardup.get_index()
+        self._pending: List[_Pending] = []
+        self._pending_chunks = 0
+        self.stats: Dict[str, float] = {
+            "docs": 0, "chunks": 0, "skipped": 0, "failed": 0, "unchanged": 0, "duplicates": 0,
+            "embed_sec": 0.0, "upsert_sec": 0.0,
+        }
+
+    def _dup_article(self, body_hash: int, url: str) -> Optional[str]:
+        """이미 적재됐거나 이번 배치에 대기 중인 거의 같은 기사의 URL."""
+        if self.neardup is None:
+            return None
+        dup = self.neardup.find(body_hash, self.conversation_id, kind="article")
+        if dup is not None and dup["url"] != url:
+            return dup["url"]
+        nd = self.rag.neardup
+        for p in self._pending:
+            if p.url != url and nd.hamming(body_hash, p.body_hash) <= self.neardup.max_distance:
+                return p.url
+        return None
+
+    def add(self, key: str, url: str, title: str, text: str) -> None:
+        rag = self.rag
+        if len(text) < rag.MIN_CHARS:
+            self.stats["skipped"] += 1
+            self.ckpt.mark([(key, "short", 0)])
+            return
+        from .ledger import content_hash, get_ledger
+        ledger = get_ledger()
+        digest = content_hash(text)
+        if ledger is not None:
+            prev = ledger.get(url, self.conversation_id)
+            if prev is not None and prev["content_hash"] == digest:
+                self.stats["unchanged"] += 1
+                self.ckpt.mark([(key, "ok", 0)])
+                return
+        nd = rag.neardup
+        body_hash = nd.simhash(text) if self.neardup is not None else 0
+        orig = self._dup_article(body_hash, url)
+        if orig is not None:
+            # 재배포본: 임베딩 없이 별칭 + 원장(원본 청크)만 → 라이브 크롤도 가져오기 전에 건너뜀
+            pend = next((p for p in self._pending if p.url == orig), None)
+            if pend is not None:
+                # 원본이 아직 대기 중 → 배치가 실패하면 없는 청크를 가리키게 되므로 flush에서 같이 기록
+                pend.aliases.append((key, url, digest, title))
+                return
+            self.neardup.add_alias(url, orig, self.conversation_id)
+            if ledger is not None:
+                prev = ledger.get(orig, self.conversation_id)
+                ledger.record(url, self.conversation_id, digest, prev["chunk_ids"] if prev else [], title)
+            self.stats["duplicates"] += 1
+            self.ckpt.mark([(key, "ok", 0)])
+            return
+        doc = _Pending(key, url, title, digest, body_hash)
+        for i, ch in enumerate(rag.textsplitter.split_text(text)):
+            cid = rag._make_id(url, ch, i)
+            if rag.SHARED_VS:
+                cid = rag.scoped_id(self.conversation_id, cid)
+            if self.neardup is not None:
+                h = nd.simhash(ch)
+                dup = self.neardup.find(h, self.conversation_id, kind="chunk")
+                if dup is not None and dup["ref"]:
+                    doc.all_ids.append(dup["ref"])
+                    continue
+                doc.chunk_hashes.append((h, url, cid))
+            doc.all_ids.append(cid)
+            doc.chunks.append(ch)
+            doc.ids.append(cid)
+            doc.metas.append({"source": url, "title": title, "query": self.query, "chunk": i,
+                              rag.SCOPE_KEY: rag._scope(self.conversation_id)})
+        self._pending.append(doc)
+        self._pending_chunks += len(doc.chunks)
+        if self._pending_chunks >= self.embed_batch:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        rag = self.rag
+        batch, self._pending, self._pending_chunks = self._pending, [], 0
+        # 같은 배치 안의 중복 id(같은 URL·본문이 WARC에 두 번 등)는 첫 번째만 — upsert가 거부함
+        texts, ids, metas = [], [], []
+        seen: set = set()
+        for p in batch:
+            for ch, cid, m in zip(p.chunks, p.ids, p.metas):
+                if cid in seen:
+                    continue
+                seen.add(cid)
+                texts.append(ch)
+                ids.append(cid)
+                metas.append(m)
+        try:
+            t0 = time.perf_counter()
+            vectors = self.emb.embed_documents(texts) if texts else []
+            t1 = time.perf_counter()
+            if ids:
+                self.vs._collection.upsert(ids=ids, embeddings=vectors, documents=texts, metadatas=metas)
+            t2 = time.perf_counter()
+        except Exception as e:
+            # 이 배치만 실패로 기록 (--retry-failed로 다시) — 대기열은 이미 비웠으므로 다음 배치는 정상 진행
+            print(f"[bulk][flush][error] {e} | {len(batch)} docs, {len(ids)} chunks")
+            self.stats["failed"] += len(batch) + sum(len(p.aliases) for p in batch)
+            self.ckpt.mark([(p.key, "failed", 0) for p in batch]
+                           + [(a[0], "failed", 0) for p in batch for a in p.aliases])
+            return
+        self.stats["embed_sec"] += t1 - t0
+        self.stats["upsert_sec"] += t2 - t1
+        if rag.lexical.HYBRID_ENABLED and ids:
+            rag.lexical.get_index(self.persist_dir).add(
+                ids, texts, metas, scope=rag._scope(self.conversation_id) if rag.SHARED_VS else "",
+            )
+        from .ledger import get_ledger
+        ledger = get_ledger()
+        for p in batch:
+            if ledger is not None:
+                ledger.record(p.url, self.conversation_id, p.digest, p.all_ids, p.title)
+            if self.neardup is not None:
+                self.neardup.add_many([(p.body_hash, p.url, None)], self.conversation_id, kind="article")
+                self.neardup.add_many(p.chunk_hashes, self.conversation_id, kind="chunk")
+            for (_, url, digest, title) in p.aliases:
+                if self.neardup is not None:
+                    self.neardup.add_alias(url, p.url, self.conversation_id)
+                if ledger is not None:
+                    ledger.record(url, self.conversation_id, digest, p.all_ids, title)
+        self.ckpt.mark([(p.key, "ok", len(p.chunks)) for p in batch]
+                       + [(a[0], "ok", 0) for p in batch for a in p.aliases])
+        self.stats["duplicates"] += sum(len(p.aliases) for p in batch)
+        self.stats["docs"] += len(batch)
+        self.stats["chunks"] += len(texts)
+
+    def close(self) -> None:
+        self.flush()
+        self.rag._persist(self.vs)  # 마지막에 한 번
+
+def run(args) -> dict:
+    jobs: Iterator[Job]
+    if args.urls:
+        jobs = _iter_url_file(args.urls)
+    else:
+        jobs = _iter_html_dir(args.html_dir)
+
+    ckpt = Checkpoint(args.checkpoint)
+    done = ckpt.done_keys(args.retry_failed)
+    ing = BulkIngester(args.conversation_id, args.collection, args.embed_batch, args.query, ckpt)
+
+    # 부모에 torch가 올라와 있으므로 fork 대신 spawn
+    ctx = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    last_report = start
+    resumed = 0
+    inflight: Dict[Future, str] = {}
+    max_inflight = max(1, args.workers) * 4
+
+    def _report(final: bool = False) -> None:
+        el = time.perf_counter() - start
+        st = ing.stats
+        print(f"[bulk] {'done' if final else 'progress'} {el:.0f}s docs={int(st['docs'])} "
+              f"chunks={int(st['chunks'])} skipped={int(st['skipped'])} failed={int(st['failed'])} "
+              f"| {st['docs'] / el if el else 0:.1f} docs/s, {st['chunks'] / el if el else 0:.1f} chunks/s")
+
+    def _drain(block: bool) -> None:
+        nonlocal last_report
+        if not inflight:
+            return
+        finished, _ = wait(list(inflight), timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for f in finished:
+            key = inflight.pop(f)
+            try:
+                k, url, title, text = f.result()
+                ing.add(k, url, title, text)
+            except Exception as e:
+                print(f"[bulk][error] {e} | {key}")
+                ing.stats["failed"] += 1
+                ckpt.mark([(key, "failed", 0)])
+        if time.perf_counter() - last_report >= args.report_every:
+            last_report = time.perf_counter()
+            _report()
+
+    try:
+        with ProcessPoolExecutor(max_workers=max(1, args.workers), mp_context=ctx) as ex:
+            for job in jobs:
+                if job[0] in done:
+                    resumed += 1
+                    continue
+                done.add(job[0])  # 입력 안의 중복도 한 번만
+                while len(inflight) >= max_inflight:
+                    _drain(block=True)
+                inflight[ex.submit(_extract_job, job)] = job[0]
+                _drain(block=False)
+            while inflight:
+                _drain(block=True)
+    finally:
+        ing.close()
+        ckpt.close()
+
+    el = time.perf_counter() - start
+    st = ing.stats
+    _report(final=True)
+    return {
+        **{k: (round(v, 3) if isinstance(v, float) else v) for k, v in st.items()},
+        "resumed_skipped": resumed,
+        "elapsed_sec": round(el, 2),
+        "docs_per_sec": round(st["docs"] / el, 2) if el else 0.0,
+        "chunks_per_sec": round(st["chunks"] / el, 2) if el else 0.0,
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="오프라인 대량 적재")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--urls", help="URL 목록 (.jsonl 또는 .csv)")
+    src.add_argument("--html-dir", help="저장된 .html/.htm/.warc(.gz) 파일 또는 디렉터리")
+    ap.add_argument("--conversation-id", default=None, help="적재할 대화 범위 (기본: 전역)")
+    ap.add_argument("--collection", default=None, help="컬렉션 이름 직접 지정")
+    ap.add_argument("--query", default="bulk", help="청크 메타데이터의 query 값")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    ap.add_argument("--embed-batch", type=int, default=512)
+    ap.add_argument("--checkpoint", default="bulk_ingest.ckpt.sqlite3")
+    ap.add_argument("--retry-failed", action="store_true", help="실패/짧음으로 기록된 항목도 다시 시도")
+    ap.add_argument("--report-every", type=float, default=10.0)
+    ap.add_argument("--report", default=None, help="결과 JSON 저장 경로")
+    args = ap.parse_args(argv)
+
+    report = run(args)
+    print(f"[bulk] {report}")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,153 @@
+# backend/app/context_pack.py
+from __future__ import annotations
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# -----------------------------
+# 설정(ENV로 오버라이드 가능)
+# -----------------------------
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+CONTEXT_MAX_BLOCK_TOKENS = int(os.getenv("CONTEXT_MAX_BLOCK_TOKENS", "900"))
+CONTEXT_MIN_BLOCK_TOKENS = int(os.getenv("CONTEXT_MIN_BLOCK_TOKENS", "60"))
+OVERLAP_MAX_CHARS = 240  # textsplitter chunk_overlap=120 보다 넉넉히
+OVERLAP_MIN_CHARS = 20
+_GAP = "\n…\n"
+
+# -----------------------------
+# 토큰 카운터: tiktoken(langchain-openai 의존성) → 없으면 글자 수 근사
+# -----------------------------
+_ENCODERS: Dict[str, object] = {}
+
+def _encoder(model: str):
+    enc = _ENCODERS.get(model)
+    if enc is None:
+        try:
+            import tiktoken
+            try:
+                enc = tiktoken.encoding_for_model(model)
+            except KeyError:
+                enc = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            enc = False
+        _ENCODERS[model] = enc
+    return enc or None
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    enc = _encoder(model)
+    if enc is None:
+        return max(1, len(text) // 2) if text else 0  # 한국어 기사 기준 대략 2자/토큰
+    return len(enc.encode(text))
+
+def truncate_tokens(text: str, n: int, model: str = "gpt-4o-mini") -> str:
+    if n <= 0:
+        return ""
+    enc = _encoder(model)
+    if enc is None:
+        return text[: n * 2]
+    toks = enc.encode(text)
+    if len(toks) <= n:
+        return text
+    return enc.decode(toks[:n]).rstrip("�")  # 멀티바이트 문자 중간에서 잘린 조각 제거
+
+# -----------------------------
+# 같은 기사 청크 병합 (겹침 제거)
+# -----------------------------
+def _overlap(a: str, b: str) -> int:
+    """a의 끝과 b의 시작이 겹치는 가장 긴 길이 (없으면 0)."""
+    top = min(len(a), len(b), OVERLAP_MAX_CHARS)
+    for k in range(top, OVERLAP_MIN_CHARS - 1, -1):
+        if a.endswith(b[:k]):
+            return k
+    return 0
+
+def merge_chunks(texts: List[str]) -> str:
+    merged = ""
+    for t in texts:
+        t = t.strip()
+        if not t or t in merged:
+            continue
+        if not merged:
+            merged = t
+            continue
+        k = _overlap(merged, t)
+        if k:
+            merged += t[k:]
+        else:
+            k = _overlap(t, merged)  # 검색 순서가 본문 순서와 반대인 경우
+            merged = t + merged[k:] if k else merged + _GAP + t
+    return merged
+
+@dataclass
+class ContextBlock:
+    n: int
+    source: str
+    title: str
+    text: str
+    preview: str
+    tokens: int = 0
+    chunks: int = 0
+    truncated: bool = False
+    docs: list = field(default_factory=list, repr=False)
+
+def _group(docs: list) -> List[ContextBlock]:
+    """출처별로 묶되 순서는 검색 순위에서 처음 나온 순서 → 인용 번호가 여기서 정해짐."""
+    blocks: List[ContextBlock] = []
+    by_src: Dict[str, ContextBlock] = {}
+    for d in docs:
+        src = d.metadata.get("source", "") or f"#{len(blocks)}"
+        b = by_src.get(src)
+        if b is None:
+            b = ContextBlock(
+                n=len(blocks) + 1, source=d.metadata.get("source", ""),
+                title=d.metadata.get("title", ""), text="",
+                preview=d.page_content[:220].replace("\n", " "),
+            )
+            by_src[src] = b
+            blocks.append(b)
+        b.docs.append(d)
+    for b in blocks:
+        docs_in = b.docs
+        if all(isinstance(d.metadata.get("chunk"), int) for d in docs_in):
+            docs_in = sorted(docs_in, key=lambda d: d.metadata["chunk"])  # 본문 순서
+        b.text = merge_chunks([d.page_content for d in docs_in])
+        b.chunks = len(b.docs)
+    return blocks
+
+def header(b: ContextBlock) -> str:
+    return f"[{b.n}] {b.title}\nURL: {b.source}\n"
+
+def pack(
+    docs: list,
+    budget: Optional[int] = None,
+    model: str = "gpt-4o-mini",
+    max_block: Optional[int] = None,
+) -> List[ContextBlock]:
+    """검색 결과를 출처별 블록으로 병합하고 토큰 예산에 맞춰 자른다.
+
+    - 순위가 높은 출처부터 채우고, 블록 하나는 max_block 토큰까지만
+    - 남은 예산이 CONTEXT_MIN_BLOCK_TOKENS보다 작으면 거기서 멈춤 (뒤 출처는 제외)
+    - 번호는 포함된 블록 안에서 1부터 연속 → 반환값 순서 = 인용 번호
+    """
+    budget = CONTEXT_TOKEN_BUDGET if budget is None else int(budget)
+    max_block = CONTEXT_MAX_BLOCK_TOKENS if max_block is None else int(max_block)
+    out: List[ContextBlock] = []
+    left = budget
+    for b in _group(docs):
+        head = count_tokens(header(b), model)
+        room = min(left - head, max_block)
+        if room < CONTEXT_MIN_BLOCK_TOKENS:
+            break
+        n_tok = count_tokens(b.text, model)
+        if n_tok > room:
+            b.text = truncate_tokens(b.text, room, model)
+            b.truncated = True
+            n_tok = count_tokens(b.text, model)
+        b.tokens = head + n_tok
+        b.n = len(out) + 1
+        out.append(b)
+        left -= b.tokens
+    return out
+
+def render(blocks: List[ContextBlock]) -> str:
+    return "\n\n".join(header(b) + b.text for b in blocks)
@@ -1,13 +1,19 @@
 # backend/app/crawler_google.py
 from __future__ import annotations
 
+import asyncio
 import html
+import os
 import random
 import re
+import threading
 import time
 import xml.etree.ElementTree as ET
-from typing import List, Tuple
-from urllib.parse import urlparse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Generator, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
 import requests
 from requests import Session
@@ -21,7 +27,23 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support import ui as selenium_ui
-from webdriver_manager.chrome import ChromeDriverManager
+
+try:
+    from .extract_cache import CachedArticle, get_cache
+    from .driver_pool import DRIVER_CHECKOUT_TIMEOUT, DriverPool, close_all_pools, get_pool, resolve_driver_path
+    from .extract_router import (
+        MIN_TEXT, ExtractRouter, fast_extract, get_router, is_redirector, publisher_url, rules_for,
+    )
+    from . import fetch_pool
+    from . import metrics
+except ImportError:  # app/ 에서 스크립트로 직접 실행하는 경우(test_crawl.py)
+    from extract_cache import CachedArticle, get_cache  # type: ignore[no-redef]
+    from driver_pool import DRIVER_CHECKOUT_TIMEOUT, DriverPool, close_all_pools, get_pool, resolve_driver_path  # type: ignore[no-redef]
+    from extract_router import (  # type: ignore[no-redef]
+        MIN_TEXT, ExtractRouter, fast_extract, get_router, is_redirector, publisher_url, rules_for,
+    )
+    import fetch_pool  # type: ignore[no-redef]
+    import metrics  # type: ignore[no-redef]
 
 UA = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -38,7 +60,7 @@ def _headers() -> dict:
         "Referer": "https://news.google.com/",
     }
 
-def _session() -> Session:
+def _session(pool_size: int = 10) -> Session:
     s = requests.Session()
     retries = Retry(
         total=2, connect=2, read=2, backoff_factor=0.3,
@@ -47,8 +69,8 @@ def _session() -> Session:
         raise_on_status=False,
     )
     s.headers.update(_headers())
-    s.mount("https://", HTTPAdapter(max_retries=retries))
-    s.mount("http://", HTTPAdapter(max_retries=retries))
+    s.mount("https://", HTTPAdapter(max_retries=retries, pool_connections=pool_size, pool_maxsize=pool_size))
+    s.mount("http://", HTTPAdapter(max_retries=retries, pool_connections=pool_size, pool_maxsize=pool_size))
     return s
 
 def _new_driver(headless: bool):
@@ -74,8 +96,9 @@ def _new_driver(headless: bool):
     # 리다이렉트 있는 경우에 대비해 eager (none은 너무 일찍 끊길 수 있음)
     opts.page_load_strategy = "eager"
 
+    path = resolve_driver_path()
     try:
-        drv = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=opts)
+        drv = webdriver.Chrome(service=Service(path), options=opts) if path else webdriver.Chrome(options=opts)
     except Exception:
         drv = webdriver.Chrome(options=opts)
 
@@ -91,29 +114,38 @@ def _new_driver(headless: bool):
     drv.implicitly_wait(1)
     return drv
 
+# 요청 간 공유되는 드라이버 풀(headless 여부별, 레지스트리는 driver_pool 공용)
+def driver_pool(headless: bool) -> DriverPool:
+    key = bool(headless)
+    return get_pool(
+        ("crawler", key),
+        factory=lambda: _new_driver(headless=key),
+        name="headless" if key else "headful",
+    )
+
+def close_driver_pools() -> None:
+    """crawler/fetcher_selenium 등 모든 드라이버 풀 종료."""
+    close_all_pools()
+
 # -------------------- Google News: RSS --------------------
-def _google_news_rss_links(q: str, pages: int, dbg: bool=False) -> List[Tuple[str, str]]:
-    max_items = max(1, pages) * 10
-    url = "https://news.google.com/rss/search"
-    params = {"q": q, "hl": "ko", "gl": "KR", "ceid": "KR:ko"}
-    sess = _session()
+GN_RSS_URL = os.getenv("GN_RSS_URL", "https://news.google.com/rss/search")
+
+def _gn_rss_params(q: str) -> dict:
+    return {"q": q, "hl": "ko", "gl": "KR", "ceid": "KR:ko"}
+
+def _parse_rss_items(content: bytes, max_items: int) -> List[Tuple[str, str]]:
     links: List[Tuple[str, str]] = []
-    try:
-        r = sess.get(url, params=params, timeout=10)
-        if dbg: print(f"[crawler][gn-rss][{r.status_code}] {r.url}")
-        r.raise_for_status()
-        root = ET.fromstring(r.content)
-        for item in root.findall(".//item"):
-            title = html.unescape((item.findtext("title") or "").strip())
-            link = html.unescape((item.findtext("link") or "").strip())
-            if link and title:
-                links.append((link, title))
-            if len(links) >= max_items:
-                break
-        if dbg: print(f"[crawler][gn-rss] found={len(links)}")
-    except Exception as e:
-        if dbg: print(f"[crawler][gn-rss][error] msg={e}")
-    # dedup
+    root = ET.fromstring(content)
+    for item in root.findall(".//item"):
+        title = html.unescape((item.findtext("title") or "").strip())
+        link = html.unescape((item.findtext("link") or "").strip())
+        if link and title:
+            links.append((link, title))
+        if len(links) >= max_items:
+            break
+    return links
+
+def _dedup_links(links: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
     seen = set()
     uniq: List[Tuple[str, str]] = []
     for u, t in links:
@@ -122,6 +154,38 @@ def _google_news_rss_links(q: str, pages: int, dbg: bool=False) -> List[Tuple[st
             seen.add(u)
     return uniq
 
+def _rss_fetch(
+    q: str,
+    pages: int,
+    dbg: bool = False,
+    cached: "_LinkEntry | None" = None,
+) -> tuple[List[Tuple[str, str]], dict, bool]:
+    """RSS 한 번. 만료 캐시가 검증자를 갖고 있으면 조건부 GET.
+    return: (링크, {"etag", "last_modified"}, 304 여부)"""
+    max_items = max(1, pages) * 10
+    headers: dict = {}
+    if cached is not None and cached.revalidatable:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+    links: List[Tuple[str, str]] = []
+    validators: dict = {"etag": None, "last_modified": None}
+    try:
+        _SEARCH_LIMITER.acquire()
+        r = shared_session().get(GN_RSS_URL, params=_gn_rss_params(q), timeout=10, headers=headers or None)
+        if dbg: print(f"[crawler][gn-rss][{r.status_code}] {r.url}")
+        if r.status_code == 304 and cached is not None:
+            return [], validators, True
+        r.raise_for_status()
+        metrics.BYTES_FETCHED.inc(len(r.content), source="rss")
+        validators = {"etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified")}
+        links = _parse_rss_items(r.content, max_items)
+        if dbg: print(f"[crawler][gn-rss] found={len(links)}")
+    except Exception as e:
+        if dbg: print(f"[crawler][gn-rss][error] msg={e}")
+    return _dedup_links(links), validators, False
+
 # -------------------- Google News: HTML --------------------
 _GOOGLE_LINK_PAT = re.compile(
     r'<a\s+href="(?P<href>https?://[^"]+)"[^>]*>(?:<h3[^>]*>(?P<title_h3>.*?)</h3>|<div[^>]*>(?P<title_div>.*?)</div>)',
@@ -132,125 +196,512 @@ _TAG_STRIP = re.compile(r"<[^>]+>")
 def _clean_html(t: str) -> str:
     return _TAG_STRIP.sub("", t or "").strip()
 
-def _google_news_links(q: str, days: int, pages: int, dbg: bool=False) -> List[Tuple[str, str]]:
-    links: List[Tuple[str, str]] = []
+def _google_news_page(q: str, days: int, page: int, dbg: bool=False) -> List[Tuple[str, str]]:
     base = "https://www.google.com/search"
-    sess = _session()
     if days <= 1:  tbs = "qdr:d1"
     elif days <= 7: tbs = "qdr:w1"
     else:          tbs = "qdr:m1"
-
-    for page in range(pages):
-        params = {"tbm": "nws", "q": q, "start": page * 10, "hl": "ko", "tbs": tbs}
-        try:
-            r = sess.get(base, params=params, timeout=10)
-            if dbg: print(f"[crawler][google][{r.status_code}] {r.url}")
-            r.raise_for_status()
-            found = []
-            for m in _GOOGLE_LINK_PAT.finditer(r.text):
-                href = m.group("href")
-                title = _clean_html(m.group("title_h3") or m.group("title_div") or "")
-                if href and title:
-                    found.append((href, title))
-            if dbg: print(f"[crawler][google] page={page+1} found={len(found)}")
-            links.extend(found)
-        except requests.RequestException as e:
-            if dbg:
-                body = getattr(e.response, "text", "")[:200] if getattr(e, "response", None) else ""
-                print(f"[crawler][google][error] params={params} msg={e} sample={body!r}")
-        _sleep()
-    # dedup
-    seen = set()
-    uniq: List[Tuple[str, str]] = []
-    for u, t in links:
-        if u not in seen:
-            uniq.append((u, t))
-            seen.add(u)
-    return uniq
+    params = {"tbm": "nws", "q": q, "start": page * 10, "hl": "ko", "tbs": tbs}
+    found: List[Tuple[str, str]] = []
+    try:
+        _SEARCH_LIMITER.acquire()
+        r = shared_session().get(base, params=params, timeout=10)
+        if dbg: print(f"[crawler][google][{r.status_code}] {r.url}")
+        r.raise_for_status()
+        metrics.BYTES_FETCHED.inc(len(r.content), source="search_html")
+        for m in _GOOGLE_LINK_PAT.finditer(r.text):
+            href = m.group("href")
+            title = _clean_html(m.group("title_h3") or m.group("title_div") or "")
+            if href and title:
+                found.append((href, title))
+        if dbg: print(f"[crawler][google] page={page+1} found={len(found)}")
+    except requests.RequestException as e:
+        if dbg:
+            body = getattr(e.response, "text", "")[:200] if getattr(e, "response", None) else ""
+            print(f"[crawler][google][error] params={params} msg={e} sample={body!r}")
+    return found
+
+# -------------------- 링크 탐색: 공유 세션 + TTL 캐시 + RSS/HTML 병합 --------------------
+#  - 같은 (질의, days, pages)는 TTL 동안 네트워크 없이 재사용
+#  - 만료 후엔 RSS 조건부 GET → 304면 기존 결과 연장, 실패하면 낡은 결과라도 반환
+#  - 기본(fallback)은 RSS만, RSS가 비었을 때만 HTML 페이지 → 검색 엔드포인트 호출을 늘리지 않음
+#  - LINK_SOURCES=merge면 RSS와 HTML 페이지를 동시에 받아 URL/제목 기준으로 합치고 중복 제거
+#  - 검색 엔드포인트 호출 간격은 토큰 버킷(SEARCH_RATE_PER_SEC)으로 제한
+LINK_CACHE_TTL_SEC = float(os.getenv("LINK_CACHE_TTL_SEC", "600"))
+LINK_CACHE_MAX = int(os.getenv("LINK_CACHE_MAX", "512"))
+LINK_SOURCES = os.getenv("LINK_SOURCES", "fallback").lower()   # fallback(RSS가 비었을 때만 HTML) | merge
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "4"))
+SEARCH_RATE_PER_SEC = float(os.getenv("SEARCH_RATE_PER_SEC", "2"))
+SEARCH_BURST = int(os.getenv("SEARCH_BURST", "3"))
+
+class _RateLimiter:
+    """토큰 버킷: 초당 rate개, 최대 burst개까지 한꺼번에 허용."""
+    def __init__(self, rate: float, burst: int):
+        self.rate = max(0.01, float(rate))
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._t = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._t) * self.rate)
+                self._t = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+_SEARCH_LIMITER = _RateLimiter(SEARCH_RATE_PER_SEC, SEARCH_BURST)
+_SHARED_SESSION: Optional[Session] = None
+_SEARCH_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_SEARCH_LOCK = threading.Lock()
+
+def shared_session() -> Session:
+    """검색용 공유 세션 (keep-alive 커넥션 풀 재사용)."""
+    global _SHARED_SESSION
+    with _SEARCH_LOCK:
+        if _SHARED_SESSION is None:
+            _SHARED_SESSION = _session(pool_size=max(2, SEARCH_WORKERS * 2))
+        return _SHARED_SESSION
+
+def _search_executor() -> ThreadPoolExecutor:
+    global _SEARCH_EXECUTOR
+    with _SEARCH_LOCK:
+        if _SEARCH_EXECUTOR is None:
+            _SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, SEARCH_WORKERS), thread_name_prefix="search")
+        return _SEARCH_EXECUTOR
+
+@dataclass
+class _LinkEntry:
+    links: List[Tuple[str, str]]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return (time.time() - self.fetched_at) < LINK_CACHE_TTL_SEC
+
+    @property
+    def revalidatable(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+class LinkCache:
+    """(정규화 질의, days, pages) → 검색 결과. 메모리 LRU, 만료 항목도 재검증용으로 보관."""
+    def __init__(self, max_items: int = LINK_CACHE_MAX):
+        self.max_items = max(1, int(max_items))
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[tuple, _LinkEntry]" = OrderedDict()
+
+    @staticmethod
+    def key(q: str, days: int, pages: int) -> tuple:
+        return (" ".join((q or "").lower().split()), int(days), int(pages))
+
+    def get(self, key: tuple) -> Optional[_LinkEntry]:
+        with self._lock:
+            e = self._items.get(key)
+            if e is not None:
+                self._items.move_to_end(key)
+            return e
+
+    def put(self, key: tuple, entry: _LinkEntry) -> None:
+        with self._lock:
+            self._items[key] = entry
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def touch(self, key: tuple) -> None:
+        with self._lock:
+            e = self._items.get(key)
+            if e is not None:
+                e.fetched_at = time.time()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+LINK_CACHE = LinkCache()
+
+_TRACKING_PARAMS = {"fbclid", "gclid", "ved", "usg"}
+_TITLE_SUFFIX = re.compile(r"\s+[-|–]\s+[^-|–]{1,40}$")  # "제목 - 언론사"
+_NON_WORD = re.compile(r"\W+", re.UNICODE)
+
+def _url_key(u: str) -> str:
+    p = urlparse(u)
+    query = [
+        (k, v) for k, v in parse_qsl(p.query)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    ]
+    return urlunparse(("", p.netloc.lower().removeprefix("www."), p.path.rstrip("/"), "", urlencode(query), ""))
+
+def _title_key(t: str) -> str:
+    return _NON_WORD.sub("", _TITLE_SUFFIX.sub("", t or "").lower())
+
+def _merge_links(*groups: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """소스 순서대로 합치되 같은 URL(추적 파라미터 무시) 또는 같은 제목은 한 번만.
+    RSS 링크는 news.google.com 중계 URL이라 HTML 결과와는 제목으로만 겹친다."""
+    seen_urls, seen_titles = set(), set()
+    out: List[Tuple[str, str]] = []
+    for links in groups:
+        for u, t in links:
+            uk, tk = _url_key(u), _title_key(t)
+            if uk in seen_urls or (tk and tk in seen_titles):
+                continue
+            seen_urls.add(uk)
+            if tk:
+                seen_titles.add(tk)
+            out.append((u, t))
+    return out
+
+def discover_links(q: str, days: int, pages: int, dbg: bool = False) -> List[Tuple[str, str]]:
+    key = LinkCache.key(q, days, pages)
+    entry = LINK_CACHE.get(key) if LINK_CACHE_TTL_SEC > 0 else None
+    metrics.cache_event("links", entry is not None and entry.fresh)
+    if entry is not None and entry.fresh:
+        if dbg: print(f"[crawler][links][cache] hit {len(entry.links)} | {q!r}")
+        return list(entry.links)
+
+    ex = _search_executor()
+    rss_f = ex.submit(_rss_fetch, q, pages, dbg, entry)
+    html_fs = [ex.submit(_google_news_page, q, days, p, dbg) for p in range(pages)] if LINK_SOURCES == "merge" else []
+    rss, validators, not_modified = rss_f.result()
+    if not_modified and entry is not None:
+        for f in html_fs:
+            f.cancel()
+        LINK_CACHE.touch(key)
+        if dbg: print(f"[crawler][links][304] reuse {len(entry.links)} | {q!r}")
+        return list(entry.links)
+    if not rss and not html_fs:
+        html_fs = [ex.submit(_google_news_page, q, days, p, dbg) for p in range(pages)]
+    html: List[Tuple[str, str]] = []
+    for f in html_fs:
+        html.extend(f.result())
+
+    links = _merge_links(rss, html)
+    if dbg: print(f"[crawler][links] rss={len(rss)} html={len(html)} merged={len(links)}")
+    if links:
+        if LINK_CACHE_TTL_SEC > 0:
+            LINK_CACHE.put(key, _LinkEntry(links, validators.get("etag"), validators.get("last_modified"), time.time()))
+        return links
+    if entry is not None:
+        # 검색이 통째로 실패하면 낡은 결과라도 쓰는 편이 빈손보다 낫다
+        if dbg: print(f"[crawler][links] search failed, serving stale {len(entry.links)} | {q!r}")
+        return list(entry.links)
+    return links
+
+def close_link_discovery() -> None:
+    global _SHARED_SESSION, _SEARCH_EXECUTOR
+    with _SEARCH_LOCK:
+        sess, ex = _SHARED_SESSION, _SEARCH_EXECUTOR
+        _SHARED_SESSION = _SEARCH_EXECUTOR = None
+    if ex is not None:
+        ex.shutdown(wait=False, cancel_futures=True)
+    if sess is not None:
+        sess.close()
 
 # -------------------- 본문 추출 --------------------
-def _extract_via_trafilatura(url: str, timeout: float = 12.0) -> tuple[str, str]:
-    """
-    trafilatura로 추출.
-    - news.google.com/rss/articles/... 같은 중간 링크면 -> 최종 리다이렉트 URL을 따라가 재시도
-    return: (텍스트, 최종_URL)
-    """
-    s = _session()
-    r = s.get(url, timeout=timeout, allow_redirects=True)
-    r.raise_for_status()
-    final_url = r.url  # 리다이렉트 반영된 URL
+def _trafilatura_text(content: bytes, final_url: str) -> str:
     txt = trafilatura.extract(
-        r.content,
+        content,
         include_comments=False,
         favor_recall=True,
         target_language="ko",
         no_fallback=False,
         url=final_url,
     ) or ""
-    txt = txt.strip()
-
-    # 리다이렉트 후에도 빈 경우: 최종 URL로 재요청해 다시 시도
-    if len(txt) < 120 and final_url != url:
-        r2 = s.get(final_url, timeout=timeout, allow_redirects=True)
-        r2.raise_for_status()
-        txt2 = trafilatura.extract(
-            r2.content,
-            include_comments=False,
-            favor_recall=True,
-            target_language="ko",
-            no_fallback=False,
-            url=final_url,
-        ) or ""
-        txt2 = txt2.strip()
-        if len(txt2) > len(txt):
-            txt = txt2
-
-    return txt, final_url
+    return txt.strip()
+
+def extract_html(
+    content: bytes,
+    final_url: str,
+    methods: Optional[List[str]] = None,
+    router: Optional[ExtractRouter] = None,
+) -> tuple[str, str]:
+    """받아 둔 HTML에 HTTP 계열 추출기를 순서대로 (fast → trafilatura).
+    router가 있으면 방법별 성공/소요 시간을 최종 도메인 기준으로 기록 (중간 리다이렉트 페이지는 제외).
+    return: (본문, 성공한 방법 — 전부 짧으면 가장 긴 결과의 방법)"""
+    if methods is None:
+        methods = router.http_methods(final_url) if router is not None else (
+            (["fast"] if rules_for(final_url) else []) + ["trafilatura"]
+        )
+    best, best_method = "", ""
+    for m in methods:
+        t0 = time.perf_counter()
+        sel = None
+        try:
+            if m == "fast":
+                sels = router.selectors_for(final_url) if router is not None else None
+                txt, sel = fast_extract(content, final_url, sels)
+            else:
+                txt = _trafilatura_text(content, final_url)
+        except Exception as e:
+            print(f"[extract][{m}][error] {e}")
+            txt = ""
+        ok = len(txt) >= MIN_TEXT
+        if router is not None and not is_redirector(final_url):
+            router.record(final_url, m, ok, time.perf_counter() - t0, selector=sel)
+        if m == "fast" and not ok:
+            # 셀렉터가 안 맞은 건 여기서만 집계 (trafilatura 결과는 호출 측에서 기록)
+            metrics.EXTRACT_RESULTS.inc(method="fast", outcome="short")
+        if len(txt) > len(best):
+            best, best_method = txt, m
+        if ok:
+            return txt, m
+    return best, best_method or methods[-1]
+
+# -------------------- 본문 추출 흐름 (동기/비동기 공용) --------------------
+#  캐시 → (라우터가 허락하면) HTTP + fast/trafilatura → (필요하면) Selenium 의 결정 로직을
+#  I/O 없는 제너레이터 하나로 두고, 실제 요청은 호출 측이 수행한다.
+#    ("fetch", target, headers)       → HttpResult 를 send (실패는 throw)
+#    ("selenium", target, source_url) → 본문 문자열을 send
+#  동기: run_extract(requests) / 비동기: arun_extract(httpx) — 캐시·304·라우터·지표가 한 곳
+#  offline=True: 디스크 캐시·학습 표 없이 HTTP만 (bulk_ingest 워커 프로세스 — 표는 서버 몫)
+@dataclass
+class HttpResult:
+    status: int
+    content: bytes
+    url: str                 # 리다이렉트 반영된 최종 URL
+    headers: Mapping[str, str]
+
+def _check_status(r: HttpResult) -> None:
+    if r.status >= 400:
+        raise RuntimeError(f"HTTP {r.status} | {r.url}")
+
+def extract_steps(url: str, debug: bool = False, offline: bool = False) -> Generator[tuple, Any, str]:
+    # 0) 디스크 캐시(TTL 안이면 네트워크 없이 반환)
+    cache = None if offline else get_cache()
+    cached = None
+    if cache is not None:
+        try:
+            cached = cache.get(url)
+        except Exception as e:
+            if debug:
+                print(f"[extract][cache][error] {e}")
+        fresh = cached is not None and cached.fresh
+        metrics.cache_event("extract", fresh)
+        if fresh:
+            if debug:
+                print(f"[extract][cache] hit {len(cached.text)} chars | {cached.extractor} | {cached.final_url}")
+            return cached.text
+
+    # 1) HTTP: 언론사 셀렉터(fast) → trafilatura (만료 캐시는 조건부 GET으로 재검증)
+    #    도메인 통계상 HTTP로는 항상 실패하는 곳이면 바로 Selenium
+    #    통계는 언론사(착지) 도메인 기준: Google News 링크는 id를 풀어 원문 URL로 바로 요청,
+    #    못 풀면 리다이렉트 결과로 판단 (news.google.com 자체에는 기록하지 않음)
+    router = ExtractRouter(enabled=False) if offline else get_router()
+    source_url = url
+    landing = target = (cached.final_url if cached is not None and cached.final_url else None) or publisher_url(url)
+    best = ""
+    if router.allow(landing, "http"):
+        headers: dict = {}
+        if cached is not None and cached.revalidatable:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        t0 = time.perf_counter()
+        try:
+            r = yield ("fetch", target, headers)
+            if r.status == 304 and cached is not None:
+                metrics.record("extract", time.perf_counter() - t0)
+                if cache is not None:
+                    try:
+                        cache.touch(source_url)
+                    except Exception as e:
+                        if debug:
+                            print(f"[extract][cache][error] {e}")
+                if debug:
+                    print(f"[extract][{cached.extractor}][304] {len(cached.text)} chars | {cached.final_url}")
+                metrics.EXTRACT_RESULTS.inc(method=cached.extractor or "trafilatura", outcome="ok")
+                return cached.text
+            _check_status(r)
+            metrics.BYTES_FETCHED.inc(len(r.content), source="article")
+            final_url = r.url
+            text, method = extract_html(r.content, final_url, None, router)
+            etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+
+            # 리다이렉트 후에도 빈 경우: 최종 URL로 재요청해 다시 시도
+            if len(text) < 120 and final_url != target:
+                r2 = yield ("fetch", final_url, {})
+                _check_status(r2)
+                metrics.BYTES_FETCHED.inc(len(r2.content), source="article")
+                text2, method2 = extract_html(r2.content, final_url, None, router)
+                if len(text2) > len(text):
+                    text, method = text2, method2
+                    etag, last_modified = r2.headers.get("ETag"), r2.headers.get("Last-Modified")
+
+            elapsed = time.perf_counter() - t0
+            metrics.record("extract", elapsed)
+            ok = len(text) >= MIN_TEXT
+            if not is_redirector(final_url):
+                router.record(final_url, "http", ok, elapsed)
+            if debug:
+                print(f"[extract][{method}] {len(text)} chars | {final_url}")
+            if ok:
+                if cache is not None:
+                    try:
+                        cache.put(
+                            source_url, final_url, text, extractor=method,
+                            etag=etag, last_modified=last_modified,
+                        )
+                    except Exception as e:
+                        if debug:
+                            print(f"[extract][cache][error] {e}")
+                metrics.EXTRACT_RESULTS.inc(method=method, outcome="ok")
+                return text
+            # HTTP 추출이 짧으면 Selenium 폴백으로 이어감
+            metrics.EXTRACT_RESULTS.inc(method="trafilatura", outcome="short")
+            best = text
+            target = final_url
+        except Exception as e:
+            if not is_redirector(landing):
+                router.record(landing, "http", False, time.perf_counter() - t0)
+            metrics.EXTRACT_RESULTS.inc(method="trafilatura", outcome="error")
+            if debug:
+                print(f"[extract][trafilatura][error] {e}")
+    elif debug:
+        print(f"[extract][router] skip http (always fails) | {landing}")
+
+    # 2) Selenium 폴백
+    if offline:
+        return best
+    if fetch_pool.stopped():
+        # 요청이 이미 끝남(마감/포기) → 드라이버를 빌리지 않음
+        if debug:
+            print(f"[extract][selenium] skip (request finished) | {target}")
+        return best
+    if not router.allow(target, "selenium"):
+        if debug:
+            print(f"[extract][router] skip selenium (always fails) | {target}")
+        return best
+    text = yield ("selenium", target, source_url)
+    return text or ""
+
+def _advance(steps: Generator[tuple, Any, str], how: str, arg: Any = None) -> tuple:
+    """제너레이터 한 걸음. 끝나면 ("done", 본문) — StopIteration을 스레드/Future 밖으로 내보내지 않음."""
+    try:
+        if how == "start":
+            return next(steps)
+        if how == "throw":
+            return steps.throw(arg)
+        return steps.send(arg)
+    except StopIteration as stop:
+        return ("done", stop.value or "")
+
+def run_extract(
+    steps: Generator[tuple, Any, str],
+    fetch: Callable[[str, dict], HttpResult],
+    selenium: Callable[[str, str], str],
+) -> str:
+    op = _advance(steps, "start")
+    while op[0] != "done":
+        try:
+            res = fetch(op[1], op[2]) if op[0] == "fetch" else selenium(op[1], op[2])
+        except Exception as e:
+            if op[0] != "fetch":
+                steps.close()
+                raise
+            op = _advance(steps, "throw", e)
+            continue
+        op = _advance(steps, "send", res)
+    return op[1]
+
+async def arun_extract(
+    steps: Generator[tuple, Any, str],
+    fetch: Callable[[str, dict], Awaitable[HttpResult]],
+    selenium: Callable[[str, str], str],
+) -> str:
+    """비동기 버전: HTTP는 await, 캐시/파싱(제너레이터 본체)과 Selenium은 스레드에서."""
+    try:
+        op = await asyncio.to_thread(_advance, steps, "start")
+        while op[0] != "done":
+            try:
+                if op[0] == "fetch":
+                    res = await fetch(op[1], op[2])
+                else:
+                    res = await asyncio.to_thread(selenium, op[1], op[2])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if op[0] != "fetch":
+                    raise
+                op = await asyncio.to_thread(_advance, steps, "throw", e)
+                continue
+            op = await asyncio.to_thread(_advance, steps, "send", res)
+        return op[1]
+    finally:
+        try:
+            steps.close()
+        except ValueError:
+            pass  # 취소 시점에 스레드가 아직 제너레이터를 돌리는 중 → 그쪽에서 끝남
 
 class NaverNewsCrawler:
-    """검색: Google News RSS → (실패시) Google News HTML
+    """검색: Google News RSS + HTML 동시 조회 후 병합 (TTL 캐시, discover_links)
        본문: trafilatura(HTTP) 우선 → 실패 시 Selenium 폴백(+리다이렉트 완료 대기)
     """
     def __init__(self, headless: bool = True, max_pages: int = 3, debug: bool = False):
         self.max_pages = max_pages
         self.debug = debug
         self.headless = headless
-        self.driver = None
 
     def search_links(self, q: str, days: int = 3, max_pages: int | None = None) -> List[Tuple[str, str]]:
+        with metrics.span("search"):
+            return self._search_links(q, days, max_pages)
+
+    def _search_links(self, q: str, days: int, max_pages: int | None) -> List[Tuple[str, str]]:
         pages = max_pages or self.max_pages
-        rss = _google_news_rss_links(q, pages, dbg=self.debug)
-        if self.debug: print(f"[crawler][gn-rss] total={len(rss)}")
-        if rss: return rss
-        google_links = _google_news_links(q, days, pages, dbg=self.debug)
-        if self.debug: print(f"[crawler][google-news] total={len(google_links)}")
-        return google_links
+        return discover_links(q, days, pages, dbg=self.debug)
 
     def extract_article_text(self, url: str) -> str:
-        # 1) trafilatura 먼저
-        try:
-            text, final_url = _extract_via_trafilatura(url)
-            if self.debug:
-                print(f"[extract][trafilatura] {len(text)} chars | {final_url}")
-            if len(text) >= 160:
-                return text
-            # trafilatura가 짧으면 Selenium 폴백으로 이어감
-            url = final_url
-        except Exception as e:
-            if self.debug:
-                print(f"[extract][trafilatura][error] {e}")
+        return run_extract(extract_steps(url, self.debug), self._http_get, self.extract_via_selenium)
 
-        # 2) Selenium 폴백
-        if self.driver is None:
-            self.driver = _new_driver(headless=self.headless)
+    @staticmethod
+    def _http_get(target: str, headers: dict) -> HttpResult:
+        r = shared_session().get(target, timeout=12.0, allow_redirects=True, headers=headers or None)
+        return HttpResult(r.status_code, r.content, r.url, r.headers)
 
-        self.driver.get(url)
+    def extract_via_selenium(self, url: str, source_url: str | None = None) -> str:
+        """공유 풀에서 드라이버를 빌려 추출, 성공하면 캐시에 기록."""
+        router = get_router()
+        t0 = time.perf_counter()
+        try:
+            wait_sec = fetch_pool.remaining(DRIVER_CHECKOUT_TIMEOUT)
+            with metrics.span("selenium"), driver_pool(self.headless).checkout(timeout=wait_sec) as drv:
+                text, sel, landed = self._extract_via_selenium(drv, url, router)
+        except Exception:
+            if not is_redirector(url):
+                router.record(url, "selenium", False, time.perf_counter() - t0)
+            metrics.EXTRACT_RESULTS.inc(method="selenium", outcome="error")
+            raise
+        # 통계는 실제로 도착한 언론사 도메인에 (리다이렉트가 안 끝났으면 기록하지 않음)
+        if not is_redirector(landed):
+            router.record(landed, "selenium", len(text) > 160, time.perf_counter() - t0, selector=sel)
+        metrics.EXTRACT_RESULTS.inc(method="selenium", outcome="ok" if len(text) > 160 else "short")
+        cache = get_cache()
+        if cache is not None and len(text) > 160:
+            try:
+                cache.put(source_url or url, landed, text, extractor="selenium")
+            except Exception as e:
+                if self.debug:
+                    print(f"[extract][cache][error] {e}")
+        return text
+
+    def _extract_via_selenium(
+        self, driver, url: str, router: Optional[ExtractRouter] = None,
+    ) -> tuple[str, Optional[str], str]:
+        """return: (본문, 맞은 셀렉터, 도착한 URL)"""
+        driver.get(url)
 
         # news.google.com 중간 URL이면 리다이렉트 완료까지 잠깐 대기
         try:
             host = urlparse(url).netloc
             if "news.google.com" in host:
-                selenium_ui.WebDriverWait(self.driver, timeout=3.0).until(
+                selenium_ui.WebDriverWait(driver, timeout=3.0).until(
                     lambda d: "news.google.com" not in urlparse(d.current_url).netloc
                 )
         except Exception:
@@ -259,46 +710,50 @@ class NaverNewsCrawler:
         # 너무 무겁게 로드되기 전에 중단
         _sleep(0.6, 1.2)
         try:
-            self.driver.execute_script("window.stop();")
+            driver.execute_script("window.stop();")
         except Exception:
             pass
 
         try:
-            selenium_ui.WebDriverWait(self.driver, timeout=2.0).until(
+            selenium_ui.WebDriverWait(driver, timeout=2.0).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
         except Exception:
             pass
 
-        selector_candidates = [
+        # 최종 도메인의 언론사/학습된 셀렉터를 먼저, 그다음 공통 후보
+        try:
+            landed = driver.current_url or url
+        except Exception:
+            landed = url
+        known = router.selectors_for(landed) if router is not None else rules_for(landed)
+        selector_candidates = list(dict.fromkeys(known + [
             "#dic_area", "article", "div#newsct",
             "div.article_body", "div.news_body",
             "div#articeBody", "div#articleBody",
             "div#news_body_area", "div#contentArea",
-        ]
+        ]))
         for sel in selector_candidates:
             try:
-                text = self.driver.find_element(By.CSS_SELECTOR, sel).text.strip()
+                text = driver.find_element(By.CSS_SELECTOR, sel).text.strip()
                 if len(text) > 160:
                     if self.debug:
                         print(f"[extract][selenium] {len(text)} chars | sel={sel}")
-                    return text
+                    # 셀렉터는 호출 측 record가 도착 도메인에 기억 (다음엔 fast/selenium 모두 먼저 시도)
+                    return text, sel, landed
             except Exception:
                 continue
         try:
-            text = self.driver.find_element(By.TAG_NAME, "body").text.strip()
+            text = driver.find_element(By.TAG_NAME, "body").text.strip()
             if self.debug:
                 print(f"[extract][selenium][body] {len(text)} chars")
-            return text
+            return text, None, landed
         except Exception:
-            return ""
+            return "", None, landed
 
     def close(self) -> None:
-        if self.driver:
-            try:
-                self.driver.quit()
-            except Exception:
-                pass
+        # 드라이버는 풀 소유 → 여기서 quit하지 않음 (종료 시 close_driver_pools)
+        pass
 
     def __enter__(self):  # type: ignore[override]
         return self
@@ -1,13 +1,36 @@
 # backend/app/db.py
 import sqlite3
 import os
+import queue
+import threading
+from concurrent.futures import Future
 from datetime import datetime
+from typing import List, Optional, Tuple
 
-DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "finnews.db"))
+DB_PATH = os.path.abspath(
+    os.getenv("FINNEWS_DB", os.path.join(os.path.dirname(__file__), "..", "finnews.db"))
+)
+DB_BATCH_MAX = int(os.getenv("DB_BATCH_MAX", "256"))
+DB_FLUSH_MS = float(os.getenv("DB_FLUSH_MS", "50"))
+DB_QUEUE_MAX = int(os.getenv("DB_QUEUE_MAX", "10000"))
+
+# -----------------------------
+# 스레드별 장수명 연결 (WAL, fsync는 체크포인트 때만)
+# -----------------------------
+_local = threading.local()
+
+def _conn() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.conn = conn
+    return conn
 
 def init_db():
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+    conn = _conn()
     cur = conn.cursor()
     cur.execute("""
     CREATE TABLE IF NOT EXISTS history (
@@ -25,36 +48,152 @@ def init_db():
         created_at TEXT NOT NULL
     )
     """)
+    # 대화별 목록: conversation_id 컬럼(이전 DB는 보강) + (conversation_id, id) 인덱스
+    for table in ("history", "bookmark"):
+        cols = {r[1] for r in cur.execute(f"PRAGMA table_info({table})")}
+        if "conversation_id" not in cols:
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN conversation_id TEXT NOT NULL DEFAULT ''")
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_conv_id ON {table}(conversation_id, id)")
     conn.commit()
-    conn.close()
 
-def save_history(question: str, answer: str):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO history (question, answer, created_at) VALUES (?, ?, ?)",
-        (question, answer, datetime.utcnow().isoformat())
-    )
-    conn.commit()
-    conn.close()
+# -----------------------------
+# write-behind: INSERT를 큐에 쌓고 백그라운드 스레드가 한 트랜잭션으로 묶어 커밋
+# -----------------------------
+_Item = Tuple[str, tuple, Optional[Future]]
 
-def get_history(limit: int = 10):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT id, question, answer, created_at FROM history ORDER BY id DESC LIMIT ?",
-        (limit,),
+class _Writer:
+    def __init__(self, batch_max: int = DB_BATCH_MAX, flush_ms: float = DB_FLUSH_MS,
+                 queue_max: int = DB_QUEUE_MAX):
+        self.batch_max = max(1, int(batch_max))
+        self.flush_sec = max(0.0, float(flush_ms)) / 1000.0
+        self._q: "queue.Queue[Optional[_Item]]" = queue.Queue(maxsize=max(1, int(queue_max)))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def _ensure(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, daemon=True, name="db-writer")
+                self._thread.start()
+
+    def submit(self, sql: str, params: tuple, fut: Optional[Future] = None) -> None:
+        self._ensure()
+        try:
+            # 응답 경로(async 핸들러)에서 불리므로 기다리지 않음 → 가득 차면 바로 버림
+            self._q.put_nowait((sql, params, fut))
+        except queue.Full:
+            self.dropped += 1
+            print(f"[db] write queue full → dropped ({self.dropped})")
+            if fut is not None:
+                fut.set_exception(RuntimeError("db write queue full"))
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """지금까지 넣은 쓰기가 커밋될 때까지 대기 (읽기 직전 read-your-writes 용)."""
+        if self._thread is None:
+            return True
+        fut: Future = Future()
+        self.submit("", (), fut)
+        try:
+            fut.result(timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self._q.put(None)
+            self._thread.join(timeout)
+
+    def _take(self) -> Tuple[List[_Item], bool]:
+        first = self._q.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        stop = False
+        deadline = self.flush_sec
+        while len(batch) < self.batch_max:
+            try:
+                item = self._q.get(timeout=deadline) if deadline > 0 else self._q.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+            deadline = 0  # 첫 대기 이후엔 이미 쌓인 것만 더 가져감
+        return batch, stop
+
+    def _loop(self) -> None:
+        init_db()
+        conn = _conn()
+        while True:
+            batch, stop = self._take()
+            if batch:
+                results: List[Optional[int]] = []
+                try:
+                    with conn:  # 배치 전체를 한 트랜잭션(커밋 1회)
+                        for sql, params, _ in batch:
+                            results.append(conn.execute(sql, params).lastrowid if sql else None)
+                    for (_, _, fut), rid in zip(batch, results):
+                        if fut is not None:
+                            fut.set_result(rid)
+                except Exception as e:
+                    print(f"[db][writer][error] {e}")
+                    for _, _, fut in batch:
+                        if fut is not None and not fut.done():
+                            fut.set_exception(e)
+            if stop:
+                return
+
+_WRITER = _Writer()
+
+def close_db() -> None:
+    """남은 쓰기를 커밋하고 writer 종료 (서버 종료 시)."""
+    _WRITER.close()
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+def save_history(question: str, answer: str, conversation_id: Optional[str] = None):
+    """응답 경로를 막지 않도록 큐에만 넣고 반환."""
+    _WRITER.submit(
+        "INSERT INTO history (question, answer, created_at, conversation_id) VALUES (?, ?, ?, ?)",
+        (question, answer, _now(), conversation_id or ""),
     )
-    rows = cur.fetchall()
-    conn.close()
-    return rows
 
-def add_bookmark(question: str, answer: str):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO bookmark (question, answer, created_at) VALUES (?, ?, ?)",
-        (question, answer, datetime.utcnow().isoformat())
+def add_bookmark(question: str, answer: str, conversation_id: Optional[str] = None,
+                 wait: bool = True) -> Optional[int]:
+    """북마크도 같은 writer를 거침. wait=True면 커밋 후 새 id 반환."""
+    fut: Optional[Future] = Future() if wait else None
+    _WRITER.submit(
+        "INSERT INTO bookmark (question, answer, created_at, conversation_id) VALUES (?, ?, ?, ?)",
+        (question, answer, _now(), conversation_id or ""),
+        fut,
     )
-    conn.commit()
-    conn.close()
+    return fut.result(timeout=5.0) if fut is not None else None
+
+# -----------------------------
+# 목록: keyset 페이지네이션 (id < before ORDER BY id DESC)
+# -----------------------------
+def _page(table: str, conversation_id: Optional[str], limit: int, before: Optional[int]):
+    _WRITER.flush()
+    sql = f"SELECT id, question, answer, created_at, conversation_id FROM {table}"
+    where, args = [], []
+    if conversation_id is not None:
+        where.append("conversation_id = ?")
+        args.append(conversation_id)
+    if before is not None:
+        where.append("id < ?")
+        args.append(int(before))
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY id DESC LIMIT ?"
+    args.append(int(limit))
+    return _conn().execute(sql, args).fetchall()
+
+def get_history(limit: int = 10, conversation_id: Optional[str] = None, before: Optional[int] = None):
+    return _page("history", conversation_id, limit, before)
+
+def get_bookmarks(limit: int = 10, conversation_id: Optional[str] = None, before: Optional[int] = None):
+    return _page("bookmark", conversation_id, limit, before)
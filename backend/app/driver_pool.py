@@ -0,0 +1,167 @@
+# backend/app/driver_pool.py
+from __future__ import annotations
+import contextlib
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+# -----------------------------
+# 설정(ENV로 오버라이드 가능)
+# -----------------------------
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "2"))
+DRIVER_MAX_PAGES = int(os.getenv("DRIVER_MAX_PAGES", "50"))
+DRIVER_CHECKOUT_TIMEOUT = float(os.getenv("DRIVER_CHECKOUT_TIMEOUT", "20"))
+
+# -----------------------------
+# chromedriver 바이너리 경로(프로세스당 1회 해석)
+# -----------------------------
+_DRIVER_PATH: Optional[str] = None
+_DRIVER_PATH_RESOLVED = False
+_PATH_LOCK = threading.Lock()
+
+def resolve_driver_path() -> Optional[str]:
+    """ChromeDriverManager().install()은 네트워크/디스크를 건드리므로 1회만.
+    실패하면 None → selenium-manager(PATH) 기본 동작에 맡긴다.
+    """
+    global _DRIVER_PATH, _DRIVER_PATH_RESOLVED
+    if _DRIVER_PATH_RESOLVED:
+        return _DRIVER_PATH
+    with _PATH_LOCK:
+        if not _DRIVER_PATH_RESOLVED:
+            path = os.getenv("CHROMEDRIVER_PATH") or None
+            if path is None:
+                try:
+                    from webdriver_manager.chrome import ChromeDriverManager
+                    path = ChromeDriverManager().install()
+                except Exception as e:
+                    print(f"[driver-pool][resolve][error] {e}")
+            _DRIVER_PATH = path
+            _DRIVER_PATH_RESOLVED = True
+            print(f"[driver-pool] chromedriver={_DRIVER_PATH or '(selenium default)'}")
+    return _DRIVER_PATH
+
+# -----------------------------
+# WebDriver 풀
+# -----------------------------
+class _Slot:
+    __slots__ = ("driver", "pages")
+
+    def __init__(self, driver: Any):
+        self.driver = driver
+        self.pages = 0
+
+def _quit(driver: Any) -> None:
+    with contextlib.suppress(Exception):
+        driver.quit()
+
+def _healthy(driver: Any) -> bool:
+    try:
+        driver.execute_script("return 1")
+        return True
+    except Exception:
+        return False
+
+class DriverPool:
+    """요청 간 공유되는 제한된 크기의 WebDriver 풀.
+
+    - checkout()으로 빌려 쓰고 with 블록이 끝나면 반납
+    - 빌려줄 때 헬스체크, 실패한 드라이버는 폐기 후 새로 생성
+    - max_pages 페이지를 처리했거나 블록에서 예외가 나면 재활용(quit)
+    """
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        size: int = DRIVER_POOL_SIZE,
+        max_pages: int = DRIVER_MAX_PAGES,
+        name: str = "default",
+    ):
+        self.factory = factory
+        self.size = max(1, int(size))
+        self.max_pages = max(1, int(max_pages))
+        self.name = name
+        self._sem = threading.BoundedSemaphore(self.size)
+        self._idle: List[_Slot] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.created = 0
+        self.recycled = 0
+
+    @contextlib.contextmanager
+    def checkout(self, timeout: float = DRIVER_CHECKOUT_TIMEOUT) -> Iterator[Any]:
+        if not self._sem.acquire(timeout=timeout):
+            raise TimeoutError(f"driver pool '{self.name}' exhausted ({self.size})")
+        slot: Optional[_Slot] = None
+        ok = False
+        try:
+            slot = self._take()
+            yield slot.driver
+            ok = True
+        finally:
+            if slot is not None:
+                slot.pages += 1
+                self._give_back(slot, ok)
+            self._sem.release()
+
+    def _take(self) -> _Slot:
+        while True:
+            with self._lock:
+                slot = self._idle.pop() if self._idle else None
+            if slot is None:
+                break
+            if _healthy(slot.driver):
+                return slot
+            self.recycled += 1
+            _quit(slot.driver)
+        slot = _Slot(self.factory())
+        self.created += 1
+        return slot
+
+    def _give_back(self, slot: _Slot, ok: bool) -> None:
+        if ok and slot.pages < self.max_pages:
+            with self._lock:
+                if not self._closed:
+                    self._idle.append(slot)
+                    return
+        self.recycled += 1
+        _quit(slot.driver)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for slot in idle:
+            _quit(slot.driver)
+
+    def stats(self) -> dict:
+        with self._lock:
+            idle = len(self._idle)
+        return {
+            "name": self.name,
+            "size": self.size,
+            "idle": idle,
+            "created": self.created,
+            "recycled": self.recycled,
+            "max_pages": self.max_pages,
+        }
+
+# -----------------------------
+# 프로세스 전역 풀 레지스트리 (crawler_google, fetcher_selenium 공용)
+#  - 종료 시 close_all_pools() 한 번으로 모든 Chrome 프로세스 정리
+# -----------------------------
+_POOLS: Dict[Hashable, DriverPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+def get_pool(key: Hashable, factory: Callable[[], Any], name: str) -> DriverPool:
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = DriverPool(factory=factory, name=name)
+            _POOLS[key] = pool
+    return pool
+
+def close_all_pools() -> None:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for p in pools:
+        p.close()
@@ -0,0 +1,107 @@
+# backend/app/embeddings.py
+from __future__ import annotations
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from langchain_huggingface import HuggingFaceEmbeddings
+
+# -----------------------------
+# 설정(ENV로 오버라이드 가능)
+# -----------------------------
+EMBED_MODEL = os.getenv("EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+EMBED_WARMUP = os.getenv("EMBED_WARMUP", "1") not in ("0", "false", "False")
+# torch(fp32) | int8(torch 동적 양자화, CPU 전용) | onnx(ONNX Runtime, sentence-transformers>=3.2 + optimum 필요)
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch").lower()
+
+# -----------------------------
+# 프로세스 전역 임베딩 레지스트리
+#  - (모델, 디바이스, 배치)마다 한 번만 로드
+#  - 여러 요청 스레드에서 동시에 불러도 안전
+# -----------------------------
+_REGISTRY: Dict[Tuple[str, str, int, str], HuggingFaceEmbeddings] = {}
+_LOCK = threading.Lock()
+_DEVICE: Optional[str] = None
+
+def _device() -> str:
+    """torch import/CUDA 확인은 프로세스당 1회만."""
+    global _DEVICE
+    if _DEVICE is None:
+        import torch
+        force_cpu = os.getenv("FORCE_CPU", "0") in ("1", "true", "True")
+        _DEVICE = "cuda" if (torch.cuda.is_available() and not force_cpu) else "cpu"
+    return _DEVICE
+
+def quantize_int8(model):
+    """nn.Linear만 int8 동적 양자화 (CPU 추론용)."""
+    import torch
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def _build(name: str, device: str, bs: int, backend: str) -> HuggingFaceEmbeddings:
+    model_kwargs: dict = {"device": device}
+    if backend == "onnx":
+        model_kwargs["backend"] = "onnx"
+        try:
+            return HuggingFaceEmbeddings(
+                model_name=name, model_kwargs=model_kwargs, encode_kwargs={"batch_size": bs},
+            )
+        except Exception as e:
+            print(f"[embeddings][onnx][error] {e} → torch(fp32)로 대체")
+            model_kwargs.pop("backend", None)
+
+    emb = HuggingFaceEmbeddings(
+        model_name=name, model_kwargs=model_kwargs, encode_kwargs={"batch_size": bs},
+    )
+    if backend == "int8":
+        if device != "cpu":
+            print("[embeddings][int8] CPU 전용 → 양자화 생략")
+        else:
+            emb._client = quantize_int8(emb._client)  # type: ignore[attr-defined]
+    return emb
+
+def get_embeddings(
+    model_name: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    backend: Optional[str] = None,
+) -> HuggingFaceEmbeddings:
+    name = model_name or EMBED_MODEL
+    bs = int(batch_size or EMBED_BATCH_SIZE)
+    key = (name, _device(), bs, (backend or EMBED_BACKEND).lower())
+
+    emb = _REGISTRY.get(key)
+    if emb is not None:
+        return emb
+
+    with _LOCK:
+        emb = _REGISTRY.get(key)
+        if emb is None:
+            print(f"[embeddings] load device={key[1]}, model={name}, batch_size={bs}, backend={key[3]}")
+            emb = _build(name, key[1], bs, key[3])
+            _REGISTRY[key] = emb
+    return emb
+
+def embed_documents(
+    texts: List[str],
+    model_name: Optional[str] = None,
+    batch_size: Optional[int] = None,
+) -> List[List[float]]:
+    if not texts:
+        return []
+    return get_embeddings(model_name, batch_size).embed_documents(texts)
+
+def embed_query(text: str, model_name: Optional[str] = None) -> List[float]:
+    return get_embeddings(model_name).embed_query(text)
+
+def warmup(model_name: Optional[str] = None) -> None:
+    """서버 시작 시 모델 가중치를 미리 올려 첫 /query 지연을 없앤다."""
+    try:
+        embed_query("warmup", model_name=model_name)
+    except Exception as e:
+        print(f"[embeddings][warmup][error] {e}")
+
+def loaded_models() -> List[dict]:
+    return [
+        {"model": name, "device": device, "batch_size": bs, "backend": backend}
+        for (name, device, bs, backend) in list(_REGISTRY.keys())
+    ]
@@ -0,0 +1,148 @@
+# backend/app/extract_cache.py
+from __future__ import annotations
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+# -----------------------------
+# 설정(ENV로 오버라이드 가능)
+# -----------------------------
+EXTRACT_CACHE_PATH = os.path.abspath(
+    os.getenv("EXTRACT_CACHE_PATH", os.path.join(os.path.dirname(__file__), "..", "extract_cache.db"))
+)
+EXTRACT_CACHE_TTL_SEC = float(os.getenv("EXTRACT_CACHE_TTL_SEC", str(6 * 3600)))
+EXTRACT_CACHE_MAX_ROWS = int(os.getenv("EXTRACT_CACHE_MAX_ROWS", "20000"))
+EXTRACT_CACHE_ENABLED = os.getenv("EXTRACT_CACHE", "1") not in ("0", "false", "False")
+
+@dataclass
+class CachedArticle:
+    url: str
+    final_url: str
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    extractor: str
+    fetched_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return (time.time() - self.fetched_at) < EXTRACT_CACHE_TTL_SEC
+
+    @property
+    def revalidatable(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+class ExtractCache:
+    """원본 URL → (최종 URL, 본문, ETag/Last-Modified, 성공한 추출기) 디스크 캐시.
+
+    - TTL 안이면 그대로 재사용, 지나면 조건부 GET으로 재검증
+    - 행 수가 max_rows를 넘으면 가장 오래 안 쓴 항목부터 삭제
+    """
+    def __init__(self, path: str = EXTRACT_CACHE_PATH, max_rows: int = EXTRACT_CACHE_MAX_ROWS):
+        self.path = path
+        self.max_rows = max(1, int(max_rows))
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS article_cache (
+                url TEXT PRIMARY KEY,
+                final_url TEXT NOT NULL,
+                text TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                extractor TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_article_cache_accessed ON article_cache(accessed_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, url: str) -> Optional[CachedArticle]:
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT url, final_url, text, etag, last_modified, extractor, fetched_at "
+                "FROM article_cache WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE article_cache SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            db.commit()
+        return CachedArticle(*row)
+
+    def put(
+        self,
+        url: str,
+        final_url: str,
+        text: str,
+        extractor: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        now = time.time()
+        keys = {url, final_url} if final_url else {url}
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "INSERT OR REPLACE INTO article_cache "
+                "(url, final_url, text, etag, last_modified, extractor, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(k, final_url or url, text, etag, last_modified, extractor, now, now) for k in keys],
+            )
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._evict_locked(db)
+            db.commit()
+
+    def touch(self, url: str) -> None:
+        """304 Not Modified → 신선도만 갱신."""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "UPDATE article_cache SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, url),
+            )
+            db.commit()
+
+    def _evict_locked(self, db: sqlite3.Connection) -> None:
+        n = db.execute("SELECT COUNT(*) FROM article_cache").fetchone()[0]
+        over = n - self.max_rows
+        if over > 0:
+            db.execute(
+                "DELETE FROM article_cache WHERE url IN "
+                "(SELECT url FROM article_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (over,),
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            n = self._db().execute("SELECT COUNT(*) FROM article_cache").fetchone()[0]
+        return {"path": self.path, "rows": int(n), "ttl_sec": EXTRACT_CACHE_TTL_SEC}
+
+_CACHE: Optional[ExtractCache] = None
+_CACHE_LOCK = threading.Lock()
+
+def get_cache() -> Optional[ExtractCache]:
+    global _CACHE
+    if not EXTRACT_CACHE_ENABLED:
+        return None
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = ExtractCache()
+    return _CACHE
@@ -0,0 +1,341 @@
+# backend/app/extract_router.py
+from __future__ import annotations
+import base64
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import lxml.html
+
+# -----------------------------
+# 설정(ENV로 오버라이드 가능)
+# -----------------------------
+EXTRACT_ROUTER_ENABLED = os.getenv("EXTRACT_ROUTER", "1") not in ("0", "false", "False")
+EXTRACT_ROUTER_PATH = os.path.abspath(
+    os.getenv("EXTRACT_ROUTER_PATH", os.path.join(os.path.dirname(__file__), "..", "extract_cache.db"))
+)
+ROUTER_MIN_TRIALS = int(os.getenv("ROUTER_MIN_TRIALS", "5"))        # 이만큼 시도해 본 뒤에만 건너뜀
+ROUTER_SKIP_RATE = float(os.getenv("ROUTER_SKIP_RATE", "0.05"))     # 성공률이 이 이하면 "항상 실패"
+ROUTER_REPROBE_EVERY = int(os.getenv("ROUTER_REPROBE_EVERY", "20"))  # 건너뛰던 방법도 N번에 한 번은 재시도
+ROUTER_FLUSH_EVERY = int(os.getenv("ROUTER_FLUSH_EVERY", "50"))      # 바뀐 (도메인, 방법)이 이만큼 쌓이면 sqlite에 기록
+ROUTER_FLUSH_SEC = float(os.getenv("ROUTER_FLUSH_SEC", "30"))        # 또는 마지막 기록 후 이만큼 지나면
+MIN_TEXT = 160
+
+# 방법 이름
+#  - http        : 언론사(착지) 도메인 기준 "HTTP로 받아서 뭐라도 건졌나" (실패 도메인은 바로 Selenium)
+#  - fast        : 언론사별 CSS 셀렉터(lxml) — trafilatura보다 먼저
+#  - trafilatura : 범용 본문 추출
+#  - selenium    : 브라우저 폴백
+HTTP_METHODS = ("fast", "trafilatura")
+
+# -----------------------------
+# 주요 국내 언론사 본문 셀렉터 (도메인 접미사 → 후보 순서)
+#  - 단순 셀렉터만: tag, #id, .class, tag#id, tag.class 와 공백(자손) 조합
+# -----------------------------
+PUBLISHER_RULES: Dict[str, List[str]] = {
+    "n.news.naver.com": ["#dic_area", "#newsct_article"],
+    "news.naver.com": ["#dic_area", "#articleBodyContents"],
+    "entertain.naver.com": ["#articeBody"],
+    "v.daum.net": ["div.article_view", "#harmonyContainer"],
+    "yna.co.kr": ["div.story-news", "article.story-news"],
+    "hankyung.com": ["#articletxt", "div.article-body"],
+    "mk.co.kr": ["div.news_cnt_detail_wrap", "#article_body"],
+    "joongang.co.kr": ["#article_body"],
+    "donga.com": ["section.news_view", "div.article_txt"],
+    "hani.co.kr": ["div.article-text", "div.text"],
+    "khan.co.kr": ["#articleBody", "div.art_body"],
+    "sedaily.com": ["div.article_view"],
+    "edaily.co.kr": ["div.news_body"],
+    "mt.co.kr": ["#textBody"],
+    "newsis.com": ["div.viewer article", "div.viewer"],
+    "news1.kr": ["#articles_detail", "div.detail"],
+    "etnews.com": ["#articleBody", "div.article_body"],
+    "fnnews.com": ["#article_content"],
+    "asiae.co.kr": ["div.va_cont", "#txt_area"],
+    "heraldcorp.com": ["#articleText", "div.article_view"],
+    "inews24.com": ["#articleBody"],
+    "zdnet.co.kr": ["#articleBody", "div.view_cont"],
+    "biz.chosun.com": ["section.article-body"],
+    "chosun.com": ["section.article-body"],
+}
+
+def _host(url: str) -> str:
+    h = urlparse(url).netloc.lower()
+    return h[4:] if h.startswith("www.") else h
+
+# -----------------------------
+# 중간(리다이렉트) 링크 → 언론사 URL
+#  - RSS 링크는 전부 news.google.com/rss/articles/<id> → 그대로 통계를 쌓으면 모든 기사가 한 도메인
+#  - 예전 형식 id(CBMi…)는 base64url protobuf 안에 원문 URL이 그대로 들어 있음
+#  - 새 형식(URL 미포함)은 풀 수 없음 → 원래 URL을 돌려주고, 도메인은 리다이렉트 결과로 판단
+# -----------------------------
+_REDIRECT_HOSTS = ("news.google.com",)
+_GN_ARTICLE = re.compile(r"/(?:rss/)?articles/([A-Za-z0-9_-]+)")
+_EMBEDDED_URL = re.compile(rb"https?://[\x21-\x7e]+")
+
+def is_redirector(url: str) -> bool:
+    return _host(url) in _REDIRECT_HOSTS
+
+def publisher_url(url: str) -> str:
+    """Google News 기사 링크면 id에 담긴 언론사 URL, 아니면(또는 못 풀면) 그대로."""
+    if not is_redirector(url):
+        return url
+    m = _GN_ARTICLE.search(urlparse(url).path)
+    if m is None:
+        return url
+    token = m.group(1)
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except Exception:
+        return url
+    found = _EMBEDDED_URL.search(raw)
+    return found.group(0).decode("ascii") if found else url
+
+def rules_for(url: str) -> List[str]:
+    host = _host(url)
+    for suffix, sels in PUBLISHER_RULES.items():
+        if host == suffix or host.endswith("." + suffix):
+            return sels
+    return []
+
+# -----------------------------
+# lxml 빠른 추출
+# -----------------------------
+_SIMPLE_SEL = re.compile(r"^(?P<tag>[a-zA-Z][\w-]*)?(?P<rest>(?:[#.][\w-]+)*)$")
+_SEL_PART = re.compile(r"([#.])([\w-]+)")
+_XPATHS: Dict[str, str] = {}
+_DROP_TAGS = ("script", "style", "noscript", "iframe", "figcaption", "button", "aside", "table")
+
+def css_to_xpath(sel: str) -> str:
+    """'div.article_view p' → //div[...]//p (cssselect 의존성 없이 단순 셀렉터만)"""
+    xp = _XPATHS.get(sel)
+    if xp is not None:
+        return xp
+    steps = []
+    for tok in sel.split():
+        m = _SIMPLE_SEL.match(tok)
+        if m is None or not (m.group("tag") or m.group("rest")):
+            raise ValueError(f"unsupported selector: {sel!r}")
+        conds = []
+        for kind, name in _SEL_PART.findall(m.group("rest") or ""):
+            if kind == "#":
+                conds.append(f'@id="{name}"')
+            else:
+                conds.append(f'contains(concat(" ", normalize-space(@class), " "), " {name} ")')
+        steps.append((m.group("tag") or "*") + "".join(f"[{c}]" for c in conds))
+    xp = "//" + "//".join(steps)
+    _XPATHS[sel] = xp
+    return xp
+
+def _node_text(el) -> str:
+    for bad in el.xpath(" | ".join(f".//{t}" for t in _DROP_TAGS)):
+        bad.drop_tree()
+    lines = [" ".join(t.split()) for t in el.itertext()]
+    return "\n".join(ln for ln in lines if ln)
+
+def fast_extract(content: bytes, url: str, selectors: Optional[List[str]] = None) -> Tuple[str, Optional[str]]:
+    """언론사 셀렉터로 본문 노드를 바로 집어냄. return: (본문, 맞은 셀렉터)"""
+    sels = selectors if selectors is not None else rules_for(url)
+    if not sels or not content:
+        return "", None
+    doc = lxml.html.fromstring(content)
+    for sel in sels:
+        try:
+            nodes = doc.xpath(css_to_xpath(sel))
+        except ValueError:
+            continue
+        if nodes:
+            text = _node_text(nodes[0])
+            if len(text) >= MIN_TEXT:
+                return text, sel
+    return "", None
+
+# -----------------------------
+# 도메인별 전략 통계 (sqlite 영속)
+# -----------------------------
+@dataclass
+class RouteStat:
+    attempts: int = 0
+    successes: int = 0
+    total_sec: float = 0.0
+    selector: Optional[str] = None
+    skipped: int = 0  # 메모리 전용 (재시도 주기 계산)
+
+    @property
+    def rate(self) -> float:
+        return self.successes / self.attempts if self.attempts else 0.0
+
+    @property
+    def avg_sec(self) -> float:
+        return self.total_sec / self.attempts if self.attempts else 0.0
+
+class ExtractRouter:
+    """(도메인, 방법) → 시도/성공/소요 시간. 항상 실패하는 방법은 건너뛴다.
+
+    - 표는 시작 시 전부 메모리로 읽고, 기록은 메모리에만 → 바뀐 행을 모아 두었다가
+      ROUTER_FLUSH_EVERY 개 / ROUTER_FLUSH_SEC 초마다, 그리고 close()에서 sqlite에 upsert
+      (추출 경로에서 매번 commit하지 않음, 기록은 락 밖에서)
+    - 건너뛰던 방법도 ROUTER_REPROBE_EVERY 번에 한 번은 다시 시도 → 사이트 개편 반영
+    """
+    def __init__(self, path: str = EXTRACT_ROUTER_PATH, enabled: bool = EXTRACT_ROUTER_ENABLED):
+        self.path = path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats: Dict[Tuple[str, str], RouteStat] = {}
+        self._dirty: set = set()
+        self._flushed_at = time.monotonic()
+        self._io_lock = threading.Lock()  # sqlite 연결/쓰기 (통계 락과 분리)
+        if enabled:
+            try:
+                self._load()
+            except Exception as e:
+                print(f"[extract-router][error] load: {e}")
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS extract_routes (
+                domain TEXT NOT NULL,
+                method TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                successes INTEGER NOT NULL,
+                total_sec REAL NOT NULL,
+                selector TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (domain, method)
+            )
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _load(self) -> None:
+        with self._io_lock:
+            rows = self._db().execute(
+                "SELECT domain, method, attempts, successes, total_sec, selector FROM extract_routes"
+            ).fetchall()
+        with self._lock:
+            for d, m, a, s, t, sel in rows:
+                self._stats[(d, m)] = RouteStat(int(a), int(s), float(t), sel)
+
+    def _mark_locked(self, key: Tuple[str, str]) -> bool:
+        """바뀐 행 표시. return: 지금 기록할 때가 됐나"""
+        self._dirty.add(key)
+        return (len(self._dirty) >= max(1, ROUTER_FLUSH_EVERY)
+                or time.monotonic() - self._flushed_at >= ROUTER_FLUSH_SEC)
+
+    def flush(self) -> int:
+        """모아 둔 변경을 한 트랜잭션으로 upsert. 실패하면 다음 기록 때 다시 시도."""
+        with self._lock:
+            if not self._dirty:
+                return 0
+            keys, self._dirty = self._dirty, set()
+            self._flushed_at = time.monotonic()
+            now = time.time()
+            rows = []
+            for (d, m) in keys:
+                st = self._stats[(d, m)]
+                rows.append((d, m, st.attempts, st.successes, st.total_sec, st.selector, now))
+        try:
+            with self._io_lock:
+                db = self._db()
+                db.executemany(
+                    "INSERT OR REPLACE INTO extract_routes "
+                    "(domain, method, attempts, successes, total_sec, selector, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                db.commit()
+        except Exception as e:
+            print(f"[extract-router][error] save: {e}")
+            with self._lock:
+                self._dirty |= keys
+            return 0
+        return len(rows)
+
+    def allow(self, url: str, method: str) -> bool:
+        if not self.enabled:
+            return True
+        key = (_host(url), method)
+        with self._lock:
+            st = self._stats.get(key)
+            if st is None or st.attempts < ROUTER_MIN_TRIALS or st.rate > ROUTER_SKIP_RATE:
+                return True
+            st.skipped += 1
+            return st.skipped % max(1, ROUTER_REPROBE_EVERY) == 0
+
+    def http_methods(self, url: str) -> List[str]:
+        """받아 온 HTML에 적용할 추출기 순서: 셀렉터 규칙(또는 학습된 셀렉터)이 있으면 fast 먼저."""
+        methods = (["fast"] if self.selectors_for(url) else []) + ["trafilatura"]
+        allowed = [m for m in methods if self.allow(url, m)]
+        return allowed or ["trafilatura"]
+
+    def selectors_for(self, url: str) -> List[str]:
+        sels = list(rules_for(url))
+        if self.enabled:
+            with self._lock:
+                learned = [
+                    st.selector for (d, m), st in self._stats.items()
+                    if d == _host(url) and st.selector and m in ("fast", "selenium")
+                ]
+            sels = [s for s in learned if s not in sels] + sels
+        return sels
+
+    def record(self, url: str, method: str, ok: bool, seconds: float, selector: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        domain = _host(url)
+        if not domain:
+            return
+        with self._lock:
+            st = self._stats.setdefault((domain, method), RouteStat())
+            st.attempts += 1
+            st.successes += int(bool(ok))
+            st.total_sec += max(0.0, float(seconds))
+            if ok and selector:
+                st.selector = selector
+            due = self._mark_locked((domain, method))
+        if due:
+            self.flush()
+
+    def stats(self, limit: int = 200) -> dict:
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda kv: -kv[1].attempts)[:limit]
+            routes = [
+                {
+                    "domain": d, "method": m, "attempts": st.attempts,
+                    "success_rate": round(st.rate, 3), "avg_sec": round(st.avg_sec, 3),
+                    "selector": st.selector,
+                    "skipping": st.attempts >= ROUTER_MIN_TRIALS and st.rate <= ROUTER_SKIP_RATE,
+                }
+                for (d, m), st in items
+            ]
+        return {"enabled": self.enabled, "path": self.path, "routes": routes}
+
+    def close(self) -> None:
+        if self.enabled:
+            self.flush()
+        with self._io_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+_ROUTER: Optional[ExtractRouter] = None
+_ROUTER_LOCK = threading.Lock()
+
+def get_router() -> ExtractRouter:
+    global _ROUTER
+    if _ROUTER is None:
+        with _ROUTER_LOCK:
+            if _ROUTER is None:
+                _ROUTER = ExtractRouter()
+    return _ROUTER
@@ -0,0 +1,143 @@
+# backend/app/fetch_pool.py
+from __future__ import annotations
+import contextlib
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+# -----------------------------
+# 설정(ENV로 오버라이드 가능)
+# -----------------------------
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))
+FETCH_PER_HOST = int(os.getenv("FETCH_PER_HOST", "4"))
+# 프로세스 전체 추출 스레드 상한: 마감 후에도 돌고 있는(버려진) 작업까지 포함해 이 이상 쌓이지 않음
+FETCH_POOL_MAX = int(os.getenv("FETCH_POOL_MAX", str(FETCH_WORKERS * 4)))
+
+# -----------------------------
+# 중단 토큰: 추출 함수가 무거운 단계(Selenium) 전에 확인
+#  - iter_extract가 작업 스레드 컨텍스트에 심어 둠 → 마감/포기 뒤엔 stopped() == True
+# -----------------------------
+class StopToken:
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self._ev = threading.Event()
+
+    def cancel(self) -> None:
+        self._ev.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._ev.is_set() or time.time() >= self.deadline
+
+    def remaining(self) -> float:
+        return 0.0 if self._ev.is_set() else max(0.0, self.deadline - time.time())
+
+_STOP: contextvars.ContextVar[Optional[StopToken]] = contextvars.ContextVar("fetch_stop", default=None)
+
+def stopped() -> bool:
+    """iter_extract 작업 안에서 호출: 요청이 이미 끝났으면 True (밖에서는 항상 False)."""
+    tok = _STOP.get()
+    return tok is not None and tok.stopped
+
+def remaining(default: float) -> float:
+    """남은 시간(초). iter_extract 밖이면 default."""
+    tok = _STOP.get()
+    return default if tok is None else min(default, tok.remaining())
+
+@contextlib.contextmanager
+def stop_scope(deadline: float) -> Iterator[StopToken]:
+    """비동기 크롤처럼 iter_extract를 안 쓰는 경로용: 블록 안에서 만든 태스크/스레드가 토큰을 물려받음."""
+    token = StopToken(deadline)
+    ctx = _STOP.set(token)
+    try:
+        yield token
+    finally:
+        token.cancel()
+        _STOP.reset(ctx)
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=max(1, FETCH_POOL_MAX), thread_name_prefix="fetch")
+        return _EXECUTOR
+
+class _HostLimiter:
+    """호스트별 동시 요청 상한."""
+    def __init__(self, per_host: int):
+        self.per_host = max(1, int(per_host))
+        self._sems: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def sem(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            s = self._sems.get(host)
+            if s is None:
+                s = threading.BoundedSemaphore(self.per_host)
+                self._sems[host] = s
+            return s
+
+def iter_extract(
+    links: List[Tuple[str, str]],
+    extract: Callable[[str], str],
+    deadline: float,
+    workers: int = FETCH_WORKERS,
+    per_host: int = FETCH_PER_HOST,
+    debug: bool = False,
+) -> Iterator[Tuple[str, str, str]]:
+    """링크들을 동시에 추출해 끝나는 순서대로 (url, title, body)를 내보낸다.
+
+    - deadline(time.time() 기준 절대 시각)이 지나면 대기 중 작업은 취소,
+      실행 중인 작업은 결과를 버리고(abandon) 즉시 반환
+      (실행 중인 작업은 stopped()로 중단 신호를 받아 Selenium 등 무거운 단계를 건너뜀)
+    - 스레드는 프로세스 공유 풀(FETCH_POOL_MAX) → 버려진 작업이 요청마다 쌓이지 않음
+    - 추출 예외는 해당 링크만 건너뜀
+    """
+    if not links:
+        return
+    limiter = _HostLimiter(per_host)
+    token = StopToken(deadline)
+    slots = threading.BoundedSemaphore(max(1, int(workers)))  # 요청당 동시 추출 상한
+
+    def _run(url: str) -> str:
+        _STOP.set(token)  # copy_context().run 안 → 이 작업의 컨텍스트에만 적용
+        with slots, limiter.sem(url):
+            if token.stopped:
+                return ""
+            return extract(url) or ""
+
+    ex = _executor()
+    # 요청별 단계 시간(metrics)이 작업 스레드에서도 같은 요청으로 모이도록 컨텍스트 복사
+    futs: Dict[Future, Tuple[str, str]] = {
+        ex.submit(contextvars.copy_context().run, _run, u): (u, t) for (u, t) in links
+    }
+    pending = set(futs)
+    try:
+        while pending:
+            left = deadline - time.time()
+            if left <= 0:
+                break
+            done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+            for f in done:
+                url, title = futs[f]
+                try:
+                    body = f.result()
+                except Exception as e:
+                    if debug:
+                        print(f"[fetch][error] {e} | {url}")
+                    continue
+                yield url, title, body
+        if pending and debug:
+            print(f"[fetch] deadline reached. abandon {len(pending)} link(s).")
+    finally:
+        token.cancel()
+        for f in pending:
+            f.cancel()
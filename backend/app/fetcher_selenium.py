@@ -1,38 +1,50 @@
 # backend/app/fetcher_selenium.py
-import contextlib, time
+import time
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+
+from .driver_pool import DriverPool, get_pool, resolve_driver_path
+
+def _new_simple_driver(headless: bool):
+    opts = Options()
+    if headless:
+        opts.add_argument("--headless=new")
+    opts.add_argument("--disable-gpu")
+    opts.add_argument("--no-sandbox")
+    opts.add_argument("--window-size=1280,2400")
+    opts.add_argument("--lang=ko-KR")
+    opts.page_load_strategy = "eager"
+    path = resolve_driver_path()
+    return webdriver.Chrome(service=Service(path), options=opts) if path else webdriver.Chrome(options=opts)
+
+def _pool(headless: bool) -> DriverPool:
+    # crawler_google과 같은 레지스트리 → main 종료 시 close_driver_pools()가 함께 정리
+    key = bool(headless)
+    return get_pool(("simple", key), factory=lambda: _new_simple_driver(key), name=f"simple-{int(key)}")
 
 class SimpleFetcher:
     def __init__(self, headless: bool = True):
-        opts = Options()
-        if headless:
-            opts.add_argument("--headless=new")
-        opts.add_argument("--disable-gpu")
-        opts.add_argument("--no-sandbox")
-        opts.add_argument("--window-size=1280,2400")
-        opts.add_argument("--lang=ko-KR")
-        opts.page_load_strategy = "eager"
-        self.driver = webdriver.Chrome(ChromeDriverManager().install(), options=opts)
+        self.pool = _pool(headless)
 
     def get_text(self, url: str) -> str:
-        self.driver.get(url)
-        try:
-            WebDriverWait(self.driver, 7).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-        except Exception:
-            pass
-        time.sleep(0.5)
-        try:
-            return self.driver.find_element(By.TAG_NAME, "body").text.strip()
-        except Exception:
-            return ""
+        with self.pool.checkout() as driver:
+            driver.get(url)
+            try:
+                WebDriverWait(driver, 7).until(
+                    EC.presence_of_element_located((By.TAG_NAME, "body"))
+                )
+            except Exception:
+                pass
+            time.sleep(0.5)
+            try:
+                return driver.find_element(By.TAG_NAME, "body").text.strip()
+            except Exception:
+                return ""
 
     def close(self):
-        with contextlib.suppress(Exception):
-            self.driver.quit()
+        # 드라이버는 공유 풀 소유 → get_text에서 이미 반납됨
+        pass
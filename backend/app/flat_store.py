@@ -0,0 +1,419 @@
+# backend/app/flat_store.py
+from __future__ import annotations
+import json
+import os
+import shutil
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_community.docstore.document import Document
+
+# -----------------------------
+# 작은 대화 저장소용 정확 검색 백엔드
+#   <persist_dir>/flat_index/vectors.f16 : float16 행 (N, D)을 이어 붙인 raw 파일, np.memmap으로 연다
+#   <persist_dir>/flat_index/rows.jsonl  : 행마다 {"row", "id", "document", "metadata"} (갱신은 같은 row로 한 줄 더)
+#   <persist_dir>/flat_index/index.json  : {"dim": D}
+#   - persist는 새 행만 두 파일 끝에 덧붙이고, 기존 행 갱신은 memmap 제자리 쓰기 → 기사마다 전체 재작성 없음
+#   - 삭제·갱신 줄이 쌓이면(또는 이전 vectors.npy/meta.json 형식이면) 다음 persist에서 한 번 다시 씀
+#   - 검색은 L2 거리(Chroma 기본값과 같은 순위) = |x|^2 - 2 x·q, 행렬곱 한 번
+#   - Chroma 컬렉션/LC VectorStore API 중 rag가 쓰는 부분만 호환
+# -----------------------------
+FLAT_DIR = "flat_index"
+_VECS = "vectors.f16"
+_ROWS = "rows.jsonl"
+_HEAD = "index.json"
+_LEGACY_VECS = "vectors.npy"
+_LEGACY_META = "meta.json"
+
+def flat_exists(persist_dir: str) -> bool:
+    d = os.path.join(persist_dir, FLAT_DIR)
+    return os.path.exists(os.path.join(d, _HEAD)) or os.path.exists(os.path.join(d, _LEGACY_META))
+
+def _sq_norms(x: np.ndarray) -> np.ndarray:
+    return np.einsum("ij,ij->i", x, x, dtype=np.float32)
+
+def _match(meta: dict, where: Optional[dict]) -> bool:
+    if not where:
+        return True
+    if "$and" in where:
+        return all(_match(meta, w) for w in where["$and"])
+    for k, v in where.items():
+        if isinstance(v, dict) and "$in" in v:
+            if meta.get(k) not in v["$in"]:
+                return False
+            continue
+        if isinstance(v, dict) and "$eq" in v:
+            v = v["$eq"]
+        if meta.get(k) != v:
+            return False
+    return True
+
+class _Retriever:
+    def __init__(self, store: "FlatVectorStore", k: int, filter: Optional[dict]):
+        self.store, self.k, self.filter = store, k, filter
+
+    def invoke(self, query: str) -> List[Document]:
+        vec = self.store.embedding_function.embed_query(query)
+        return self.store.similarity_search_by_vector(vec, k=self.k, filter=self.filter)
+
+    get_relevant_documents = invoke
+
+class FlatVectorStore:
+    def __init__(self, persist_dir: str, embedding_function):
+        self.dir = os.path.join(persist_dir, FLAT_DIR)
+        self.embedding_function = embedding_function
+        self.on_grow: Optional[Callable[[int], None]] = None
+        self._lock = threading.RLock()
+        # HNSW로 승격된 뒤: 늦게 도착한 쓰기/읽기를 넘길 컬렉션과 LC 저장소
+        self._forward = None
+        self._forward_store = None
+        self._ids: List[str] = []
+        self._docs: List[str] = []
+        self._metas: List[dict] = []
+        self._index: Dict[str, int] = {}
+        self._dim: Optional[int] = None
+        self._vecs: Optional[np.ndarray] = None   # 디스크에 있는 행 [0, _persisted) — memmap(r+)
+        self._tail: Optional[np.ndarray] = None   # 아직 안 쓴 새 행 [_persisted, N) — 메모리
+        self._sqn: np.ndarray = np.zeros(0, dtype=np.float32)
+        self._persisted = 0
+        self._updated: set = set()  # 갱신된 디스크 행 (다음 persist에서 rows.jsonl에 한 줄씩)
+        self._lines = 0             # rows.jsonl 줄 수 (갱신 줄이 쌓이면 다시 씀)
+        self._rewrite = False
+        self._dirty = False
+        self._load()
+
+    # Chroma 컬렉션 API 자리 (vs._collection.upsert(...) 등)
+    @property
+    def _collection(self) -> "FlatVectorStore":
+        return self
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.dir, name)
+
+    def _load(self) -> None:
+        if os.path.exists(self._path(_HEAD)):
+            self._load_rows()
+        elif os.path.exists(self._path(_LEGACY_META)):
+            self._load_legacy()
+
+    def _load_rows(self) -> None:
+        with open(self._path(_HEAD), encoding="utf-8") as f:
+            self._dim = int(json.load(f)["dim"])
+        lines = 0
+        if os.path.exists(self._path(_ROWS)):
+            with open(self._path(_ROWS), encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        r = json.loads(line)
+                    except ValueError:
+                        break  # 쓰다 만 마지막 줄
+                    i = int(r["row"])
+                    if i == len(self._ids):
+                        self._ids.append(r["id"])
+                        self._docs.append(r["document"])
+                        self._metas.append(r["metadata"] or {})
+                    elif i < len(self._ids):
+                        self._ids[i], self._docs[i], self._metas[i] = r["id"], r["document"], r["metadata"] or {}
+                    else:
+                        break
+                    lines += 1
+        size = os.path.getsize(self._path(_VECS)) if os.path.exists(self._path(_VECS)) else 0
+        on_disk = size // (2 * self._dim)
+        n = min(len(self._ids), on_disk)
+        # 두 파일 길이가 어긋남(쓰다 멈춤) → 맞는 데까지만 읽고 다음 persist에서 다시 씀
+        self._rewrite = n != len(self._ids) or n * 2 * self._dim != size
+        del self._ids[n:], self._docs[n:], self._metas[n:]
+        self._index = {cid: i for i, cid in enumerate(self._ids)}
+        self._lines = lines
+        self._persisted = n
+        self._open_vecs()
+        self._sqn = _sq_norms(self._vecs) if self._vecs is not None else np.zeros(0, dtype=np.float32)
+        if self._rewrite:
+            # 어긋난 파일 위에 덧붙이지 않도록 디스크 행도 메모리로 옮겨 두고 전부 다시 씀
+            self._tail, self._vecs, self._persisted = self._matrix(copy=True), None, 0
+
+    def _load_legacy(self) -> None:
+        """이전 형식(vectors.npy + meta.json 한 벌)은 메모리로 읽고 다음 persist에서 새 형식으로."""
+        with open(self._path(_LEGACY_META), encoding="utf-8") as f:
+            meta = json.load(f)
+        n = int(meta.get("count", len(meta["ids"])))
+        vecs = np.load(self._path(_LEGACY_VECS), mmap_mode="r")
+        n = min(n, vecs.shape[0], len(meta["ids"]))
+        self._ids = list(meta["ids"][:n])
+        self._docs = list(meta["documents"][:n])
+        self._metas = list(meta["metadatas"][:n])
+        self._index = {cid: i for i, cid in enumerate(self._ids)}
+        if n:
+            self._dim = int(vecs.shape[1])
+            self._tail = np.array(vecs[:n], dtype=np.float16)
+            self._sqn = _sq_norms(self._tail)
+        self._rewrite = True
+
+    def _open_vecs(self) -> None:
+        n = self._persisted
+        self._vecs = (
+            np.memmap(self._path(_VECS), dtype=np.float16, mode="r+", shape=(n, self._dim)) if n else None
+        )
+
+    def _matrix(self, copy: bool = False) -> Optional[np.ndarray]:
+        """전체 행 (디스크 + 메모리 꼬리). 보통 persist 직후라 꼬리는 비어 있고 memmap 그대로."""
+        parts = [x for x in (self._vecs, self._tail) if x is not None and x.shape[0]]
+        if not parts:
+            return None
+        if len(parts) == 1:
+            return np.array(parts[0]) if copy else parts[0]
+        return np.concatenate(parts)
+
+    def _row_vec(self, i: int) -> np.ndarray:
+        return self._vecs[i] if i < self._persisted else self._tail[i - self._persisted]
+
+    # ---- 쓰기 ----
+    def upsert(self, ids: Sequence[str], embeddings, documents: Sequence[str],
+               metadatas: Sequence[dict]) -> None:
+        with self._lock:
+            if self._forward is not None:
+                self._forward.upsert(ids=list(ids), embeddings=embeddings,
+                                     documents=list(documents), metadatas=list(metadatas))
+                return
+            new = np.asarray(embeddings, dtype=np.float16)
+            if not len(ids):
+                return
+            if self._dim is None:
+                self._dim = int(new.shape[1])
+            append_rows: List[int] = []
+            for j, cid in enumerate(ids):
+                i = self._index.get(cid)
+                if i is None:
+                    self._index[cid] = len(self._ids)
+                    self._ids.append(cid)
+                    self._docs.append(documents[j])
+                    self._metas.append(dict(metadatas[j] or {}))
+                    append_rows.append(j)
+                    continue
+                # 기존 행: 디스크 행이면 memmap 제자리 쓰기, 메타데이터는 다음 persist에서 한 줄
+                if i < self._persisted:
+                    self._vecs[i] = new[j]
+                    self._updated.add(i)
+                else:
+                    self._tail[i - self._persisted] = new[j]
+                self._sqn[i] = _sq_norms(new[j:j + 1])[0]
+                self._docs[i] = documents[j]
+                self._metas[i] = dict(metadatas[j] or {})
+            if append_rows:
+                rows = new[append_rows]
+                self._tail = rows if self._tail is None else np.vstack([self._tail, rows])
+                self._sqn = np.concatenate([self._sqn, _sq_norms(rows)])
+            self._dirty = True
+            n = len(self._ids)
+        if self.on_grow is not None:
+            self.on_grow(n)
+
+    add = upsert
+
+    def delete(self, ids: Optional[Sequence[str]] = None, where: Optional[dict] = None) -> None:
+        with self._lock:
+            if self._forward is not None:
+                self._forward.delete(ids=ids, where=where)
+                return
+            drop = set(ids or [])
+            keep = [i for i, (cid, m) in enumerate(zip(self._ids, self._metas))
+                    if cid not in drop and not (where and _match(m, where))]
+            if len(keep) == len(self._ids):
+                return
+            mat = self._matrix()
+            self._ids = [self._ids[i] for i in keep]
+            self._docs = [self._docs[i] for i in keep]
+            self._metas = [self._metas[i] for i in keep]
+            self._index = {cid: i for i, cid in enumerate(self._ids)}
+            # 행 번호가 바뀌므로 파일은 다음 persist에서 한 번 다시 씀
+            self._tail = np.array(mat[keep]) if mat is not None else None
+            self._sqn = self._sqn[keep]
+            self._vecs, self._persisted = None, 0
+            self._updated.clear()
+            self._rewrite = True
+            self._dirty = True
+
+    def persist(self) -> None:
+        with self._lock:
+            if not self._dirty or self._forward is not None:
+                return
+            os.makedirs(self.dir, exist_ok=True)
+            n = len(self._ids)
+            if self._rewrite or self._lines + len(self._updated) > 2 * n + 64:
+                self._write_all()
+            else:
+                self._append()
+            self._tail = None
+            self._persisted = n
+            self._updated.clear()
+            self._rewrite = False
+            self._dirty = False
+            self._open_vecs()
+
+    def _row_line(self, i: int) -> str:
+        return json.dumps({"row": i, "id": self._ids[i], "document": self._docs[i],
+                           "metadata": self._metas[i]}, ensure_ascii=False) + "\n"
+
+    def _append(self) -> None:
+        if self._vecs is not None:
+            self._vecs.flush()  # 제자리 갱신분
+        if self._tail is not None and self._tail.shape[0]:
+            with open(self._path(_VECS), "ab") as f:
+                f.write(np.ascontiguousarray(self._tail, dtype=np.float16).tobytes())
+        rows = sorted(self._updated) + list(range(self._persisted, len(self._ids)))
+        with open(self._path(_ROWS), "a", encoding="utf-8") as f:
+            f.write("".join(self._row_line(i) for i in rows))
+        self._lines += len(rows)
+        if not os.path.exists(self._path(_HEAD)) and self._dim is not None:
+            self._write_head()
+
+    def _write_all(self) -> None:
+        mat = self._matrix(copy=True)
+        self._vecs = None  # 기존 memmap 해제 후 교체
+        tmp = self._path(_VECS + ".tmp")
+        with open(tmp, "wb") as f:
+            if mat is not None:
+                f.write(np.ascontiguousarray(mat, dtype=np.float16).tobytes())
+        os.replace(tmp, self._path(_VECS))
+        tmp = self._path(_ROWS + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("".join(self._row_line(i) for i in range(len(self._ids))))
+        os.replace(tmp, self._path(_ROWS))
+        self._lines = len(self._ids)
+        if self._dim is not None:
+            self._write_head()
+        for name in (_LEGACY_VECS, _LEGACY_META):
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
+
+    def _write_head(self) -> None:
+        tmp = self._path(_HEAD + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"dim": self._dim}, f)
+        os.replace(tmp, self._path(_HEAD))
+
+    # ---- 읽기 ----
+    def count(self) -> int:
+        with self._lock:
+            if self._forward is not None:
+                return self._forward.count()
+            return len(self._ids)
+
+    def get(self, ids: Optional[Sequence[str]] = None, where: Optional[dict] = None,
+            include: Sequence[str] = ("documents", "metadatas"),
+            limit: Optional[int] = None, offset: Optional[int] = None) -> dict:
+        with self._lock:
+            if self._forward is not None:
+                return self._forward.get(ids=list(ids) if ids is not None else None, where=where,
+                                         include=list(include), limit=limit, offset=offset)
+            if ids is not None:
+                rows = [self._index[c] for c in ids if c in self._index]
+            else:
+                rows = [i for i, m in enumerate(self._metas) if _match(m, where)]
+            rows = rows[(offset or 0):]
+            if limit is not None:
+                rows = rows[:limit]
+            out: Dict[str, Any] = {"ids": [self._ids[i] for i in rows]}
+            if "documents" in include:
+                out["documents"] = [self._docs[i] for i in rows]
+            if "metadatas" in include:
+                out["metadatas"] = [self._metas[i] for i in rows]
+            if "embeddings" in include:
+                out["embeddings"] = [np.asarray(self._row_vec(i), dtype=np.float32).tolist() for i in rows]
+        return out
+
+    def similarity_search_by_vector(self, embedding, k: int = 4, filter: Optional[dict] = None,
+                                    **kwargs) -> List[Document]:
+        with self._lock:
+            if self._forward_store is not None:
+                return self._forward_store.similarity_search_by_vector(embedding, k=k, filter=filter)
+            mat = self._matrix()
+            if mat is None or not self._ids:
+                return []
+            rows = None
+            if filter:
+                rows = np.array([i for i, m in enumerate(self._metas) if _match(m, filter)], dtype=np.int64)
+                if rows.size == 0:
+                    return []
+            q = np.asarray(embedding, dtype=np.float32)
+            x = mat if rows is None else mat[rows]
+            sqn = self._sqn if rows is None else self._sqn[rows]
+            dist = sqn - 2.0 * (x @ q)  # |q|^2 는 순위에 영향 없음
+            k = min(int(k), dist.shape[0])
+            top = np.argpartition(dist, k - 1)[:k]
+            top = top[np.argsort(dist[top])]
+            idx = top if rows is None else rows[top]
+            return [Document(page_content=self._docs[i], metadata=dict(self._metas[i])) for i in idx]
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[dict] = None,
+                          **kwargs) -> List[Document]:
+        return self.similarity_search_by_vector(self.embedding_function.embed_query(query), k, filter)
+
+    def as_retriever(self, search_kwargs: Optional[dict] = None) -> _Retriever:
+        kw = search_kwargs or {}
+        return _Retriever(self, int(kw.get("k", 4)), kw.get("filter"))
+
+    # ---- HNSW 승격 ----
+    def copy_to(self, collection, batch: int = 1000) -> int:
+        """모든 행을 임베딩째 다른 컬렉션으로 복사 (이 저장소는 그대로)."""
+        with self._lock:
+            n = len(self._ids)
+            for s in range(0, n, batch):
+                rows = range(s, min(n, s + batch))
+                collection.upsert(
+                    ids=self._ids[s:s + batch],
+                    embeddings=[np.asarray(self._row_vec(i), dtype=np.float32).tolist() for i in rows],
+                    documents=self._docs[s:s + batch],
+                    metadatas=self._metas[s:s + batch],
+                )
+            return n
+
+    def retire(self, store) -> None:
+        """승격 완료 후: 이 객체로 오는 읽기/쓰기는 store(HNSW)로 넘기고 로컬 파일은 삭제."""
+        with self._lock:
+            self._forward_store = store
+            self._forward = store._collection
+            self._vecs, self._tail = None, None
+            self._sqn = np.zeros(0, dtype=np.float32)
+            self._ids, self._docs, self._metas, self._index = [], [], [], {}
+            self._persisted, self._lines = 0, 0
+            self._updated.clear()
+            self._dirty = False
+            shutil.rmtree(self.dir, ignore_errors=True)
+
+class TieredStore:
+    """처음엔 FlatVectorStore, 행 수가 promote_at을 넘으면 HNSW(Chroma)로 제자리 승격.
+
+    호출자는 이 객체만 들고 있으면 되고, 속성 접근은 현재 백엔드로 위임된다.
+    """
+    def __init__(self, flat: FlatVectorStore, open_hnsw: Callable[[], Any], promote_at: int):
+        self._impl = flat
+        self._open_hnsw = open_hnsw
+        self.promote_at = max(1, int(promote_at))
+        self._promote_lock = threading.Lock()
+        flat.on_grow = self._maybe_promote
+
+    @property
+    def backend(self) -> str:
+        return "flat" if isinstance(self._impl, FlatVectorStore) else "hnsw"
+
+    def __getattr__(self, name: str):
+        return getattr(self._impl, name)
+
+    def _maybe_promote(self, n: int) -> None:
+        if n <= self.promote_at or not isinstance(self._impl, FlatVectorStore):
+            return
+        with self._promote_lock:
+            flat = self._impl
+            if not isinstance(flat, FlatVectorStore):
+                return
+            hnsw = self._open_hnsw()
+            # 복사 → 교체 → 비우기 순서, flat 잠금 안에서 (그 사이 읽기가 빈 저장소를 보거나 쓰기가 빠지지 않게)
+            with flat._lock:
+                moved = flat.copy_to(hnsw._collection)
+                self._impl = hnsw
+                flat.retire(hnsw)
+            print(f"[flat] promoted {moved} rows to HNSW | {os.path.dirname(flat.dir)}")
@@ -0,0 +1,155 @@
+# backend/app/ledger.py
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from .db import DB_PATH
+
+# -----------------------------
+# 설정(ENV로 오버라이드 가능)
+# -----------------------------
+LEDGER_ENABLED = os.getenv("INGEST_LEDGER", "1") not in ("0", "false", "False")
+LEDGER_REFETCH_SEC = float(os.getenv("LEDGER_REFETCH_SEC", str(6 * 3600)))
+
+_TRACKING_PREFIXES = ("utm_",)
+_TRACKING_PARAMS = frozenset({"fbclid", "gclid", "ocid", "ref", "ref_src"})
+
+def _is_tracking(key: str) -> bool:
+    k = key.lower()
+    return k in _TRACKING_PARAMS or k.startswith(_TRACKING_PREFIXES)
+
+def canonical_url(url: str) -> str:
+    """스킴/호스트 소문자, fragment·추적 파라미터 제거, 끝 슬래시 정리."""
+    p = urlparse((url or "").strip())
+    query = [(k, v) for k, v in parse_qsl(p.query, keep_blank_values=True)
+             if not _is_tracking(k)]
+    path = p.path.rstrip("/") or "/"
+    return urlunparse((p.scheme.lower(), p.netloc.lower(), path, "", urlencode(query), ""))
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(" ".join((text or "").split()).encode("utf-8")).hexdigest()
+
+def _scope(conversation_id: Optional[str]) -> str:
+    return conversation_id or ""
+
+class IngestLedger:
+    """URL 단위 적재 기록: (정규화 URL, 대화 범위) → 본문 해시, 청크 id, 적재 시각."""
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS ingest_ledger (
+                url TEXT NOT NULL,
+                scope TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                chunk_ids TEXT NOT NULL,
+                title TEXT,
+                ingested_at REAL NOT NULL,
+                PRIMARY KEY (url, scope)
+            )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ingest_ledger_url ON ingest_ledger(url, ingested_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _row(r) -> dict:
+        return {
+            "url": r[0], "scope": r[1], "content_hash": r[2],
+            "chunk_ids": json.loads(r[3]), "title": r[4], "ingested_at": r[5],
+        }
+
+    def get(self, url: str, conversation_id: Optional[str]) -> Optional[dict]:
+        with self._lock:
+            r = self._db().execute(
+                "SELECT url, scope, content_hash, chunk_ids, title, ingested_at "
+                "FROM ingest_ledger WHERE url = ? AND scope = ?",
+                (canonical_url(url), _scope(conversation_id)),
+            ).fetchone()
+        return self._row(r) if r else None
+
+    def latest_elsewhere(self, url: str, conversation_id: Optional[str]) -> Optional[dict]:
+        """다른 대화 범위에 같은 URL이 이미 적재돼 있으면 가장 최근 것."""
+        with self._lock:
+            r = self._db().execute(
+                "SELECT url, scope, content_hash, chunk_ids, title, ingested_at "
+                "FROM ingest_ledger WHERE url = ? AND scope != ? "
+                "ORDER BY ingested_at DESC LIMIT 1",
+                (canonical_url(url), _scope(conversation_id)),
+            ).fetchone()
+        return self._row(r) if r else None
+
+    def record(self, url: str, conversation_id: Optional[str], digest: str,
+               chunk_ids: List[str], title: str = "") -> None:
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO ingest_ledger "
+                "(url, scope, content_hash, chunk_ids, title, ingested_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (canonical_url(url), _scope(conversation_id), digest,
+                 json.dumps(chunk_ids), title, time.time()),
+            )
+            db.commit()
+
+    def touch(self, url: str, conversation_id: Optional[str]) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "UPDATE ingest_ledger SET ingested_at = ? WHERE url = ? AND scope = ?",
+                (time.time(), canonical_url(url), _scope(conversation_id)),
+            )
+            db.commit()
+
+    def forget_scope(self, conversation_id: Optional[str]) -> int:
+        with self._lock:
+            db = self._db()
+            if conversation_id:
+                cur = db.execute("DELETE FROM ingest_ledger WHERE scope = ?", (_scope(conversation_id),))
+            else:
+                cur = db.execute("DELETE FROM ingest_ledger")
+            db.commit()
+            return cur.rowcount
+
+    def remap_chunk_ids(self, conversation_id: Optional[str], fn) -> int:
+        """범위 안 모든 기록의 청크 id를 fn(id)로 바꿈 (저장 방식 마이그레이션용)."""
+        with self._lock:
+            db = self._db()
+            rows = db.execute(
+                "SELECT url, chunk_ids FROM ingest_ledger WHERE scope = ?", (_scope(conversation_id),)
+            ).fetchall()
+            db.executemany(
+                "UPDATE ingest_ledger SET chunk_ids = ? WHERE url = ? AND scope = ?",
+                [(json.dumps([fn(c) for c in json.loads(ids)]), url, _scope(conversation_id))
+                 for url, ids in rows],
+            )
+            db.commit()
+            return len(rows)
+
+    def is_fresh(self, entry: Optional[dict]) -> bool:
+        return entry is not None and (time.time() - entry["ingested_at"]) < LEDGER_REFETCH_SEC
+
+_LEDGER: Optional[IngestLedger] = None
+_LEDGER_LOCK = threading.Lock()
+
+def get_ledger() -> Optional[IngestLedger]:
+    global _LEDGER
+    if not LEDGER_ENABLED:
+        return None
+    if _LEDGER is None:
+        with _LEDGER_LOCK:
+            if _LEDGER is None:
+                _LEDGER = IngestLedger()
+    return _LEDGER
@@ -0,0 +1,211 @@
+# backend/app/lexical.py
+from __future__ import annotations
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from langchain_community.docstore.document import Document
+
+from .vs_cache import HandleCache
+
+# -----------------------------
+# 설정(ENV로 오버라이드 가능)
+# -----------------------------
+HYBRID_ENABLED = os.getenv("HYBRID_SEARCH", "1") not in ("0", "false", "False")
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+LEXICAL_FILE = "lexical.sqlite3"
+# 열린 sqlite 연결 수 상한 (persist 디렉터리별 하나, 벡터스토어 캐시와 같은 기본값)
+LEXICAL_CACHE_SIZE = int(os.getenv("LEXICAL_CACHE_SIZE", os.getenv("VS_CACHE_SIZE", "128")))
+LEXICAL_CACHE_TTL_SEC = float(os.getenv("LEXICAL_CACHE_TTL_SEC", os.getenv("VS_CACHE_TTL_SEC", "900")))
+
+# -----------------------------
+# 토크나이저: 한글은 문자 bigram, 영문/숫자는 단어 그대로(티커·수치 보존)
+# -----------------------------
+_TOKEN_PAT = re.compile(r"[가-힣]+|[A-Za-z0-9][A-Za-z0-9.\-]*")
+
+def tokenize(text: str) -> List[str]:
+    out: List[str] = []
+    for m in _TOKEN_PAT.finditer(text or ""):
+        w = m.group(0)
+        if "가" <= w[0] <= "힣":
+            if len(w) == 1:
+                out.append(w)
+            else:
+                out.extend(w[i:i + 2] for i in range(len(w) - 1))
+        else:
+            out.append(w.lower().rstrip(".-"))
+    return [t for t in out if t]
+
+# -----------------------------
+# 대화 범위별 역색인 (Chroma persist 디렉터리 옆 sqlite)
+#  - 공유 컬렉션 모드에서는 파일 하나에 scope 컬럼으로 구분
+# -----------------------------
+class LexicalIndex:
+    def __init__(self, persist_dir: str):
+        self.path = os.path.join(persist_dir, LEXICAL_FILE)
+        self.backfill_checked = False  # rag._lexical: 도입 전 청크 채우기를 이 핸들에서 확인했나
+        self._lock = threading.Lock()
+        os.makedirs(persist_dir, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS lex_docs (
+            id TEXT PRIMARY KEY,
+            content TEXT NOT NULL,
+            metadata TEXT NOT NULL,
+            length INTEGER NOT NULL
+        )
+        """)
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS lex_postings (
+            term TEXT NOT NULL,
+            id TEXT NOT NULL,
+            tf INTEGER NOT NULL,
+            PRIMARY KEY (term, id)
+        ) WITHOUT ROWID
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_lex_postings_id ON lex_postings(id)")
+        # 공유 컬렉션 모드: 대화 범위 컬럼 (이전 파일은 기본값 ''로 보강)
+        for table in ("lex_docs", "lex_postings"):
+            cols = {r[1] for r in self._conn.execute(f"PRAGMA table_info({table})")}
+            if "scope" not in cols:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN scope TEXT NOT NULL DEFAULT ''")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_lex_docs_scope ON lex_docs(scope)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_lex_postings_scope ON lex_postings(scope, term)")
+        self._conn.commit()
+
+    def add(self, ids: Sequence[str], contents: Sequence[str], metadatas: Sequence[dict],
+            scope: str = "") -> int:
+        """증분 추가(같은 id는 교체)."""
+        with self._lock:
+            db = self._conn
+            for cid, text, meta in zip(ids, contents, metadatas):
+                tf = Counter(tokenize(text))
+                db.execute("DELETE FROM lex_postings WHERE id = ?", (cid,))
+                db.execute(
+                    "INSERT OR REPLACE INTO lex_docs (id, content, metadata, length, scope) VALUES (?, ?, ?, ?, ?)",
+                    (cid, text, json.dumps(meta or {}, ensure_ascii=False), sum(tf.values()), scope),
+                )
+                db.executemany(
+                    "INSERT INTO lex_postings (term, id, tf, scope) VALUES (?, ?, ?, ?)",
+                    [(t, cid, n, scope) for t, n in tf.items()],
+                )
+            db.commit()
+        return len(ids)
+
+    def search(self, query: str, k: int,
+               scope: Optional[Union[str, Sequence[str]]] = None) -> List[Tuple[Document, float]]:
+        """BM25 상위 k개. scope(하나 또는 여러 개)가 주어지면 그 대화 범위 안에서만(통계도 범위 기준)."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        scopes = [scope] if isinstance(scope, str) else list(scope) if scope is not None else []
+        marks = ", ".join("?" * len(scopes))
+        where, args = (f"WHERE scope IN ({marks})", tuple(scopes)) if scopes else ("", ())
+        with self._lock:
+            db = self._conn
+            n_docs, total_len = db.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(length), 0) FROM lex_docs {where}", args
+            ).fetchone()
+            if not n_docs:
+                return []
+            avgdl = total_len / n_docs
+            scores: Dict[str, float] = {}
+            lengths: Dict[str, int] = {}
+            for t in terms:
+                rows = db.execute(
+                    "SELECT p.id, p.tf, d.length FROM lex_postings p JOIN lex_docs d ON d.id = p.id "
+                    "WHERE p.term = ?" + (f" AND p.scope IN ({marks})" if scopes else ""),
+                    (t, *args),
+                ).fetchall()
+                if not rows:
+                    continue
+                idf = math.log(1 + (n_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+                for cid, tf, dl in rows:
+                    lengths[cid] = dl
+                    denom = tf + BM25_K1 * (1 - BM25_B + BM25_B * dl / (avgdl or 1))
+                    scores[cid] = scores.get(cid, 0.0) + idf * tf * (BM25_K1 + 1) / denom
+            top = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:k]
+            out: List[Tuple[Document, float]] = []
+            for cid, sc in top:
+                r = db.execute("SELECT content, metadata FROM lex_docs WHERE id = ?", (cid,)).fetchone()
+                if r:
+                    out.append((Document(page_content=r[0], metadata=json.loads(r[1])), sc))
+        return out
+
+    def count(self, scope: Optional[str] = None) -> int:
+        with self._lock:
+            if scope is None:
+                return int(self._conn.execute("SELECT COUNT(*) FROM lex_docs").fetchone()[0])
+            return int(self._conn.execute(
+                "SELECT COUNT(*) FROM lex_docs WHERE scope = ?", (scope,)
+            ).fetchone()[0])
+
+    def delete(self, ids: Sequence[str]) -> int:
+        with self._lock:
+            db = self._conn
+            db.executemany("DELETE FROM lex_postings WHERE id = ?", [(c,) for c in ids])
+            n = db.executemany("DELETE FROM lex_docs WHERE id = ?", [(c,) for c in ids]).rowcount
+            db.commit()
+            return n
+
+    def delete_scope(self, scope: str) -> int:
+        with self._lock:
+            db = self._conn
+            db.execute("DELETE FROM lex_postings WHERE scope = ?", (scope,))
+            n = db.execute("DELETE FROM lex_docs WHERE scope = ?", (scope,)).rowcount
+            db.commit()
+            return n
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+def _close(idx: LexicalIndex) -> None:
+    idx.close()
+
+# persist 디렉터리 → 색인 핸들 (LRU + idle-TTL, 축출된 연결은 유예 후 닫힘)
+_INDEXES = HandleCache(
+    opener=LexicalIndex,
+    closer=_close,
+    max_size=LEXICAL_CACHE_SIZE,
+    idle_ttl=LEXICAL_CACHE_TTL_SEC,
+)
+
+def get_index(persist_dir: str) -> LexicalIndex:
+    return _INDEXES.get(os.path.abspath(persist_dir))
+
+def close_index(persist_dir: Optional[str] = None) -> None:
+    """persist_dir 하위(또는 전체) 색인 핸들을 닫는다. 디렉터리 삭제 전에 호출."""
+    if persist_dir is None:
+        _INDEXES.clear()
+        return
+    root = os.path.abspath(persist_dir)
+    _INDEXES.invalidate_where(lambda k: k == root or k.startswith(root + os.sep))
+
+# -----------------------------
+# Reciprocal Rank Fusion
+# -----------------------------
+def _doc_key(d: Document) -> Tuple[str, str]:
+    return (str(d.metadata.get("source", "")), d.page_content)
+
+def rrf_fuse(rankings: Sequence[Sequence[Document]], k: int, rrf_k: int = RRF_K) -> List[Document]:
+    scores: Dict[Tuple[str, str], float] = {}
+    first: Dict[Tuple[str, str], Document] = {}
+    for ranking in rankings:
+        for rank, d in enumerate(ranking):
+            key = _doc_key(d)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank + 1)
+            first.setdefault(key, d)
+    order = sorted(scores, key=lambda key: scores[key], reverse=True)
+    return [first[key] for key in order[:k]]
@@ -0,0 +1,369 @@
+# backend/app/llm_gateway.py
+from __future__ import annotations
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Deque, Iterator, List, Optional
+
+import httpx
+
+from . import metrics
+
+# -----------------------------
+# 설정(ENV로 오버라이드 가능)
+# -----------------------------
+MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4o-mini")
+LLM_TIMEOUT_SEC = float(os.getenv("LLM_TIMEOUT_SEC", "60"))            # 요청 전체 마감(재시도 포함)
+LLM_ATTEMPT_TIMEOUT_SEC = float(os.getenv("LLM_ATTEMPT_TIMEOUT_SEC", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_BASE_SEC = float(os.getenv("LLM_BACKOFF_BASE_SEC", "0.5"))
+LLM_BACKOFF_MAX_SEC = float(os.getenv("LLM_BACKOFF_MAX_SEC", "8"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+# 헤징: 응답이 최근 지연의 p분위수를 넘기면 같은 요청을 하나 더 보내 먼저 온 것을 사용
+LLM_HEDGE = os.getenv("LLM_HEDGE", "0") in ("1", "true", "True")
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_MIN_DELAY_SEC = float(os.getenv("LLM_HEDGE_MIN_DELAY_SEC", "1.0"))
+
+class LLMError(Exception):
+    """재시도/마감 후에도 실패. reason: timeout | rate_limited | upstream | client"""
+    def __init__(self, reason: str, cause: Optional[BaseException] = None):
+        super().__init__(f"{reason}: {cause}" if cause else reason)
+        self.reason = reason
+        self.cause = cause
+
+# -----------------------------
+# 오류 분류 / 백오프
+# -----------------------------
+def _status(e: BaseException) -> Optional[int]:
+    code = getattr(e, "status_code", None)
+    if code is None:
+        resp = getattr(e, "response", None)
+        code = getattr(resp, "status_code", None)
+    return code
+
+def _retryable(e: BaseException) -> bool:
+    code = _status(e)
+    if code is not None:
+        return code == 429 or code >= 500
+    # 연결 끊김/타임아웃 (openai.APIConnectionError, APITimeoutError, httpx.TransportError)
+    return type(e).__name__ in ("APIConnectionError", "APITimeoutError") or isinstance(e, httpx.TransportError)
+
+def _reason(e: BaseException) -> str:
+    code = _status(e)
+    if code == 429:
+        return "rate_limited"
+    if code is not None and code >= 500:
+        return "upstream"
+    if type(e).__name__ == "APITimeoutError" or isinstance(e, (httpx.TimeoutException, TimeoutError)):
+        return "timeout"
+    return "client" if code is not None else "upstream"
+
+def _backoff(attempt: int, e: BaseException) -> float:
+    resp = getattr(e, "response", None)
+    retry_after = None
+    try:
+        retry_after = float(resp.headers.get("retry-after"))  # type: ignore[union-attr]
+    except Exception:
+        pass
+    cap = min(LLM_BACKOFF_MAX_SEC, LLM_BACKOFF_BASE_SEC * (2 ** attempt))
+    delay = random.uniform(0, cap)  # full jitter
+    return max(delay, retry_after or 0.0)
+
+# -----------------------------
+# 최근 지연 분포 (헤징 기준)
+# -----------------------------
+class _Latency:
+    def __init__(self, size: int = 200):
+        self._buf: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, sec: float) -> None:
+        with self._lock:
+            self._buf.append(sec)
+
+    def hedge_delay(self) -> Optional[float]:
+        with self._lock:
+            if len(self._buf) < LLM_HEDGE_MIN_SAMPLES:
+                return None
+            xs = sorted(self._buf)
+        q = xs[min(len(xs) - 1, int(LLM_HEDGE_PERCENTILE * len(xs)))]
+        return max(LLM_HEDGE_MIN_DELAY_SEC, q)
+
+_LATENCY = _Latency()
+
+def _event(outcome: str) -> None:
+    metrics.LLM_CALLS.inc(outcome=outcome)
+
+# -----------------------------
+# 동기 게이트웨이 (스레드에서 호출되는 rag 경로)
+# -----------------------------
+_sync_client = None
+_sync_lock = threading.Lock()
+_sync_sem = threading.BoundedSemaphore(max(1, LLM_MAX_CONCURRENCY))
+_hedge_pool = ThreadPoolExecutor(max_workers=max(2, LLM_MAX_CONCURRENCY), thread_name_prefix="llm")
+
+def client():
+    """프로세스 전역 OpenAI 클라이언트 (연결 풀 재사용, SDK 자체 재시도는 끔)."""
+    global _sync_client
+    if _sync_client is None:
+        with _sync_lock:
+            if _sync_client is None:
+                from openai import OpenAI
+                _sync_client = OpenAI(
+                    timeout=LLM_ATTEMPT_TIMEOUT_SEC,
+                    max_retries=0,
+                    http_client=httpx.Client(
+                        limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS,
+                                            max_keepalive_connections=LLM_MAX_CONNECTIONS),
+                        timeout=LLM_ATTEMPT_TIMEOUT_SEC,
+                    ),
+                )
+    return _sync_client
+
+def _create(kwargs: dict, timeout: float):
+    if not _sync_sem.acquire(timeout=max(0.0, timeout)):
+        raise LLMError("timeout", TimeoutError("LLM concurrency limit wait exceeded"))
+    return _create_held(kwargs, timeout)
+
+def _create_held(kwargs: dict, timeout: float):
+    """슬롯(_sync_sem)을 이미 잡은 상태에서 호출 → 끝나면 반납."""
+    try:
+        return client().chat.completions.create(**kwargs, timeout=timeout)
+    finally:
+        _sync_sem.release()
+
+def _create_hedged(kwargs: dict, timeout: float):
+    delay = _LATENCY.hedge_delay() if LLM_HEDGE else None
+    if delay is None or delay >= timeout:
+        return _create(kwargs, timeout)
+    first = _hedge_pool.submit(_create, kwargs, timeout)
+    done, _ = wait([first], timeout=delay)
+    if done:
+        return first.result()
+    # 동기 호출은 진 쪽을 취소할 수 없어(슬롯·스레드를 끝까지 잡음) 빈 슬롯이 있을 때만 헤징
+    #  → 혼잡할 때 헤지가 다른 요청의 자리를 빼앗거나 슬롯을 기다리며 쌓이지 않음
+    if not _sync_sem.acquire(blocking=False):
+        _event("hedge_skipped")
+        return first.result()
+    _event("hedge")
+    second = _hedge_pool.submit(_create_held, kwargs, max(0.0, timeout - delay))
+    pending = {first, second}
+    err: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for f in done:
+            try:
+                res = f.result()
+            except BaseException as e:  # 다른 쪽이 성공할 수 있으므로 보류
+                err = e
+                continue
+            if f is second:
+                _event("hedge_win")
+            return res  # 진 쪽은 백그라운드에서 끝나도록 둠
+    raise err  # type: ignore[misc]
+
+def _messages_kwargs(messages: List[dict], model: Optional[str], **kw: Any) -> dict:
+    return {"model": model or MODEL_NAME, "messages": messages, **kw}
+
+def chat(
+    messages: List[dict],
+    model: Optional[str] = None,
+    temperature: float = 0.2,
+    max_tokens: int = 500,
+    deadline_sec: Optional[float] = None,
+) -> str:
+    kwargs = _messages_kwargs(messages, model, temperature=temperature, max_tokens=max_tokens)
+    deadline = time.monotonic() + (deadline_sec or LLM_TIMEOUT_SEC)
+    attempt = 0
+    while True:
+        left = deadline - time.monotonic()
+        if left <= 0:
+            _event("deadline")
+            raise LLMError("timeout")
+        t0 = time.perf_counter()
+        try:
+            comp = _create_hedged(kwargs, min(left, LLM_ATTEMPT_TIMEOUT_SEC))
+        except LLMError:
+            _event("error")
+            raise
+        except Exception as e:
+            if not _retryable(e) or attempt >= LLM_MAX_RETRIES:
+                _event("error")
+                raise LLMError(_reason(e), e) from e
+            pause = _backoff(attempt, e)
+            if time.monotonic() + pause >= deadline:
+                _event("deadline")
+                raise LLMError(_reason(e), e) from e
+            _event("retry")
+            attempt += 1
+            time.sleep(pause)
+            continue
+        _LATENCY.add(time.perf_counter() - t0)
+        _event("ok")
+        return (comp.choices[0].message.content or "").strip()
+
+def chat_stream(
+    messages: List[dict],
+    model: Optional[str] = None,
+    temperature: float = 0.2,
+    max_tokens: int = 500,
+    deadline_sec: Optional[float] = None,
+) -> Iterator[str]:
+    """토큰 조각을 내보냄. 재시도는 첫 조각이 나오기 전까지만 (중복 출력 방지)."""
+    kwargs = _messages_kwargs(messages, model, temperature=temperature, max_tokens=max_tokens, stream=True)
+    deadline = time.monotonic() + (deadline_sec or LLM_TIMEOUT_SEC)
+    attempt = 0
+    while True:
+        left = deadline - time.monotonic()
+        if left <= 0:
+            _event("deadline")
+            raise LLMError("timeout")
+        if not _sync_sem.acquire(timeout=left):
+            raise LLMError("timeout", TimeoutError("LLM concurrency limit wait exceeded"))
+        started = False
+        try:
+            stream = client().chat.completions.create(**kwargs, timeout=min(left, LLM_ATTEMPT_TIMEOUT_SEC))
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ""
+                if delta:
+                    started = True
+                    yield delta
+            _event("ok")
+            return
+        except Exception as e:
+            if started or not _retryable(e) or attempt >= LLM_MAX_RETRIES:
+                _event("error")
+                raise LLMError(_reason(e), e) from e
+            pause = _backoff(attempt, e)
+            if time.monotonic() + pause >= deadline:
+                _event("deadline")
+                raise LLMError(_reason(e), e) from e
+            _event("retry")
+            attempt += 1
+        finally:
+            _sync_sem.release()
+        time.sleep(pause)
+
+def close() -> None:
+    global _sync_client
+    if _sync_client is not None:
+        try:
+            _sync_client.close()
+        except Exception:
+            pass
+        _sync_client = None
+
+# -----------------------------
+# 비동기 게이트웨이 (rag_async / FastAPI 이벤트 루프)
+# -----------------------------
+_async_client = None
+_async_sem: Optional[asyncio.Semaphore] = None
+
+def aclient():
+    global _async_client
+    if _async_client is None:
+        from openai import AsyncOpenAI
+        _async_client = AsyncOpenAI(
+            timeout=LLM_ATTEMPT_TIMEOUT_SEC,
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS,
+                                    max_keepalive_connections=LLM_MAX_CONNECTIONS),
+                timeout=LLM_ATTEMPT_TIMEOUT_SEC,
+            ),
+        )
+    return _async_client
+
+def _asem() -> asyncio.Semaphore:
+    global _async_sem
+    if _async_sem is None:
+        _async_sem = asyncio.Semaphore(max(1, LLM_MAX_CONCURRENCY))
+    return _async_sem
+
+async def _acreate(kwargs: dict, timeout: float):
+    async with _asem():
+        return await asyncio.wait_for(aclient().chat.completions.create(**kwargs), timeout)
+
+async def _acreate_hedged(kwargs: dict, timeout: float):
+    delay = _LATENCY.hedge_delay() if LLM_HEDGE else None
+    first = asyncio.ensure_future(_acreate(kwargs, timeout))
+    if delay is None or delay >= timeout:
+        return await first
+    done, _ = await asyncio.wait({first}, timeout=delay)
+    if done:
+        return first.result()
+    _event("hedge")
+    second = asyncio.ensure_future(_acreate(kwargs, timeout - delay))
+    pending = {first, second}
+    err: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is not None:
+                    err = f.exception()
+                    continue
+                if f is second:
+                    _event("hedge_win")
+                return f.result()
+    finally:
+        for f in pending:
+            f.cancel()  # 진 쪽 요청은 취소 (연결 반환)
+    raise err  # type: ignore[misc]
+
+async def achat(
+    messages: List[dict],
+    model: Optional[str] = None,
+    temperature: float = 0.2,
+    max_tokens: int = 500,
+    deadline_sec: Optional[float] = None,
+) -> str:
+    kwargs = _messages_kwargs(messages, model, temperature=temperature, max_tokens=max_tokens)
+    deadline = time.monotonic() + (deadline_sec or LLM_TIMEOUT_SEC)
+    attempt = 0
+    while True:
+        left = deadline - time.monotonic()
+        if left <= 0:
+            _event("deadline")
+            raise LLMError("timeout")
+        t0 = time.perf_counter()
+        try:
+            comp = await _acreate_hedged(kwargs, min(left, LLM_ATTEMPT_TIMEOUT_SEC))
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError as e:
+            e_: BaseException = e
+            retry = attempt < LLM_MAX_RETRIES
+        except Exception as e:
+            e_ = e
+            retry = _retryable(e) and attempt < LLM_MAX_RETRIES
+        else:
+            _LATENCY.add(time.perf_counter() - t0)
+            _event("ok")
+            return (comp.choices[0].message.content or "").strip()
+        reason = "timeout" if isinstance(e_, asyncio.TimeoutError) else _reason(e_)
+        pause = _backoff(attempt, e_) if retry else 0.0
+        if not retry or time.monotonic() + pause >= deadline:
+            _event("error" if not retry else "deadline")
+            raise LLMError(reason, e_) from e_
+        _event("retry")
+        attempt += 1
+        await asyncio.sleep(pause)
+
+async def aclose() -> None:
+    global _async_client, _async_sem
+    if _async_client is not None:
+        try:
+            await _async_client.close()
+        except Exception:
+            pass
+        _async_client = None
+    _async_sem = None
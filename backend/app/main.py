@@ -1,13 +1,22 @@
 # backend/app/main.py
-import os, traceback
+import os, json, time, asyncio, threading, traceback
 from typing import Optional
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 
-from .schemas import QueryRequest, QueryResponse, CrawlReq, ClearReq, Source
-from .rag import answer_with_live, vector_stats, debug_fetch_links, clear_vectorstore
+from .schemas import QueryRequest, QueryResponse, CrawlReq, ClearReq, Source, WatchReq, BookmarkReq
+from .rag import (
+    stream_answer_with_live, vector_stats, debug_fetch_links, clear_vectorstore,
+)
+from .rag_async import answer_with_live_async, aclose as rag_async_close
+from . import embeddings, answer_cache, metrics, analyzer, llm_gateway
+from .watchlist import WATCHLIST_ENABLED, get_scheduler
+from .driver_pool import resolve_driver_path
+from .crawler_google import close_driver_pools, close_link_discovery
+from .extract_router import get_router as get_extract_router
+from . import db
 
 ENV_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".env"))
 if os.path.exists(ENV_PATH):
@@ -25,19 +34,99 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+def _warmup():
+    db.init_db()
+    # 임베딩 모델을 미리 로드해 첫 질의 지연 제거
+    if embeddings.EMBED_WARMUP:
+        embeddings.warmup()
+    # chromedriver 경로는 시작 시 1회만 해석(백그라운드)
+    threading.Thread(target=resolve_driver_path, daemon=True).start()
+    # 분석 모델은 적재 시 사용할 때만 백그라운드로 미리 로드
+    if analyzer.ANALYZE_ON_INGEST:
+        analyzer.preload()
+    # 관심 검색어 백그라운드 크롤
+    if WATCHLIST_ENABLED:
+        get_scheduler().start()
+
+@app.on_event("shutdown")
+async def _shutdown():
+    await rag_async_close()
+    if WATCHLIST_ENABLED:
+        get_scheduler().stop()
+    close_driver_pools()
+    close_link_discovery()
+    get_extract_router().close()
+    llm_gateway.close()
+    db.close_db()
+
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
 
+@app.get("/metrics")
+def metrics_ep():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/vector/stats")
 def vector_stats_ep():
     return vector_stats()
 
+@app.get("/cache/answers/stats")
+def answer_cache_stats_ep():
+    return answer_cache.stats()
+
+@app.get("/extract/routes")
+def extract_routes_ep(limit: int = 200):
+    return get_extract_router().stats(limit)
+
 @app.post("/vector/clear")
 def vector_clear_ep(req: ClearReq):
     n = clear_vectorstore(req.conversation_id)
     return {"cleared": n}
 
+def _rows(rows) -> dict:
+    items = [
+        {"id": r[0], "question": r[1], "answer": r[2], "created_at": r[3], "conversation_id": r[4] or None}
+        for r in rows
+    ]
+    return {"items": items, "next_before": items[-1]["id"] if items else None}
+
+@app.get("/history")
+def history_ep(
+    conversation_id: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=200),
+    before: Optional[int] = Query(None, description="이 id보다 오래된 항목부터 (다음 페이지 커서)"),
+):
+    return _rows(db.get_history(limit, conversation_id, before))
+
+@app.get("/bookmark")
+def bookmark_list_ep(
+    conversation_id: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=200),
+    before: Optional[int] = Query(None),
+):
+    return _rows(db.get_bookmarks(limit, conversation_id, before))
+
+@app.post("/bookmark")
+def bookmark_add_ep(req: BookmarkReq):
+    return {"id": db.add_bookmark(req.question, req.answer, req.conversation_id)}
+
+@app.get("/watchlist")
+def watchlist_status_ep():
+    return get_scheduler().status()
+
+@app.post("/watchlist")
+def watchlist_add_ep(req: WatchReq):
+    try:
+        return get_scheduler().add(req.query, req.interval_sec)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+@app.delete("/watchlist")
+def watchlist_remove_ep(query: str = Query(..., description="검색어")):
+    return {"removed": get_scheduler().remove(query)}
+
 @app.get("/debug/crawl")
 def debug_crawl_get(
     q: str = Query(..., description="검색어"),
@@ -59,15 +148,32 @@ def debug_crawl_post(req: CrawlReq):
     except Exception as e:
         return {"error": str(e), "traceback": traceback.format_exc()}
 
+async def _cancel_on_disconnect(request: Request, task: asyncio.Task, interval: float = 0.5) -> None:
+    while not task.done():
+        if await request.is_disconnected():
+            print("[query] client disconnected → cancel")
+            task.cancel()
+            return
+        await asyncio.sleep(interval)
+
 @app.post("/query", response_model=QueryResponse)
-def query(req: QueryRequest):
-    try:
-        ans, ctx = answer_with_live(
+async def query(req: QueryRequest, request: Request):
+    t0 = time.perf_counter()
+    timings = metrics.start_request()  # create_task가 컨텍스트를 복사 → 같은 dict에 단계별 누적
+    task = asyncio.create_task(
+        answer_with_live_async(
             req.question, k=req.k, fast=req.fast, conversation_id=req.conversation_id
         )
+    )
+    watcher = asyncio.create_task(_cancel_on_disconnect(request, task))
+    try:
+        ans, ctx = await task
+        db.save_history(req.question, ans, req.conversation_id)  # write-behind, 대기 없음
         # pydantic 모델로 맞춰줌
         sources = [Source(**s) for s in ctx]
-        return QueryResponse(answer=ans, contexts=sources)
+        return QueryResponse(answer=ans, contexts=sources, timings=dict(timings) if req.timings else None)
+    except asyncio.CancelledError:
+        return JSONResponse(status_code=499, content={"answer": "", "contexts": [], "error": "cancelled"})
     except Exception as e:
         return JSONResponse(
             status_code=200,
@@ -78,3 +184,28 @@ def query(req: QueryRequest):
                 "traceback": traceback.format_exc(),
             },
         )
+    finally:
+        watcher.cancel()
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - t0, endpoint="/query")
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/query/stream")
+def query_stream(req: QueryRequest):
+    def gen():
+        try:
+            for event, data in stream_answer_with_live(
+                req.question, k=req.k, fast=req.fast, conversation_id=req.conversation_id
+            ):
+                if event == "done" and data.get("answer"):
+                    db.save_history(req.question, data["answer"], req.conversation_id)
+                yield _sse(event, data)
+        except Exception as e:
+            yield _sse("error", {"message": str(e), "traceback": traceback.format_exc()})
+
+    return StreamingResponse(
+        gen(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
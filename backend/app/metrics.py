@@ -0,0 +1,129 @@
+# backend/app/metrics.py
+from __future__ import annotations
+import contextlib
+import contextvars
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# -----------------------------
+# 최소 Prometheus 텍스트 포맷 레지스트리 (외부 의존성 없음)
+# -----------------------------
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_esc(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _esc(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, v in sorted(self._values.items()):
+                out.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {v}")
+        return out
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = _DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List[float]] = {}  # [bucket..., +Inf, sum]
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, v: float, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = [0.0] * (len(self.buckets) + 2)
+                self._values[key] = row
+            for i, b in enumerate(self.buckets):
+                if v <= b:
+                    row[i] += 1
+            row[-2] += 1
+            row[-1] += v
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, row in sorted(self._values.items()):
+                for i, b in enumerate(self.buckets):
+                    le = _fmt_labels(self.labelnames, key, 'le="%s"' % b)
+                    out.append(f"{self.name}_bucket{le} {row[i]}")
+                le = _fmt_labels(self.labelnames, key, 'le="+Inf"')
+                out.append(f"{self.name}_bucket{le} {row[-2]}")
+                out.append(f"{self.name}_sum{_fmt_labels(self.labelnames, key)} {row[-1]}")
+                out.append(f"{self.name}_count{_fmt_labels(self.labelnames, key)} {row[-2]}")
+        return out
+
+REGISTRY: List = []
+
+def render() -> str:
+    lines: List[str] = []
+    for m in REGISTRY:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+# -----------------------------
+# 파이프라인 지표
+# -----------------------------
+STAGE_SECONDS = Histogram("rag_stage_seconds", "Time spent per pipeline stage", ["stage"])
+REQUEST_SECONDS = Histogram("rag_request_seconds", "End-to-end request latency", ["endpoint"])
+BYTES_FETCHED = Counter("rag_bytes_fetched_total", "Bytes downloaded from news sources", ["source"])
+CHUNKS_STORED = Counter("rag_chunks_stored_total", "Chunks embedded and stored", ["mode"])
+CACHE_EVENTS = Counter("rag_cache_events_total", "Cache lookups by cache and result", ["cache", "result"])
+EXTRACT_RESULTS = Counter("rag_extract_total", "Article extractions by method and outcome", ["method", "outcome"])
+LLM_CALLS = Counter("rag_llm_calls_total", "LLM gateway events (ok/retry/hedge/hedge_win/hedge_skipped/error/deadline)", ["outcome"])
+PROMPT_CONTEXT_TOKENS = Counter("rag_prompt_context_tokens_total", "Context tokens packed into LLM prompts")
+SINGLEFLIGHT = Counter("rag_singleflight_total", "Coalesced in-flight calls by kind and role", ["kind", "role"])
+
+def cache_event(cache: str, hit: bool) -> None:
+    CACHE_EVENTS.inc(cache=cache, result="hit" if hit else "miss")
+
+# -----------------------------
+# 단계 스팬 + 요청별 분해
+#   - 요청 시작 시 start_request()로 dict를 컨텍스트에 심고,
+#     span()은 히스토그램과 그 dict 양쪽에 누적한다
+#   - 스레드풀로 넘길 때는 contextvars.copy_context().run 으로 같은 dict 공유
+# -----------------------------
+_REQUEST: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("rag_request", default=None)
+
+def start_request() -> Dict[str, float]:
+    d: Dict[str, float] = {}
+    _REQUEST.set(d)
+    return d
+
+def current_timings() -> Optional[Dict[str, float]]:
+    return _REQUEST.get()
+
+def record(stage: str, sec: float) -> None:
+    STAGE_SECONDS.observe(sec, stage=stage)
+    d = _REQUEST.get()
+    if d is not None:
+        d[stage] = round(d.get(stage, 0.0) + sec, 6)
+
+@contextlib.contextmanager
+def span(stage: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - t0)
@@ -0,0 +1,216 @@
+# backend/app/neardup.py
+from __future__ import annotations
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .db import DB_PATH
+from .ledger import canonical_url
+
+# -----------------------------
+# 설정(ENV로 오버라이드 가능)
+# -----------------------------
+NEARDUP_ENABLED = os.getenv("NEARDUP", "1") not in ("0", "false", "False")
+NEARDUP_MAX_DISTANCE = int(os.getenv("NEARDUP_MAX_DISTANCE", "3"))  # 64bit SimHash 해밍 거리
+NEARDUP_SHINGLE = int(os.getenv("NEARDUP_SHINGLE", "4"))            # 문자 n-gram (한국어 형태소 없이도 동작)
+
+_BANDS = 4          # 64bit → 16bit x 4 밴드 (거리 ≤ 3이면 적어도 한 밴드는 정확히 일치)
+_BAND_BITS = 64 // _BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+_BIT_SHIFTS = np.arange(64, dtype=np.uint64)
+
+# -----------------------------
+# SimHash
+# -----------------------------
+def _shingles(text: str, n: int = NEARDUP_SHINGLE) -> List[str]:
+    t = "".join((text or "").split())  # 공백 차이 무시
+    if len(t) <= n:
+        return [t] if t else []
+    return [t[i:i + n] for i in range(len(t) - n + 1)]
+
+def simhash(text: str) -> int:
+    grams = _shingles(text)
+    if not grams:
+        return 0
+    hs = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "little") for g in grams),
+        dtype=np.uint64, count=len(grams),
+    )
+    bits = ((hs[:, None] >> _BIT_SHIFTS) & np.uint64(1)).astype(np.int32)
+    votes = (bits * 2 - 1).sum(axis=0)
+    out = 0
+    for i, v in enumerate(votes):
+        if v > 0:
+            out |= 1 << i
+    return out
+
+def hamming(a: int, b: int) -> int:
+    return bin((a ^ b) & 0xFFFFFFFFFFFFFFFF).count("1")
+
+def _to_signed(h: int) -> int:
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+def _to_unsigned(h: int) -> int:
+    return h + (1 << 64) if h < 0 else h
+
+def _bands(h: int) -> Tuple[int, ...]:
+    return tuple((h >> (i * _BAND_BITS)) & _BAND_MASK for i in range(_BANDS))
+
+# -----------------------------
+# 영속 인덱스 (finnews.db)
+# -----------------------------
+class NearDupIndex:
+    """본문/청크 SimHash 인덱스. kind='article' | 'chunk', 대화 범위별."""
+    def __init__(self, path: str = DB_PATH, max_distance: int = NEARDUP_MAX_DISTANCE):
+        self.path = path
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS neardup (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scope TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                hash INTEGER NOT NULL,
+                b0 INTEGER NOT NULL, b1 INTEGER NOT NULL, b2 INTEGER NOT NULL, b3 INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                ref TEXT,
+                created_at REAL NOT NULL
+            )
+            """)
+            for i in range(_BANDS):
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_neardup_b{i} ON neardup(scope, kind, b{i})")
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS url_alias (
+                alias TEXT NOT NULL,
+                scope TEXT NOT NULL,
+                url TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (alias, scope)
+            )
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def find(self, h: int, conversation_id: Optional[str], kind: str = "article") -> Optional[dict]:
+        bands = _bands(h)
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT hash, url, ref FROM neardup WHERE scope = ? AND kind = ? "
+                "AND (b0 = ? OR b1 = ? OR b2 = ? OR b3 = ?)",
+                (conversation_id or "", kind, *bands),
+            ).fetchall()
+        best = None
+        for (hv, url, ref) in rows:
+            d = hamming(h, _to_unsigned(hv))
+            if d <= self.max_distance and (best is None or d < best["distance"]):
+                best = {"url": url, "ref": ref, "distance": d}
+        return best
+
+    def add_many(self, items: Iterable[Tuple[int, str, Optional[str]]],
+                 conversation_id: Optional[str], kind: str) -> None:
+        now = time.time()
+        rows = [
+            (conversation_id or "", kind, _to_signed(h), *_bands(h), url, ref, now)
+            for (h, url, ref) in items
+        ]
+        if not rows:
+            return
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "INSERT INTO neardup (scope, kind, hash, b0, b1, b2, b3, url, ref, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            db.commit()
+
+    def forget_refs(self, refs: Iterable[str], conversation_id: Optional[str]) -> None:
+        """지워진 청크를 가리키는 청크 해시 제거 (다른 청크가 없는 id로 대신되지 않게)."""
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "DELETE FROM neardup WHERE scope = ? AND kind = 'chunk' AND ref = ?",
+                [(conversation_id or "", r) for r in refs],
+            )
+            db.commit()
+
+    def remap_refs(self, conversation_id: Optional[str], fn) -> int:
+        """범위 안 청크 해시의 ref(청크 id)를 fn(id)로 바꿈 (저장 방식 마이그레이션용)."""
+        scope = conversation_id or ""
+        with self._lock:
+            db = self._db()
+            rows = db.execute(
+                "SELECT id, ref FROM neardup WHERE scope = ? AND kind = 'chunk' AND ref IS NOT NULL", (scope,)
+            ).fetchall()
+            db.executemany("UPDATE neardup SET ref = ? WHERE id = ?", [(fn(ref), rid) for rid, ref in rows])
+            db.commit()
+            return len(rows)
+
+    def add_alias(self, alias: str, url: str, conversation_id: Optional[str]) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO url_alias (alias, scope, url, created_at) VALUES (?, ?, ?, ?)",
+                (canonical_url(alias), conversation_id or "", canonical_url(url), time.time()),
+            )
+            db.commit()
+
+    def forget_scope(self, conversation_id: Optional[str]) -> None:
+        with self._lock:
+            db = self._db()
+            if conversation_id:
+                db.execute("DELETE FROM neardup WHERE scope = ?", (conversation_id,))
+                db.execute("DELETE FROM url_alias WHERE scope = ?", (conversation_id,))
+            else:
+                db.execute("DELETE FROM neardup")
+                db.execute("DELETE FROM url_alias")
+            db.commit()
+
+_INDEX: Optional[NearDupIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+def get_index() -> Optional[NearDupIndex]:
+    global _INDEX
+    if not NEARDUP_ENABLED:
+        return None
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                _INDEX = NearDupIndex()
+    return _INDEX
+
+# -----------------------------
+# 검색 시점 중복 접기
+# -----------------------------
+def collapse(docs: list, max_distance: int = NEARDUP_MAX_DISTANCE) -> list:
+    """검색 결과 중 거의 같은 청크는 첫 번째(상위)만 남기고,
+    접힌 출처는 metadata['aliases']에 붙인다."""
+    kept: list = []
+    hashes: List[int] = []
+    for d in docs:
+        h = simhash(d.page_content)
+        dup_of = next((i for i, k in enumerate(hashes) if hamming(h, k) <= max_distance), None)
+        if dup_of is None:
+            kept.append(d)
+            hashes.append(h)
+            continue
+        src = d.metadata.get("source", "")
+        head = kept[dup_of]
+        if src and src != head.metadata.get("source"):
+            aliases = [a for a in str(head.metadata.get("aliases", "")).split("\n") if a]
+            if src not in aliases:
+                aliases.append(src)
+            head.metadata["aliases"] = "\n".join(aliases)
+    return kept
@@ -3,16 +3,28 @@ from __future__ import annotations
 import os
 import shutil
 import hashlib
-from typing import List, Tuple, Optional
+from typing import Callable, Iterable, Iterator, List, Tuple, Optional
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
 from langchain_community.docstore.document import Document
-from langchain_huggingface import HuggingFaceEmbeddings
 from dotenv import load_dotenv
 
 # Google-only 크롤러
 from .crawler_google import NaverNewsCrawler
+from .embeddings import get_embeddings
+from .vs_cache import HandleCache
+from .flat_store import FlatVectorStore, TieredStore, flat_exists
+from .fetch_pool import iter_extract
+from . import answer_cache
+from .ledger import content_hash, get_ledger
+from . import neardup
+from . import lexical
+from . import metrics
+from . import analyzer
+from . import context_pack
+from . import llm_gateway
+from .singleflight import SingleFlight, make_key
 
 load_dotenv()
 
@@ -35,18 +47,25 @@ MAX_LINKS = int(os.getenv("MAX_LINKS_PER_QUERY", "4"))
 TIME_BUDGET_SEC = float(os.getenv("TIME_BUDGET_SEC", "30"))
 MIN_CHARS = int(os.getenv("MIN_CHARS", "180"))
 
+VS_CACHE_SIZE = int(os.getenv("VS_CACHE_SIZE", "128"))
+VS_CACHE_TTL_SEC = float(os.getenv("VS_CACHE_TTL_SEC", "900"))
+VS_CLOSE_GRACE_SEC = float(os.getenv("VS_CLOSE_GRACE_SEC", "120"))  # 축출 후 닫기까지 유예(사용 중 핸들 보호)
+RETRIEVE_OVERFETCH = int(os.getenv("RETRIEVE_OVERFETCH", "4"))
+# 대화 질의도 전역 범위(워치리스트가 채우는 conversation_id=None)를 함께 검색
+RETRIEVE_GLOBAL = os.getenv("RETRIEVE_GLOBAL_SCOPE", "1") not in ("0", "false", "False")
+# per_conversation: 대화마다 persist 디렉터리/컬렉션 | shared: 컬렉션 하나 + scope 메타데이터 필터
+VS_LAYOUT = os.getenv("VS_LAYOUT", "per_conversation").lower()
+SHARED_VS = VS_LAYOUT == "shared"
+SCOPE_KEY = "scope"
+# chroma: 항상 sqlite+HNSW | flat: 작은 대화 저장소는 float16 memmap 정확 검색, 커지면 HNSW로 승격
+VS_BACKEND = os.getenv("VS_BACKEND", "chroma").lower()
+FLAT_PROMOTE_AT = int(os.getenv("FLAT_PROMOTE_AT", "5000"))
+
 # -----------------------------
-# 임베딩 (GPU/CPU 자동)
+# 임베딩 (GPU/CPU 자동, 프로세스당 1회 로드)
 # -----------------------------
 def _embeddings():
-    import torch
-    force_cpu = os.getenv("FORCE_CPU", "0") in ("1", "true", "True")
-    device = "cuda" if (torch.cuda.is_available() and not force_cpu) else "cpu"
-    print(f"[embeddings] device={device}, model={EMBED_MODEL}")
-    return HuggingFaceEmbeddings(
-        model_name=EMBED_MODEL,
-        model_kwargs={"device": device},
-    )
+    return get_embeddings(EMBED_MODEL)
 
 # -----------------------------
 # Chroma 영속화(버전 호환)
@@ -63,17 +82,66 @@ def _persist(vs) -> None:
     except Exception:
         pass
 
+def _close_vs(vs) -> None:
+    """캐시에서 축출될 때: flush 후 sqlite/HNSW 핸들 정리."""
+    _persist(vs)
+    try:
+        client = vs._client  # type: ignore[attr-defined]
+    except Exception:
+        return
+    close_client(client)
+
+def close_client(client) -> None:
+    """chromadb 클라이언트의 System 종료 (마이그레이션 도구에서도 사용)."""
+    try:
+        system = client._system  # type: ignore[attr-defined]
+    except Exception:
+        return
+    # chromadb는 경로별 System을 클래스 캐시에 보관 → 같이 빼야 재오픈 시 stop된 핸들을 안 받음
+    try:
+        try:
+            from chromadb.api.shared_system_client import SharedSystemClient
+        except ImportError:
+            from chromadb.api.client import SharedSystemClient  # type: ignore[no-redef]
+        reg = SharedSystemClient._identifier_to_system
+        for ident in [i for i, sysm in reg.items() if sysm is system]:
+            reg.pop(ident, None)
+    except Exception:
+        pass
+    try:
+        system.stop()
+    except Exception:
+        pass
+
 # -----------------------------
-# 벡터스토어(대화-ID별 분리)
+# 벡터스토어(대화-ID별 분리 또는 공유 컬렉션, 핸들은 LRU 캐시)
 # -----------------------------
-def _vs(conversation_id: Optional[str] = None):
-    if conversation_id:
-        persist_dir = os.path.join(CHROMA_DIR, conversation_id)
-        collection = f"{COLLECTION}__{conversation_id}"
-    else:
-        persist_dir = CHROMA_DIR
-        collection = COLLECTION
+def _scope(conversation_id: Optional[str]) -> str:
+    return conversation_id or ""
 
+def scoped_id(conversation_id: Optional[str], chunk_id: str) -> str:
+    """공유 컬렉션에서 같은 청크가 여러 대화에 들어가도 id가 겹치지 않게 ('<대화>:<청크 해시>')."""
+    base = chunk_id.rsplit(":", 1)[-1]
+    return f"{conversation_id}:{base}" if conversation_id else base
+
+def _read_scopes(conversation_id: Optional[str]) -> List[Optional[str]]:
+    """질의가 읽는 범위: 대화 범위 + 전역 범위(워치리스트 적재분)."""
+    if conversation_id and RETRIEVE_GLOBAL:
+        return [conversation_id, None]
+    return [conversation_id or None]
+
+def _scope_filter(conversation_id: Optional[str]) -> Optional[dict]:
+    if not SHARED_VS:
+        return None
+    scopes = [_scope(c) for c in _read_scopes(conversation_id)]
+    return {SCOPE_KEY: scopes[0]} if len(scopes) == 1 else {SCOPE_KEY: {"$in": scopes}}
+
+def _persist_dir(conversation_id: Optional[str] = None) -> str:
+    if SHARED_VS or not conversation_id:
+        return CHROMA_DIR
+    return os.path.join(CHROMA_DIR, conversation_id)
+
+def _open_chroma(persist_dir: str, collection: str):
     os.makedirs(persist_dir, exist_ok=True)
     return Chroma(
         collection_name=collection,
@@ -81,6 +149,47 @@ def _vs(conversation_id: Optional[str] = None):
         persist_directory=persist_dir,
     )
 
+def _open_vs(conversation_id: Optional[str] = None):
+    persist_dir = _persist_dir(conversation_id)
+    collection = f"{COLLECTION}__{conversation_id}" if conversation_id else COLLECTION
+
+    # 이미 Chroma 파일이 있는 저장소(기존/승격된 것)와 공유 컬렉션은 그대로 HNSW
+    use_flat = (
+        VS_BACKEND == "flat" and not SHARED_VS
+        and (flat_exists(persist_dir) or not os.path.exists(os.path.join(persist_dir, "chroma.sqlite3")))
+    )
+    if not use_flat:
+        return _open_chroma(persist_dir, collection)
+    return TieredStore(
+        FlatVectorStore(persist_dir, _embeddings()),
+        open_hnsw=lambda: _open_chroma(persist_dir, collection),
+        promote_at=FLAT_PROMOTE_AT,
+    )
+
+_VS_CACHE = HandleCache(
+    opener=_open_vs,
+    closer=_close_vs,
+    max_size=VS_CACHE_SIZE,
+    idle_ttl=VS_CACHE_TTL_SEC,
+    close_grace=VS_CLOSE_GRACE_SEC,
+)
+
+def _vs_key(conversation_id: Optional[str]):
+    # 공유 모드: 어느 대화든 루트 컬렉션 하나 (범위는 질의 시 필터)
+    return None if SHARED_VS else (conversation_id or None)
+
+def _vs(conversation_id: Optional[str] = None):
+    return _VS_CACHE.get(_vs_key(conversation_id))
+
+def _vs_lease(conversation_id: Optional[str] = None):
+    """오래 쥐고 쓰는 경우(크롤 전체)용: 블록이 끝날 때까지 축출돼도 닫히지 않음."""
+    return _VS_CACHE.lease(_vs_key(conversation_id))
+
+def _lexical_add(conversation_id: Optional[str], ids: List[str], texts: List[str], metas: List[dict]) -> None:
+    lexical.get_index(_persist_dir(conversation_id)).add(
+        ids, texts, metas, scope=_scope(conversation_id) if SHARED_VS else "",
+    )
+
 textsplitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=120)
 
 def _make_id(url: str, content: str, i: int) -> str:
@@ -95,65 +204,434 @@ def _make_id(url: str, content: str, i: int) -> str:
 # -----------------------------
 # 크롤 → 청크 → 저장
 # -----------------------------
+def _store_article(
+    vs, url: str, title: str, body: str, query: str, conversation_id: Optional[str] = None,
+    extra_meta: Optional[dict] = None,
+) -> int:
+    # 본문 해시가 원장과 같으면 분할/임베딩 생략
+    ledger = get_ledger()
+    digest = content_hash(body)
+    prev = None
+    if ledger is not None:
+        prev = ledger.get(url, conversation_id)
+        metrics.cache_event("ledger_hash", prev is not None and prev["content_hash"] == digest)
+        if prev is not None and prev["content_hash"] == digest:
+            ledger.touch(url, conversation_id)
+            print(f"[rag] unchanged (ledger): {title} | {url}")
+            return 0
+    # 본문이 바뀐 기사: 이전 판의 청크는 새 판 저장 뒤 지운다 (새 판과 id가 같은 건 제외)
+    old_ids = set(prev["chunk_ids"]) if prev is not None else set()
+
+    # 통신사 기사 재배포(거의 같은 본문)는 임베딩하지 않고 별칭만 기록
+    index = neardup.get_index()
+    body_hash = neardup.simhash(body) if index is not None else 0
+    if index is not None:
+        dup = index.find(body_hash, conversation_id, kind="article")
+        if dup is not None and dup["url"] != url:
+            index.add_alias(url, dup["url"], conversation_id)
+            # 원장에도 원본 기사의 청크로 기록 → 다음 크롤에서는 가져오기 전에 건너뜀
+            if ledger is not None:
+                orig = ledger.get(dup["url"], conversation_id)
+                ledger.record(url, conversation_id, digest, orig["chunk_ids"] if orig else [], title)
+            print(f"[rag] near-duplicate (d={dup['distance']}) of {dup['url']}: {title} | {url}")
+            return 0
+
+    with metrics.span("split"):
+        chunks = textsplitter.split_text(body)
+
+    docs: List[Document] = []
+    ids: List[str] = []
+    all_ids: List[str] = []  # 원장용: 거의 같은 청크는 이미 있는 청크 id로 대신
+    chunk_hashes: List[Tuple[int, str, Optional[str]]] = []
+    for i, ch in enumerate(chunks):
+        cid = _make_id(url, ch, i)
+        if SHARED_VS:
+            cid = scoped_id(conversation_id, cid)
+        if index is not None:
+            h = neardup.simhash(ch)
+            dup = index.find(h, conversation_id, kind="chunk")
+            # 곧 지울 이전 판 청크와 비슷한 건 대신할 수 없음 (똑같은 id면 그대로 유지)
+            if dup is not None and dup["ref"] and (dup["ref"] == cid or dup["ref"] not in old_ids):
+                all_ids.append(dup["ref"])
+                continue
+            chunk_hashes.append((h, url, cid))
+        all_ids.append(cid)
+        meta = {
+            "source": url, "title": title, "query": query, "chunk": i,
+            SCOPE_KEY: _scope(conversation_id), **(extra_meta or {}),
+        }
+        docs.append(Document(page_content=ch, metadata=meta))
+        ids.append(cid)
+
+    if docs:
+        texts = [d.page_content for d in docs]
+        metas = [d.metadata for d in docs]
+        # add_documents와 동일하지만 임베딩/업서트 시간을 따로 재기 위해 분리
+        with metrics.span("embed"):
+            vectors = _embeddings().embed_documents(texts)
+        with metrics.span("upsert"):
+            vs._collection.upsert(  # type: ignore[attr-defined]
+                ids=ids, embeddings=vectors, documents=texts, metadatas=metas,
+            )
+        with metrics.span("persist"):
+            _persist(vs)
+        metrics.CHUNKS_STORED.inc(len(docs), mode="embed")
+        if lexical.HYBRID_ENABLED:
+            _lexical_add(conversation_id, ids, texts, metas)
+        if index is not None:
+            index.add_many(chunk_hashes, conversation_id, kind="chunk")
+
+    stale = _owned_chunks(vs, url, sorted(old_ids.difference(all_ids)))
+    if stale:
+        _delete_chunks(vs, conversation_id, stale)
+        print(f"[rag] replaced {len(stale)} stale chunks: {title} | {url}")
+    # 청크가 전부 걸러져도 원장에는 남김 → 다음 크롤에서 다시 가져오지 않음
+    if ledger is not None:
+        ledger.record(url, conversation_id, digest, all_ids, title)
+    if index is not None:
+        index.add_many([(body_hash, url, None)], conversation_id, kind="article")
+    return len(docs)
+
+def _owned_chunks(vs, url: str, chunk_ids: List[str]) -> List[str]:
+    """원장의 청크 id 중 이 URL이 직접 저장한 것만 (다른 기사 청크를 대신 가리킨 id는 제외)."""
+    if not chunk_ids:
+        return []
+    try:
+        got = vs._collection.get(ids=chunk_ids, include=["metadatas"])  # type: ignore[attr-defined]
+    except Exception as e:
+        print(f"[rag][delete][error] {e}")
+        return []
+    return [cid for cid, m in zip(got["ids"], got["metadatas"]) if (m or {}).get("source") == url]
+
+def _delete_chunks(vs, conversation_id: Optional[str], chunk_ids: List[str]) -> None:
+    """벡터스토어·역색인·청크 SimHash에서 함께 삭제."""
+    try:
+        vs._collection.delete(ids=chunk_ids)  # type: ignore[attr-defined]
+        _persist(vs)
+        if lexical.HYBRID_ENABLED:
+            lexical.get_index(_persist_dir(conversation_id)).delete(chunk_ids)
+        index = neardup.get_index()
+        if index is not None:
+            index.forget_refs(chunk_ids, conversation_id)
+    except Exception as e:
+        print(f"[rag][delete][error] {e}")
+
+def _unchanged(url: str, body: str, conversation_id: Optional[str]) -> bool:
+    ledger = get_ledger()
+    prev = ledger.get(url, conversation_id) if ledger is not None else None
+    return prev is not None and prev["content_hash"] == content_hash(body)
+
+def _with_analysis(
+    items: Iterable[Tuple[str, str, str]], conversation_id: Optional[str],
+) -> Iterator[Tuple[str, str, str, Optional[dict]]]:
+    """선택: 기사 단위 감성/요약을 청크 메타데이터로.
+
+    ANALYZE_ON_INGEST면 크롤 한 번의 본문을 다 모아 analyze_many 한 번(배치 추론)으로 처리한 뒤
+    내보내고, 아니면 추출되는 대로 그대로 흘려보낸다. 저장될 일 없는 본문(짧음/원장과 같음)은 분석 생략.
+    """
+    if not analyzer.ANALYZE_ON_INGEST:
+        for url, title, body in items:
+            yield url, title, body, None
+        return
+    rows = list(items)
+    todo = [
+        i for i, (url, _t, body) in enumerate(rows)
+        if body and len(body) >= MIN_CHARS and not _unchanged(url, body, conversation_id)
+    ]
+    metas: dict = {}
+    if todo:
+        try:
+            with metrics.span("analyze"):
+                res = analyzer.analyze_many([rows[i][2] for i in todo])
+            metas = {i: {"sentiment": sen, "summary": summ} for i, (sen, summ) in zip(todo, res)}
+        except Exception as e:
+            print(f"[rag][analyze][error] {e}")
+    for i, (url, title, body) in enumerate(rows):
+        yield url, title, body, metas.get(i)
+
+def _copy_chunks(
+    src_conversation_id: Optional[str], dst_vs, chunk_ids: List[str],
+    dst_conversation_id: Optional[str] = None,
+) -> List[str]:
+    """다른 대화 범위에 이미 있는 청크를 임베딩째 복사(재임베딩 없음). 새 청크 id 반환."""
+    if not chunk_ids:
+        return []
+    src = _vs(src_conversation_id or None)
+    got = src._collection.get(  # type: ignore[attr-defined]
+        ids=chunk_ids, include=["embeddings", "documents", "metadatas"]
+    )
+    if not got.get("ids"):
+        return []
+    ids = list(got["ids"])
+    metas = [{**(m or {}), SCOPE_KEY: _scope(dst_conversation_id)} for m in got["metadatas"]]
+    if SHARED_VS:
+        # 같은 컬렉션 안에서 범위만 바꿔 한 벌 더 (임베딩은 그대로)
+        ids = [scoped_id(dst_conversation_id, i) for i in ids]
+    dst_vs._collection.upsert(  # type: ignore[attr-defined]
+        ids=ids,
+        embeddings=got["embeddings"],
+        documents=got["documents"],
+        metadatas=metas,
+    )
+    _persist(dst_vs)
+    metrics.CHUNKS_STORED.inc(len(ids), mode="copy")
+    if lexical.HYBRID_ENABLED:
+        _lexical_add(dst_conversation_id, ids, got["documents"], metas)
+    return ids
+
+def _reuse_known_links(
+    links: List[Tuple[str, str]], conversation_id: Optional[str], vs,
+) -> Tuple[List[Tuple[str, str]], int]:
+    """원장 확인: 이 범위에 최근 적재된 URL은 건너뛰고,
+    다른 범위에 있는 URL은 청크를 복사. 남은 링크만 실제로 가져온다."""
+    ledger = get_ledger()
+    if ledger is None:
+        return links, 0
+    remaining: List[Tuple[str, str]] = []
+    reused = 0
+    for (url, title) in links:
+        try:
+            if ledger.is_fresh(ledger.get(url, conversation_id)):
+                print(f"[rag] known (ledger): {title} | {url}")
+                continue
+            other = ledger.latest_elsewhere(url, conversation_id)
+            if ledger.is_fresh(other):
+                copied = _copy_chunks(other["scope"], vs, other["chunk_ids"], conversation_id)
+                n = len(copied)
+                if n:
+                    ledger.record(url, conversation_id, other["content_hash"], copied, title)
+                    reused += n
+                    print(f"[rag] reused chunks: {n} from scope={other['scope'] or '(global)'} | {url}")
+                    continue
+        except Exception as e:
+            print(f"[rag][ledger][error] {e}")
+        remaining.append((url, title))
+    return remaining, reused
+
+# -----------------------------
+# 크롤 합치기: 같은 (정규화 질의, 대화 범위)로 동시에 들어온 크롤은 하나만 실행
+#  - follower는 leader의 저장 건수를 받고, 갱신된 인덱스로 각자 검색/답변
+#  - 동기(스트림/워치리스트)와 비동기(/query) 경로가 같은 인스턴스를 공유
+# -----------------------------
+CRAWL_FLIGHT = SingleFlight("crawl")
+
+def crawl_key(query: str, days: int, pages: int, conversation_id: Optional[str]) -> str:
+    return make_key("crawl", query, _scope(conversation_id), str(days), str(pages))
+
 def _fetch_and_store(
     query: str,
     days: int = CRAWL_DAYS,
     pages: int = CRAWL_PAGES,
     conversation_id: Optional[str] = None,
+    on_progress: Optional[Callable[[dict], None]] = None,
+) -> int:
+    def _waiting() -> None:
+        print(f"[rag] joining in-flight crawl: {query!r}")
+        if on_progress is not None:
+            try:
+                on_progress({"stage": "coalesced"})
+            except Exception:
+                pass
+
+    try:
+        return CRAWL_FLIGHT.do(
+            crawl_key(query, days, pages, conversation_id),
+            _crawl_and_store, query, days, pages, conversation_id, on_progress,
+            timeout=TIME_BUDGET_SEC + 30, on_wait=_waiting,
+        )
+    except TimeoutError:
+        # 예산을 넘긴 leader를 더 기다리지 않음 → 지금까지 저장된 것으로 진행
+        print(f"[rag] in-flight crawl wait timed out: {query!r}")
+        return 0
+
+def _crawl_and_store(
+    query: str,
+    days: int,
+    pages: int,
+    conversation_id: Optional[str],
+    on_progress: Optional[Callable[[dict], None]],
 ) -> int:
     from time import time
     start = time()
     saved = 0
-    vs = _vs(conversation_id)
 
-    with NaverNewsCrawler(headless=RAG_HEADLESS, max_pages=pages, debug=True) as cr:
+    def _emit(stage: str, **kw) -> None:
+        if on_progress is None:
+            return
+        try:
+            on_progress({"stage": stage, "elapsed": round(time() - start, 3), **kw})
+        except Exception:
+            pass
+
+    with _vs_lease(conversation_id) as vs, \
+            NaverNewsCrawler(headless=RAG_HEADLESS, max_pages=pages, debug=True) as cr:
         links: List[Tuple[str, str]] = cr.search_links(query, days=days, max_pages=pages)
+        links, reused = _reuse_known_links(links, conversation_id, vs)
+        saved += reused
         links = links[:MAX_LINKS]
         print(f"[rag] will process up to {len(links)} links")
+        _emit("links", count=len(links), reused=reused)
 
-        for (url, title) in links:
-            if time() - start > TIME_BUDGET_SEC:
-                print(f"[rag] crawl budget exceeded ({TIME_BUDGET_SEC:.1f}s). stop fetching more.")
-                break
-
-            body = cr.extract_article_text(url)
+        # 동시 추출: 끝나는 순서대로 받아 저장, 전체 예산 초과 시 남은 링크는 포기
+        extracted = iter_extract(
+            links, cr.extract_article_text, deadline=start + TIME_BUDGET_SEC, debug=True
+        )
+        for (url, title, body, meta) in _with_analysis(extracted, conversation_id):
             if not body or len(body) < MIN_CHARS:
                 print(f"[rag] skip (short {len(body) if body else 0} chars): {title} | {url}")
+                _emit("skip", url=url, title=title)
                 continue
 
-            chunks = textsplitter.split_text(body)
-            docs: List[Document] = []
-            ids: List[str] = []
-            for i, ch in enumerate(chunks):
-                meta = {"source": url, "title": title, "query": query}
-                docs.append(Document(page_content=ch, metadata=meta))
-                ids.append(_make_id(url, ch, i))
+            n = _store_article(vs, url, title, body, query, conversation_id, meta)
+            if n:
+                saved += n
+                print(f"[rag] saved chunks: {n} (total {saved})")
+                _emit("stored", url=url, title=title, chunks=n, total=saved)
+
+        if time() - start > TIME_BUDGET_SEC:
+            print(f"[rag] crawl budget exceeded ({TIME_BUDGET_SEC:.1f}s). stop fetching more.")
 
-            if docs:
-                vs.add_documents(documents=docs, ids=ids)
-                _persist(vs)
-                saved += len(docs)
-                print(f"[rag] saved chunks: {len(docs)} (total {saved})")
+    # 새 청크가 들어왔으면 비슷한 질문의 캐시 답변은 낡은 것
+    if saved:
+        answer_cache.invalidate_for_query(query, conversation_id)
 
     return saved
 
 # -----------------------------
 # 질의 → 검색 → (fast면 생략) → 필요 시 크롤
 # -----------------------------
+def _lexical(conversation_id: Optional[str]) -> "lexical.LexicalIndex":
+    """역색인 핸들. 색인 도입 전에 쌓인 청크는 핸들을 열 때 한 번 Chroma에서 채워 넣음."""
+    persist_dir = _persist_dir(conversation_id)
+    idx = lexical.get_index(persist_dir)
+    if not idx.backfill_checked:
+        idx.backfill_checked = True
+        try:
+            if idx.count() == 0:
+                got = _vs(conversation_id).get(include=["documents", "metadatas"])
+                if got.get("ids"):
+                    if SHARED_VS:
+                        # 공유 컬렉션: 범위별로 묶어서 채움
+                        by_scope: dict = {}
+                        for row in zip(got["ids"], got["documents"], got["metadatas"]):
+                            by_scope.setdefault((row[2] or {}).get(SCOPE_KEY, ""), []).append(row)
+                        for sc, rows in by_scope.items():
+                            ids, docs, metas = (list(x) for x in zip(*rows))
+                            idx.add(ids, docs, metas, scope=sc)
+                    else:
+                        idx.add(got["ids"], got["documents"], got["metadatas"])
+                    print(f"[rag][lexical] backfilled {len(got['ids'])} chunks | {persist_dir}")
+        except Exception as e:
+            print(f"[rag][lexical][backfill][error] {e}")
+    return idx
+
+def _retrieve(question: str, k: int, conversation_id: Optional[str], qvec=None) -> list:
+    with metrics.span("retrieval"):
+        return _retrieve_docs(question, k, conversation_id, qvec)
+
+def _retrieve_docs(question: str, k: int, conversation_id: Optional[str], qvec=None) -> list:
+    # 재배포 기사 중복을 접을 여유분만큼 더 가져온 뒤 k개로 자름
+    fetch_k = k + RETRIEVE_OVERFETCH if neardup.NEARDUP_ENABLED else k
+    # 공유 컬렉션은 범위 필터 한 번($in), 대화별 저장소는 전역 저장소도 따로 검색
+    stores = [conversation_id] if SHARED_VS else _read_scopes(conversation_id)
+    rankings = [_search(question, fetch_k, sc, qvec) for sc in stores]
+    # 벡터 + BM25(한국어 bigram) 결과를 RRF로 합침
+    if lexical.HYBRID_ENABLED:
+        for sc in stores:
+            try:
+                lex = _lexical(sc).search(
+                    question, fetch_k,
+                    scope=[_scope(c) for c in _read_scopes(sc)] if SHARED_VS else None,
+                )
+                rankings.append([d for d, _ in lex])
+            except Exception as e:
+                print(f"[rag][lexical][error] {e}")
+    docs = rankings[0] if len(rankings) == 1 else lexical.rrf_fuse(rankings, fetch_k)
+    if neardup.NEARDUP_ENABLED:
+        docs = neardup.collapse(docs)
+    return docs[:k]
+
+def _search(question: str, k: int, conversation_id: Optional[str], qvec=None) -> list:
+    with _vs_lease(conversation_id) as vs:
+        return _search_in(vs, question, k, _scope_filter(conversation_id), qvec)
+
+def _search_in(vs, question: str, k: int, where: Optional[dict], qvec=None) -> list:
+    # 질문 임베딩을 이미 계산했다면(답변 캐시 조회) 재사용
+    if qvec is not None:
+        try:
+            return vs.similarity_search_by_vector(qvec, k=k, filter=where)
+        except Exception:
+            pass
+    retriever = vs.as_retriever(search_kwargs={"k": k, "filter": where} if where else {"k": k})
+    try:
+        return retriever.invoke(question)
+    except TypeError:
+        return retriever.get_relevant_documents(question)
+
+def _empty_message(fast: bool) -> str:
+    return (
+        "현재 저장된 문서가 없습니다. ‘빠른 검색(크롤 생략)’을 꺼두고 다시 시도해 보세요."
+        if fast else
+        "관련 기사 크롤/저장 결과가 0건입니다. 키워드를 더 구체적으로 입력해 주세요."
+    )
+
+def _pack(ctx_docs: list) -> list:
+    # 같은 기사 청크 병합 + 토큰 예산 → 블록 순서가 곧 인용 번호 [n]
+    return context_pack.pack(ctx_docs, model=MODEL_NAME)
+
+def _sources(ctx_docs: list) -> list[dict]:
+    # 프롬프트와 같은 패킹 결과로 만들어야 sources[n-1] == 인용 [n]
+    return [{"title": b.title, "url": b.source, "preview": b.preview} for b in _pack(ctx_docs)]
+
+def _build_prompt(question: str, ctx_docs: list) -> str:
+    blocks = _pack(ctx_docs)
+    context_block = context_pack.render(blocks)
+    metrics.PROMPT_CONTEXT_TOKENS.inc(sum(b.tokens for b in blocks))
+    return (
+        "다음 뉴스 문맥을 바탕으로 사용자의 질문에 한국어로 간결히 답하세요. "
+        "출처 번호를 대괄호로 인용하세요(예: [1][2]). "
+        "추측은 금지하고, 불확실하면 부족한 정보를 명확히 적으세요.\n\n"
+        f"뉴스 문맥:\n{context_block}\n\n질문: {question}\n답변:"
+    )
+
+# -----------------------------
+# LLM 합치기: 정규화 질문 + 같은 문맥(청크 내용) + 같은 범위면 호출 한 번을 공유
+#  - 스트리밍은 토큰을 호출자별로 흘려야 하므로 합치지 않음
+# -----------------------------
+LLM_FLIGHT = SingleFlight("llm")
+
+def llm_key(question: str, ctx_docs: List[Document], conversation_id: Optional[str]) -> str:
+    h = hashlib.sha1()
+    for d in ctx_docs:
+        h.update(d.page_content.encode("utf-8"))
+        h.update(b"\x1e")
+    return make_key("llm", question, _scope(conversation_id), MODEL_NAME, h.hexdigest())
+
+def _llm_error(e: Exception) -> str:
+    reason = getattr(e, "reason", "")
+    if reason == "timeout" or isinstance(e, TimeoutError):
+        return "LLM 응답이 제한 시간을 넘었습니다. 잠시 후 다시 시도해 주세요."
+    if reason == "rate_limited":
+        return "LLM 요청 한도를 초과했습니다. 잠시 후 다시 시도해 주세요."
+    return (
+        "LLM 호출 중 오류가 발생했습니다. OPENAI_API_KEY / MODEL_NAME 환경변수를 확인해 주세요.\n"
+        f"세부: {e}"
+    )
+
 def answer_with_live(
     question: str,
     k: int = 4,
     fast: bool = False,
     conversation_id: Optional[str] = None,
 ) -> tuple[str, list[dict]]:
-    vs = _vs(conversation_id)
+    # 0) 의미 기반 답변 캐시
+    qvec = answer_cache.question_vector(question)
+    hit = answer_cache.lookup(qvec, conversation_id)
+    if hit is not None:
+        return hit["answer"], hit["sources"]
 
     # 1) 검색
-    retriever = vs.as_retriever(search_kwargs={"k": k})
-    try:
-        ctx_docs = retriever.invoke(question)
-    except TypeError:
-        ctx_docs = retriever.get_relevant_documents(question)
+    ctx_docs = _retrieve(question, k, conversation_id, qvec)
 
     # 2) fast=False일 때만 크롤
     if not ctx_docs and not fast:
@@ -161,66 +639,122 @@ def answer_with_live(
             question, days=CRAWL_DAYS, pages=CRAWL_PAGES, conversation_id=conversation_id
         )
         print(f"[rag] fetched_and_stored docs={added}")
-        vs = _vs(conversation_id)
-        retriever = vs.as_retriever(search_kwargs={"k": k})
-        try:
-            ctx_docs = retriever.invoke(question)
-        except TypeError:
-            ctx_docs = retriever.get_relevant_documents(question)
+        ctx_docs = _retrieve(question, k, conversation_id, qvec)
 
     # 3) 여전히 없으면 안내
     if not ctx_docs:
-        msg = (
-            "현재 저장된 문서가 없습니다. ‘빠른 검색(크롤 생략)’을 꺼두고 다시 시도해 보세요."
-            if fast else
-            "관련 기사 크롤/저장 결과가 0건입니다. 키워드를 더 구체적으로 입력해 주세요."
-        )
-        return (msg, [])
+        return (_empty_message(fast), [])
 
     # 4) 소스 요약
-    sources = []
-    for d in ctx_docs:
-        src = d.metadata.get("source", "")
-        title = d.metadata.get("title", "")
-        preview = d.page_content[:220].replace("\n", " ")
-        sources.append({"title": title, "url": src, "preview": preview})
+    sources = _sources(ctx_docs)
 
     # 5) LLM
-    context_block = "\n\n".join(
-        f"[{i + 1}] {d.metadata.get('title', '')}\nURL: {d.metadata.get('source', '')}\n{d.page_content[:1200]}"
-        for i, d in enumerate(ctx_docs)
-    )
-    prompt = (
-        "다음 뉴스 문맥을 바탕으로 사용자의 질문에 한국어로 간결히 답하세요. "
-        "출처 번호를 대괄호로 인용하세요(예: [1][2]). "
-        "추측은 금지하고, 불확실하면 부족한 정보를 명확히 적으세요.\n\n"
-        f"뉴스 문맥:\n{context_block}\n\n질문: {question}\n답변:"
-    )
-
+    prompt = _build_prompt(question, ctx_docs)
     try:
-        from openai import OpenAI
-        client = OpenAI()
-        comp = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
-            max_tokens=500,
-        )
-        answer = comp.choices[0].message.content.strip()
+        with metrics.span("llm"):
+            answer = LLM_FLIGHT.do(
+                llm_key(question, ctx_docs, conversation_id),
+                llm_gateway.chat, [{"role": "user", "content": prompt}], model=MODEL_NAME,
+                timeout=llm_gateway.LLM_TIMEOUT_SEC + 5,
+            )
+        answer_cache.store(qvec, conversation_id, question, answer, sources)
     except Exception as e:
-        answer = (
-            "LLM 호출 중 오류가 발생했습니다. OPENAI_API_KEY / MODEL_NAME 환경변수를 확인해 주세요.\n"
-            f"세부: {e}"
-        )
+        answer = _llm_error(e)
 
     return answer, sources
 
+# -----------------------------
+# 스트리밍(SSE) 버전: (event, data)를 단계별로 내보냄
+#   sources → crawl(진행) → token(LLM 조각) → done
+# -----------------------------
+def stream_answer_with_live(
+    question: str,
+    k: int = 4,
+    fast: bool = False,
+    conversation_id: Optional[str] = None,
+) -> Iterator[tuple[str, dict]]:
+    import queue
+    import threading
+    from time import perf_counter, time
+
+    start = time()
+    qvec = answer_cache.question_vector(question)
+    hit = answer_cache.lookup(qvec, conversation_id)
+    if hit is not None:
+        yield "sources", {"sources": hit["sources"], "stage": "cache"}
+        yield "token", {"text": hit["answer"]}
+        yield "done", {
+            "answer": hit["answer"], "contexts": hit["sources"],
+            "elapsed": round(time() - start, 3), "cached": True,
+        }
+        return
+
+    ctx_docs = _retrieve(question, k, conversation_id, qvec)
+    yield "sources", {"sources": _sources(ctx_docs), "stage": "retrieval"}
+
+    if not ctx_docs and not fast:
+        # 크롤은 별도 스레드, 진행 이벤트는 큐로 중계
+        q: "queue.Queue[Optional[dict]]" = queue.Queue()
+        result: dict = {"added": 0}
+
+        def _work() -> None:
+            try:
+                result["added"] = _fetch_and_store(
+                    question, days=CRAWL_DAYS, pages=CRAWL_PAGES,
+                    conversation_id=conversation_id, on_progress=q.put,
+                )
+            except Exception as e:
+                result["error"] = str(e)
+            finally:
+                q.put(None)
+
+        threading.Thread(target=_work, daemon=True, name="crawl-stream").start()
+        while True:
+            ev = q.get()
+            if ev is None:
+                break
+            yield "crawl", ev
+        yield "crawl", {"stage": "done", **result}
+
+        ctx_docs = _retrieve(question, k, conversation_id, qvec)
+        yield "sources", {"sources": _sources(ctx_docs), "stage": "after_crawl"}
+
+    if not ctx_docs:
+        answer = _empty_message(fast)
+        yield "token", {"text": answer}
+        yield "done", {"answer": answer, "contexts": [], "elapsed": round(time() - start, 3)}
+        return
+
+    parts: List[str] = []
+    try:
+        t_llm = perf_counter()
+        for delta in llm_gateway.chat_stream(
+            [{"role": "user", "content": _build_prompt(question, ctx_docs)}], model=MODEL_NAME,
+        ):
+            parts.append(delta)
+            yield "token", {"text": delta}
+        metrics.record("llm", perf_counter() - t_llm)
+        answer = "".join(parts).strip()
+        answer_cache.store(qvec, conversation_id, question, answer, _sources(ctx_docs))
+    except Exception as e:
+        answer = _llm_error(e)
+        yield "error", {"message": answer}
+
+    yield "done", {
+        "answer": answer,
+        "contexts": _sources(ctx_docs),
+        "elapsed": round(time() - start, 3),
+    }
+
 # -----------------------------
 # 보조 유틸
 # -----------------------------
 def vector_stats() -> dict:
     vs = _vs()
-    out = {"collection": COLLECTION, "persist_dir": CHROMA_DIR}
+    out = {
+        "collection": COLLECTION, "persist_dir": CHROMA_DIR, "layout": VS_LAYOUT,
+        "backend": getattr(vs, "backend", "hnsw"),
+    }
     try:
         n = vs._collection.count()  # type: ignore[attr-defined]
     except Exception:
@@ -243,8 +777,42 @@ def debug_fetch_links(
     return links
 
 # 벡터스토어 전체/대화별 초기화
+def _forget_scope_state(conversation_id: Optional[str]) -> None:
+    answer_cache.clear(conversation_id)
+    ledger = get_ledger()
+    if ledger is not None:
+        ledger.forget_scope(conversation_id)
+    index = neardup.get_index()
+    if index is not None:
+        index.forget_scope(conversation_id)
+
+def _clear_shared_scope(conversation_id: str) -> int:
+    """공유 컬렉션에서 한 대화 범위만 메타데이터 필터로 삭제 (디렉터리 삭제 없음)."""
+    vs = _vs(conversation_id)
+    col = vs._collection  # type: ignore[attr-defined]
+    where = {SCOPE_KEY: conversation_id}
+    n = len(col.get(where=where, include=[]).get("ids") or [])
+    if n:
+        col.delete(where=where)
+        _persist(vs)
+    try:
+        lexical.get_index(CHROMA_DIR).delete_scope(conversation_id)
+    except Exception as e:
+        print(f"[rag][lexical][clear][error] {e}")
+    _forget_scope_state(conversation_id)
+    return 1 if n else 0
+
 def clear_vectorstore(conversation_id: Optional[str]) -> int:
+    if SHARED_VS and conversation_id:
+        return _clear_shared_scope(conversation_id)
     target = os.path.join(CHROMA_DIR, conversation_id) if conversation_id else CHROMA_DIR
+    # 열린 핸들부터 닫아야 파일 삭제 후 stale 핸들을 재사용하지 않음
+    if conversation_id:
+        _VS_CACHE.invalidate(conversation_id)
+    else:
+        _VS_CACHE.clear()
+    lexical.close_index(target)
+    _forget_scope_state(conversation_id)
     if not os.path.exists(target):
         return 0
     root = os.path.abspath(CHROMA_DIR)
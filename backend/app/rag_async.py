@@ -0,0 +1,213 @@
+# backend/app/rag_async.py
+from __future__ import annotations
+import asyncio
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from . import rag
+from .crawler_google import (
+    HttpResult, NaverNewsCrawler, _headers, arun_extract, discover_links, extract_steps,
+)
+from .fetch_pool import FETCH_PER_HOST
+from . import fetch_pool
+from . import analyzer
+from . import answer_cache
+from . import metrics
+from . import llm_gateway
+
+# -----------------------------
+# 설정(ENV로 오버라이드 가능)
+# -----------------------------
+HTTP_TIMEOUT_SEC = float(os.getenv("HTTP_TIMEOUT_SEC", "12"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "32"))
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "2"))
+
+# -----------------------------
+# 프로세스 전역 리소스(지연 생성)
+#  - 임베딩/Chroma(CPU 바운드)는 전용 executor로 보내 이벤트 루프를 막지 않음
+# -----------------------------
+_EMBED_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, EMBED_WORKERS), thread_name_prefix="embed")
+_http: Optional[httpx.AsyncClient] = None
+
+def _client() -> httpx.AsyncClient:
+    global _http
+    if _http is None or _http.is_closed:
+        _http = httpx.AsyncClient(
+            headers=_headers(),
+            timeout=HTTP_TIMEOUT_SEC,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS),
+        )
+    return _http
+
+async def aclose() -> None:
+    global _http
+    if _http is not None:
+        await _http.aclose()
+        _http = None
+    await llm_gateway.aclose()
+
+async def _on_embed(fn, *args):
+    # 컨텍스트 복사 → executor 안의 metrics.span도 같은 요청 분해에 기록
+    ctx = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(_EMBED_EXECUTOR, ctx.run, fn, *args)
+
+# -----------------------------
+# 검색/추출 (비동기 HTTP)
+# -----------------------------
+async def _search_links(q: str, days: int, pages: int) -> List[Tuple[str, str]]:
+    t0 = time.perf_counter()
+    try:
+        return await _search_links_inner(q, days, pages)
+    finally:
+        metrics.record("search", time.perf_counter() - t0)
+
+async def _search_links_inner(q: str, days: int, pages: int) -> List[Tuple[str, str]]:
+    # 링크 탐색은 동기 경로와 같은 캐시/공유 세션/레이트 리미터를 써야 의미가 있음
+    #  → 캐시 히트는 즉시, 미스만 검색 풀에서 RSS+HTML 동시 조회
+    return await asyncio.to_thread(discover_links, q, days, pages, True)
+
+async def _http_get(target: str, headers: dict) -> HttpResult:
+    r = await _client().get(target, headers=headers or None)
+    return HttpResult(r.status_code, r.content, str(r.url), r.headers)
+
+async def _extract(url: str, cr: NaverNewsCrawler) -> str:
+    # 결정 로직(캐시/304/라우터/지표/Selenium 게이트)은 동기 경로와 같은 extract_steps
+    return await arun_extract(extract_steps(url, cr.debug), _http_get, cr.extract_via_selenium)
+
+async def _fetch_and_store_async(
+    query: str,
+    days: int = rag.CRAWL_DAYS,
+    pages: int = rag.CRAWL_PAGES,
+    conversation_id: Optional[str] = None,
+) -> int:
+    # 동기 경로와 같은 CRAWL_FLIGHT → 스트림/비동기 요청이 섞여도 크롤은 하나
+    try:
+        return await rag.CRAWL_FLIGHT.ado(
+            rag.crawl_key(query, days, pages, conversation_id),
+            _crawl_and_store_async, query, days, pages, conversation_id,
+            timeout=rag.TIME_BUDGET_SEC + 30,
+            on_wait=lambda: print(f"[rag][async] joining in-flight crawl: {query!r}"),
+        )
+    except asyncio.TimeoutError:
+        print(f"[rag][async] in-flight crawl wait timed out: {query!r}")
+        return 0
+
+async def _crawl_and_store_async(
+    query: str,
+    days: int,
+    pages: int,
+    conversation_id: Optional[str],
+) -> int:
+    start = time.monotonic()
+    # 동기 경로와 같이 크롤 내내 핸들을 임대 → 그사이 캐시에서 축출돼도 닫히지 않음
+    stack = ExitStack()
+    vs = await _on_embed(stack.enter_context, rag._vs_lease(conversation_id))
+    try:
+        links = await _search_links(query, days, pages)
+        links, reused = await _on_embed(rag._reuse_known_links, links, conversation_id, vs)
+        links = links[: rag.MAX_LINKS]
+        print(f"[rag][async] will process up to {len(links)} links")
+
+        host_sems: Dict[str, asyncio.Semaphore] = {}
+        saved = reused
+        deadline = time.time() + max(0.0, rag.TIME_BUDGET_SEC - (time.monotonic() - start))
+        # stop_scope: 예산이 끝나면 아직 돌고 있는 추출도 Selenium 단계로 넘어가지 않음
+        with NaverNewsCrawler(headless=rag.RAG_HEADLESS, max_pages=pages, debug=True) as cr, \
+                fetch_pool.stop_scope(deadline):
+
+            async def _one(url: str, title: str) -> Tuple[str, str, str]:
+                host = urlparse(url).netloc.lower()
+                sem = host_sems.setdefault(host, asyncio.Semaphore(FETCH_PER_HOST))
+                async with sem:
+                    return url, title, await _extract(url, cr)
+
+            async def _store(url: str, title: str, body: str, meta: Optional[dict]) -> None:
+                nonlocal saved
+                if not body or len(body) < rag.MIN_CHARS:
+                    print(f"[rag] skip (short {len(body) if body else 0} chars): {title} | {url}")
+                    return
+                n = await _on_embed(rag._store_article, vs, url, title, body, query, conversation_id, meta)
+                if n:
+                    saved += n
+                    print(f"[rag][async] saved chunks: {n} (total {saved})")
+
+            # 분석을 켠 경우엔 본문을 모아 뒀다가 한 번에 배치 분석 후 저장 (rag._with_analysis)
+            collected: List[Tuple[str, str, str]] = []
+            tasks = [asyncio.create_task(_one(u, t)) for (u, t) in links]
+            try:
+                for fut in asyncio.as_completed(tasks, timeout=max(0.0, deadline - time.time())):
+                    try:
+                        url, title, body = await fut
+                    except asyncio.TimeoutError:
+                        raise
+                    except Exception as e:
+                        print(f"[fetch][async][error] {e}")
+                        continue
+                    if analyzer.ANALYZE_ON_INGEST:
+                        collected.append((url, title, body))
+                    else:
+                        await _store(url, title, body, None)
+            except asyncio.TimeoutError:
+                print(f"[rag] crawl budget exceeded ({rag.TIME_BUDGET_SEC:.1f}s). stop fetching more.")
+            finally:
+                for t in tasks:
+                    t.cancel()
+            if collected:
+                rows = await _on_embed(list, rag._with_analysis(collected, conversation_id))
+                for row in rows:
+                    await _store(*row)
+        if saved:
+            await _on_embed(answer_cache.invalidate_for_query, query, conversation_id)
+        return saved
+    finally:
+        await _on_embed(stack.close)
+
+# -----------------------------
+# 비동기 질의 파이프라인 (answer_with_live와 동일한 의미)
+# -----------------------------
+async def answer_with_live_async(
+    question: str,
+    k: int = 4,
+    fast: bool = False,
+    conversation_id: Optional[str] = None,
+) -> tuple[str, list[dict]]:
+    qvec = await _on_embed(answer_cache.question_vector, question)
+    hit = answer_cache.lookup(qvec, conversation_id)
+    if hit is not None:
+        return hit["answer"], hit["sources"]
+
+    ctx_docs = await _on_embed(rag._retrieve, question, k, conversation_id, qvec)
+
+    if not ctx_docs and not fast:
+        added = await _fetch_and_store_async(question, conversation_id=conversation_id)
+        print(f"[rag][async] fetched_and_stored docs={added}")
+        ctx_docs = await _on_embed(rag._retrieve, question, k, conversation_id, qvec)
+
+    if not ctx_docs:
+        return (rag._empty_message(fast), [])
+
+    sources = rag._sources(ctx_docs)
+    prompt = rag._build_prompt(question, ctx_docs)
+    try:
+        t0 = time.perf_counter()
+        answer = await rag.LLM_FLIGHT.ado(
+            rag.llm_key(question, ctx_docs, conversation_id),
+            llm_gateway.achat, [{"role": "user", "content": prompt}], model=rag.MODEL_NAME,
+            timeout=llm_gateway.LLM_TIMEOUT_SEC + 5,
+        )
+        metrics.record("llm", time.perf_counter() - t0)
+        answer_cache.store(qvec, conversation_id, question, answer, sources)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        answer = rag._llm_error(e)
+
+    return answer, sources
@@ -1,12 +1,13 @@
 # backend/app/schemas.py
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class QueryRequest(BaseModel):
     question: str
     k: int = 4
     fast: bool = False
     conversation_id: Optional[str] = None
+    timings: bool = False
 
 class Source(BaseModel):
     title: Optional[str] = None
@@ -16,6 +17,7 @@ class Source(BaseModel):
 class QueryResponse(BaseModel):
     answer: str
     contexts: List[Source]
+    timings: Optional[Dict[str, float]] = None
 
 class CrawlReq(BaseModel):
     q: str
@@ -25,3 +27,12 @@ class CrawlReq(BaseModel):
 
 class ClearReq(BaseModel):
     conversation_id: Optional[str] = None
+
+class WatchReq(BaseModel):
+    query: str
+    interval_sec: Optional[int] = None
+
+class BookmarkReq(BaseModel):
+    question: str
+    answer: str
+    conversation_id: Optional[str] = None
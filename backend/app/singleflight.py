@@ -0,0 +1,143 @@
+# backend/app/singleflight.py
+"""진행 중인 동일 작업 합치기 (single-flight).
+
+같은 키로 동시에 들어온 호출 중 첫 번째(leader)만 실제로 실행하고,
+나머지(follower)는 그 결과(또는 예외)를 공유받는다. 완료 즉시 키를 지우므로
+캐시가 아니라 "지금 돌고 있는 것"만 합친다.
+
+  - 동기 스레드(do)와 asyncio 태스크(ado)가 같은 인스턴스를 공유 → /query/stream
+    (스레드)과 /query(비동기)가 같은 크롤을 기다릴 수 있다
+  - leader가 취소되면(클라이언트 끊김 등) follower는 예외 대신 다시 leader 선출
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from . import metrics
+
+SINGLEFLIGHT = os.getenv("SINGLEFLIGHT", "1") not in ("0", "false", "False")
+
+class _Abandoned(Exception):
+    """leader가 결과 없이 빠짐 → follower는 재시도"""
+
+_PUNCT = re.compile(r"[^\w\s]+", re.UNICODE)
+_SPACE = re.compile(r"\s+")
+
+def normalize(text: str) -> str:
+    """'삼성전자  실적?' == '삼성전자 실적' (NFKC, 소문자, 구두점/공백 정리)"""
+    t = unicodedata.normalize("NFKC", text or "").lower()
+    t = _PUNCT.sub(" ", t)
+    return _SPACE.sub(" ", t).strip()
+
+def make_key(kind: str, text: str, scope: Optional[str] = None, *extra: str) -> str:
+    raw = "\x1f".join([kind, normalize(text), scope or "", *extra])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def _claim(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            fut = self._calls.get(key)
+            if fut is not None:
+                return fut, False
+            fut = Future()
+            self._calls[key] = fut
+            return fut, True
+
+    def _finish(self, key: str, fut: Future, result: Any = None, exc: Optional[BaseException] = None) -> None:
+        with self._lock:
+            if self._calls.get(key) is fut:
+                del self._calls[key]
+        if exc is not None:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(result)
+
+    def _role(self, leader: bool) -> None:
+        metrics.SINGLEFLIGHT.inc(kind=self.name, role="leader" if leader else "follower")
+
+    def inflight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def do(
+        self,
+        key: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        on_wait: Optional[Callable[[], None]] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """동기 호출. follower는 timeout 초까지 기다리고, 넘으면 TimeoutError."""
+        if not SINGLEFLIGHT:
+            return fn(*args, **kwargs)
+        while True:
+            fut, leader = self._claim(key)
+            self._role(leader)
+            if not leader:
+                if on_wait is not None:
+                    on_wait()
+                try:
+                    return fut.result(timeout=timeout)
+                except _Abandoned:
+                    continue
+                except FutureTimeout:
+                    raise TimeoutError(f"singleflight[{self.name}] wait timeout")
+            try:
+                res = fn(*args, **kwargs)
+            except Exception as e:
+                self._finish(key, fut, exc=e)
+                raise
+            except BaseException:
+                self._finish(key, fut, exc=_Abandoned())
+                raise
+            self._finish(key, fut, result=res)
+            return res
+
+    async def ado(
+        self,
+        key: str,
+        fn: Callable[..., Awaitable[Any]],
+        *args: Any,
+        timeout: Optional[float] = None,
+        on_wait: Optional[Callable[[], None]] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """비동기 호출. follower 대기는 wrap_future라 이벤트 루프를 막지 않는다."""
+        if not SINGLEFLIGHT:
+            return await fn(*args, **kwargs)
+        while True:
+            fut, leader = self._claim(key)
+            self._role(leader)
+            if not leader:
+                if on_wait is not None:
+                    on_wait()
+                try:
+                    # shield: follower가 취소돼도 공유 Future는 건드리지 않음
+                    return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(fut)), timeout)
+                except _Abandoned:
+                    continue
+            try:
+                res = await fn(*args, **kwargs)
+            except asyncio.CancelledError:
+                self._finish(key, fut, exc=_Abandoned())
+                raise
+            except Exception as e:
+                self._finish(key, fut, exc=e)
+                raise
+            except BaseException:
+                self._finish(key, fut, exc=_Abandoned())
+                raise
+            self._finish(key, fut, result=res)
+            return res
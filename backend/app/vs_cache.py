@@ -0,0 +1,220 @@
+# backend/app/vs_cache.py
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+class _Opening:
+    """키별 자리표시자: 첫 호출자가 여는 동안 같은 키의 다른 호출자는 이걸 기다린다."""
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.handle: Any = None
+        self.error: Optional[BaseException] = None
+
+class HandleCache:
+    """키(conversation_id 등) → 열린 핸들의 LRU + idle-TTL 캐시.
+
+    - opener(key)로 없을 때만 생성 (캐시 잠금 밖, 같은 키만 서로 기다림)
+    - max_size 초과 시 가장 오래 안 쓴 항목부터, idle_ttl 초 동안 안 쓰면 다음 get/sweep 때 축출
+    - 축출된 핸들은 바로 닫지 않고 close_grace 초 유예 + lease() 참조가 0이 된 뒤 closer(handle)
+      → 다른 스레드가 get()으로 받아 쓰는 중인 핸들을 발밑에서 닫지 않음
+    - invalidate/clear는 명시적 삭제(디렉터리 삭제 전)라 즉시 닫는다
+    """
+    def __init__(
+        self,
+        opener: Callable[[Hashable], Any],
+        closer: Optional[Callable[[Any], None]] = None,
+        max_size: int = 64,
+        idle_ttl: float = 900.0,
+        close_grace: float = 60.0,
+    ):
+        self.opener = opener
+        self.closer = closer
+        self.max_size = max(1, int(max_size))
+        self.idle_ttl = float(idle_ttl)
+        self.close_grace = max(0.0, float(close_grace))
+        self._items: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._opening: Dict[Hashable, _Opening] = {}
+        self._refs: Dict[int, int] = {}
+        self._retired: List[Tuple[Any, float]] = []  # (핸들, 축출 시각)
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        return self._acquire(key, lease=False)
+
+    @contextmanager
+    def lease(self, key: Hashable) -> Iterator[Any]:
+        """with cache.lease(key) as h: — 블록 안에서는 축출돼도 닫히지 않음."""
+        handle = self._acquire(key, lease=True)
+        try:
+            yield handle
+        finally:
+            self._release(handle)
+
+    def invalidate(self, key: Hashable) -> bool:
+        with self._lock:
+            item = self._items.pop(key, None)
+        if item is None:
+            return False
+        self._close_all([item[0]])
+        return True
+
+    def invalidate_where(self, pred: Callable[[Hashable], bool]) -> int:
+        with self._lock:
+            keys = [k for k in self._items if pred(k)]
+            handles = [self._items.pop(k)[0] for k in keys]
+        self._close_all(handles)
+        return len(handles)
+
+    def clear(self) -> int:
+        n = self.invalidate_where(lambda _k: True)
+        with self._lock:
+            retired = [h for h, _t in self._retired]
+            self._retired.clear()
+        self._close_all(retired)
+        return n
+
+    def sweep(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            evicted = self._sweep_locked(now)
+            self._retire_locked(evicted, now)
+            due = self._due_locked(now)
+        self._close_all(due)
+        return len(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._items),
+                "max_size": self.max_size,
+                "idle_ttl": self.idle_ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "retired": len(self._retired),
+                "leased": sum(self._refs.values()),
+            }
+
+    # ---- 내부 ----
+    def _acquire(self, key: Hashable, lease: bool) -> Any:
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                evicted = self._sweep_locked(now)
+                self._retire_locked(evicted, now)
+                due = self._due_locked(now)
+                item = self._items.get(key)
+                if item is not None:
+                    self.hits += 1
+                    self._items[key] = (item[0], now)
+                    self._items.move_to_end(key)
+                    if lease:
+                        self._ref_locked(item[0], +1)
+                    handle = item[0]
+                    break
+                pending = self._opening.get(key)
+                if pending is None:
+                    pending = _Opening()
+                    self._opening[key] = pending
+                    owner = True
+                    self.misses += 1
+                else:
+                    owner = False
+            self._close_all(due)
+
+            if not owner:
+                pending.done.wait()
+                if pending.error is not None:
+                    raise pending.error
+                continue  # 방금 들어간 항목을 히트로 집어 감
+
+            try:
+                handle = self.opener(key)
+            except BaseException as e:
+                with self._lock:
+                    self._opening.pop(key, None)
+                pending.error = e
+                pending.done.set()
+                raise
+            with self._lock:
+                self._opening.pop(key, None)
+                self._items[key] = (handle, time.monotonic())
+                if lease:
+                    self._ref_locked(handle, +1)
+                evicted = self._trim_locked()
+                self._retire_locked(evicted, time.monotonic())
+            pending.handle = handle
+            pending.done.set()
+            return handle
+        self._close_all(due)
+        return handle
+
+    def _release(self, handle: Any) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._ref_locked(handle, -1)
+            due = self._due_locked(now)
+        self._close_all(due)
+
+    def _ref_locked(self, handle: Any, delta: int) -> None:
+        n = self._refs.get(id(handle), 0) + delta
+        if n > 0:
+            self._refs[id(handle)] = n
+        else:
+            self._refs.pop(id(handle), None)
+
+    def _retire_locked(self, handles: List[Any], now: float) -> None:
+        self._retired.extend((h, now) for h in handles)
+
+    def _due_locked(self, now: float) -> List[Any]:
+        """유예가 지났고 lease 중이 아닌 축출 핸들 (단, 그새 다시 캐시에 들어간 건 제외)."""
+        if not self._retired:
+            return []
+        live = {id(h) for h, _t in self._items.values()}
+        due: List[Any] = []
+        keep: List[Tuple[Any, float]] = []
+        for h, t in self._retired:
+            if id(h) in live:
+                continue
+            if now - t >= self.close_grace and id(h) not in self._refs:
+                due.append(h)
+            else:
+                keep.append((h, t))
+        self._retired = keep
+        return due
+
+    def _sweep_locked(self, now: float) -> List[Any]:
+        if self.idle_ttl <= 0:
+            return []
+        out: List[Any] = []
+        for k in list(self._items.keys()):
+            handle, last = self._items[k]
+            if now - last < self.idle_ttl:
+                break  # OrderedDict는 최근 사용 순 → 이후 항목은 모두 최신
+            del self._items[k]
+            out.append(handle)
+        self.evictions += len(out)
+        return out
+
+    def _trim_locked(self) -> List[Any]:
+        out: List[Any] = []
+        while len(self._items) > self.max_size:
+            _k, (handle, _last) = self._items.popitem(last=False)
+            out.append(handle)
+        self.evictions += len(out)
+        return out
+
+    def _close_all(self, handles: List[Any]) -> None:
+        if not self.closer:
+            return
+        for h in handles:
+            try:
+                self.closer(h)
+            except Exception as e:
+                print(f"[vs-cache][close][error] {e}")
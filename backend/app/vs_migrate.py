@@ -0,0 +1,148 @@
+# backend/app/vs_migrate.py
+"""대화별 persist 디렉터리(CHROMA_DIR/<conversation_id>/)를 공유 컬렉션 하나로 합친다.
+
+    cd backend
+    python -m app.vs_migrate --dry-run          # 대상/청크 수만 출력
+    python -m app.vs_migrate                    # 합치기 (원본 디렉터리는 남김)
+    python -m app.vs_migrate --remove-source    # 합친 뒤 원본 디렉터리 삭제
+    VS_LAYOUT=shared uvicorn app.main:app ...   # 이후 공유 모드로 기동
+
+- 임베딩은 그대로 복사(재임베딩 없음), 청크 id는 '<대화>:<청크 해시>'로 바꾸고 scope 메타데이터 부여
+- 루트 컬렉션의 기존 청크(전역 범위)에는 scope='' 부여
+- 원장(ingest_ledger)의 청크 id, 근접 중복 인덱스(neardup)의 청크 ref, BM25 역색인도 같이 옮김
+- 이미 옮긴 대화는 다시 돌려도 upsert라 안전 (중단 후 재실행 가능)
+- 서버를 내린 상태에서 실행할 것 (열린 Chroma 핸들과 파일 경합 방지)
+"""
+from __future__ import annotations
+import argparse
+import os
+import shutil
+import time
+from typing import Iterator, List, Optional, Tuple
+
+import chromadb
+
+from . import lexical
+from . import neardup
+from .flat_store import FlatVectorStore, flat_exists
+from .ledger import get_ledger
+from .rag import CHROMA_DIR, COLLECTION, SCOPE_KEY, close_client, scoped_id
+
+def _pages(col, batch: int) -> Iterator[dict]:
+    offset = 0
+    while True:
+        got = col.get(include=["embeddings", "documents", "metadatas"], limit=batch, offset=offset)
+        if not got.get("ids"):
+            return
+        yield got
+        offset += len(got["ids"])
+
+def _conversation_dirs(root: str) -> List[Tuple[str, str]]:
+    out = []
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        if os.path.isdir(path) and (os.path.exists(os.path.join(path, "chroma.sqlite3")) or flat_exists(path)):
+            out.append((name, path))
+    return out
+
+def _tag_global(dst, batch: int, dry_run: bool) -> int:
+    """루트 컬렉션에서 scope가 없는 청크에 scope='' 부여."""
+    n = 0
+    for got in _pages(dst, batch):
+        rows = [(i, m) for i, m in zip(got["ids"], got["metadatas"]) if SCOPE_KEY not in (m or {})]
+        if rows and not dry_run:
+            dst.update(ids=[i for i, _ in rows], metadatas=[{**(m or {}), SCOPE_KEY: ""} for _, m in rows])
+        n += len(rows)
+    return n
+
+def _copy(cid: str, src, dst, lex, batch: int, dry_run: bool) -> int:
+    n = 0
+    for got in _pages(src, batch):
+        ids = [scoped_id(cid, i) for i in got["ids"]]
+        metas = [{**(m or {}), SCOPE_KEY: cid} for m in got["metadatas"]]
+        if not dry_run:
+            dst.upsert(ids=ids, embeddings=got["embeddings"], documents=got["documents"], metadatas=metas)
+            if lex is not None:
+                lex.add(ids, got["documents"], metas, scope=cid)
+        n += len(ids)
+    return n
+
+def _fold(cid: str, path: str, dst, lex, batch: int, dry_run: bool) -> int:
+    if flat_exists(path):
+        # VS_BACKEND=flat 로 만든(아직 승격 전) 저장소
+        return _copy(cid, FlatVectorStore(path, None)._collection, dst, lex, batch, dry_run)
+    client = chromadb.PersistentClient(path=path)
+    try:
+        try:
+            src = client.get_collection(f"{COLLECTION}__{cid}")
+        except Exception:
+            return 0
+        return _copy(cid, src, dst, lex, batch, dry_run)
+    finally:
+        close_client(client)
+
+def migrate(
+    root: str = CHROMA_DIR,
+    batch: int = 1000,
+    dry_run: bool = False,
+    remove_source: bool = False,
+    only: Optional[List[str]] = None,
+) -> dict:
+    t0 = time.perf_counter()
+    dst_client = chromadb.PersistentClient(path=root)
+    dst = dst_client.get_or_create_collection(COLLECTION)
+    lex = lexical.get_index(root) if lexical.HYBRID_ENABLED else None
+    ledger = get_ledger()
+    dups = neardup.get_index()
+    report = {"global_tagged": 0, "conversations": 0, "chunks": 0, "removed": 0, "failed": []}
+    try:
+        report["global_tagged"] = _tag_global(dst, batch, dry_run)
+        if lex is not None and not dry_run and lex.count() == 0:
+            # 전역 범위 역색인이 비어 있으면 같이 채움
+            for got in _pages(dst, batch):
+                lex.add(got["ids"], got["documents"], got["metadatas"], scope="")
+
+        dirs = _conversation_dirs(root)
+        if only:
+            dirs = [(c, p) for c, p in dirs if c in set(only)]
+        for i, (cid, path) in enumerate(dirs, 1):
+            try:
+                n = _fold(cid, path, dst, lex, batch, dry_run)
+            except Exception as e:
+                print(f"[migrate][error] {cid}: {e}")
+                report["failed"].append(cid)
+                continue
+            report["conversations"] += 1
+            report["chunks"] += n
+            if not dry_run:
+                if ledger is not None:
+                    ledger.remap_chunk_ids(cid, lambda c, _cid=cid: scoped_id(_cid, c))
+                if dups is not None:
+                    # 근접 중복 청크가 옛 id를 가리키면 새 기사가 없는 청크를 재사용하게 됨
+                    dups.remap_refs(cid, lambda c, _cid=cid: scoped_id(_cid, c))
+                if remove_source:
+                    lexical.close_index(path)
+                    shutil.rmtree(path, ignore_errors=True)
+                    report["removed"] += 1
+            if i % 100 == 0 or i == len(dirs):
+                print(f"[migrate] {i}/{len(dirs)} conversations, {report['chunks']} chunks")
+    finally:
+        close_client(dst_client)
+    report["elapsed_sec"] = round(time.perf_counter() - t0, 2)
+    return report
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="대화별 벡터스토어 → 공유 컬렉션 마이그레이션")
+    ap.add_argument("--root", default=CHROMA_DIR)
+    ap.add_argument("--batch", type=int, default=1000)
+    ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument("--remove-source", action="store_true", help="합친 대화 디렉터리 삭제")
+    ap.add_argument("--only", default="", help="쉼표로 구분한 conversation_id만")
+    args = ap.parse_args(argv)
+    only = [c.strip() for c in args.only.split(",") if c.strip()] or None
+    report = migrate(args.root, args.batch, args.dry_run, args.remove_source, only)
+    print(f"[migrate] done: {report}")
+    return 1 if report["failed"] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,205 @@
+# backend/app/watchlist.py
+from __future__ import annotations
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from .db import DB_PATH
+
+# -----------------------------
+# 설정(ENV로 오버라이드 가능)
+# -----------------------------
+WATCHLIST_ENABLED = os.getenv("WATCHLIST_ENABLED", "1") not in ("0", "false", "False")
+WATCH_DEFAULT_INTERVAL_SEC = int(os.getenv("WATCH_DEFAULT_INTERVAL_SEC", "1800"))
+WATCH_MAX_CONCURRENCY = int(os.getenv("WATCH_MAX_CONCURRENCY", "1"))
+WATCH_JITTER = float(os.getenv("WATCH_JITTER", "0.15"))          # 주기의 ±15%
+WATCH_MAX_BACKOFF_SEC = int(os.getenv("WATCH_MAX_BACKOFF_SEC", str(6 * 3600)))
+WATCH_TICK_SEC = float(os.getenv("WATCH_TICK_SEC", "15"))
+
+_COLUMNS = (
+    "query", "interval_sec", "enabled", "created_at", "next_run_at",
+    "last_run_at", "last_duration", "last_saved", "last_error", "failures", "runs",
+)
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS watchlist (
+        query TEXT PRIMARY KEY,
+        interval_sec INTEGER NOT NULL,
+        enabled INTEGER NOT NULL DEFAULT 1,
+        created_at REAL NOT NULL,
+        next_run_at REAL NOT NULL,
+        last_run_at REAL,
+        last_duration REAL,
+        last_saved INTEGER,
+        last_error TEXT,
+        failures INTEGER NOT NULL DEFAULT 0,
+        runs INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+    conn.commit()
+    return conn
+
+def _jittered(sec: float) -> float:
+    return sec * (1.0 + random.uniform(-WATCH_JITTER, WATCH_JITTER))
+
+class WatchlistScheduler:
+    """관심 검색어를 주기적으로 크롤해 공용 컬렉션을 미리 데워두는 백그라운드 스케줄러.
+
+    - 목록/상태는 finnews.db의 watchlist 테이블에 영속
+    - 다음 실행 시각에 지터, 실패 시 지수 백오프(WATCH_MAX_BACKOFF_SEC 상한)
+    - 동시에 도는 크롤은 WATCH_MAX_CONCURRENCY개까지
+    """
+    def __init__(self, max_concurrency: int = WATCH_MAX_CONCURRENCY, tick_sec: float = WATCH_TICK_SEC):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.tick_sec = tick_sec
+        self._lock = threading.Lock()
+        self._conn = _connect()
+        self._running: set = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="watch")
+
+    # ---- 목록 관리 ----
+    def add(self, query: str, interval_sec: Optional[int] = None) -> dict:
+        q = " ".join((query or "").split())
+        if not q:
+            raise ValueError("query is empty")
+        interval = max(60, int(interval_sec or WATCH_DEFAULT_INTERVAL_SEC))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO watchlist (query, interval_sec, enabled, created_at, next_run_at) "
+                "VALUES (?, ?, 1, ?, ?) "
+                "ON CONFLICT(query) DO UPDATE SET interval_sec = excluded.interval_sec, enabled = 1",
+                (q, interval, now, now),
+            )
+            self._conn.commit()
+        return self.get(q) or {}
+
+    def remove(self, query: str) -> bool:
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM watchlist WHERE query = ?", (query,))
+            self._conn.commit()
+            return cur.rowcount > 0
+
+    def get(self, query: str) -> Optional[dict]:
+        with self._lock:
+            r = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM watchlist WHERE query = ?", (query,)
+            ).fetchone()
+        return self._row(r) if r else None
+
+    def list(self) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM watchlist ORDER BY query"
+            ).fetchall()
+        return [self._row(r) for r in rows]
+
+    def _row(self, r) -> dict:
+        d = dict(zip(_COLUMNS, r))
+        d["enabled"] = bool(d["enabled"])
+        d["running"] = d["query"] in self._running
+        return d
+
+    # ---- 실행 ----
+    def _due(self, now: float) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM watchlist "
+                "WHERE enabled = 1 AND next_run_at <= ? ORDER BY next_run_at",
+                (now,),
+            ).fetchall()
+        return [self._row(r) for r in rows]
+
+    def _run_one(self, item: dict) -> None:
+        from .rag import CRAWL_DAYS, CRAWL_PAGES, _fetch_and_store
+
+        q = item["query"]
+        start = time.time()
+        saved, err = 0, None
+        try:
+            saved = _fetch_and_store(q, days=CRAWL_DAYS, pages=CRAWL_PAGES, conversation_id=None)
+        except Exception as e:
+            err = str(e)
+        dur = time.time() - start
+
+        failures = 0 if err is None else int(item["failures"]) + 1
+        delay = _jittered(item["interval_sec"])
+        if failures:
+            delay = min(WATCH_MAX_BACKOFF_SEC, item["interval_sec"] * (2 ** failures))
+            delay = _jittered(delay)
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "UPDATE watchlist SET last_run_at = ?, last_duration = ?, last_saved = ?, "
+                    "last_error = ?, failures = ?, runs = runs + 1, next_run_at = ? WHERE query = ?",
+                    (start, round(dur, 3), int(saved), err, failures, time.time() + delay, q),
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"[watchlist][error] update {q!r}: {e}")
+            finally:
+                # 기록이 실패해도 실행 중 표시는 풀어야 다음 tick에서 다시 잡히고 동시 실행 슬롯도 돌아옴
+                self._running.discard(q)
+        print(f"[watchlist] {q!r} saved={saved} dur={dur:.1f}s err={err} next_in={delay:.0f}s")
+
+    def tick(self) -> int:
+        started = 0
+        for item in self._due(time.time()):
+            with self._lock:
+                if item["query"] in self._running or len(self._running) >= self.max_concurrency:
+                    continue
+                self._running.add(item["query"])
+            self._pool.submit(self._run_one, item)
+            started += 1
+        return started
+
+    def _loop(self) -> None:
+        # 서버 기동 직후 몰리지 않게 첫 tick도 약간 늦춤
+        self._stop.wait(_jittered(self.tick_sec))
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"[watchlist][tick][error] {e}")
+            self._stop.wait(self.tick_sec)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="watchlist")
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def status(self) -> dict:
+        items = self.list()
+        return {
+            "enabled": WATCHLIST_ENABLED,
+            "alive": bool(self._thread and self._thread.is_alive()),
+            "max_concurrency": self.max_concurrency,
+            "running": sorted(self._running),
+            "count": len(items),
+            "items": items,
+        }
+
+_SCHED: Optional[WatchlistScheduler] = None
+_SCHED_LOCK = threading.Lock()
+
+def get_scheduler() -> WatchlistScheduler:
+    global _SCHED
+    if _SCHED is None:
+        with _SCHED_LOCK:
+            if _SCHED is None:
+                _SCHED = WatchlistScheduler()
+    return _SCHED
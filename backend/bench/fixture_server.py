@@ -0,0 +1,195 @@
+# backend/bench/fixture_server.py
+"""벤치마크용 로컬 스탠드인 서버.
+
+- GET  /rss/search?q=...         : 녹화된(또는 합성) Google News RSS
+- GET  /r/<id>                   : Google News 중간 링크처럼 302 리다이렉트
+- GET  /article/<id>             : 기사 HTML (ETag/Last-Modified 포함, 304 지원)
+- POST /v1/chat/completions      : OpenAI 호환 가짜 채팅 (llm_standin.respond, stream/장애 주입 지원)
+
+fixtures 디렉터리 구조(선택):
+    rss.xml              # <item><title/><link/></item> ... (link는 /r/<id> 로 재작성됨)
+    articles/<id>.html   # 기사 원문
+없으면 결정적(deterministic) 합성 기사를 만든다.
+"""
+from __future__ import annotations
+import hashlib
+import html
+import json
+import os
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from .llm_standin import StandinConfig, respond
+
+_WORDS = (
+    "삼성전자 SK하이닉스 반도체 실적 영업이익 매출 코스피 외국인 순매수 금리 환율 "
+    "연준 기준금리 인플레이션 수출 증가 감소 전망 분기 발표 투자 시장 주가 상승 하락 "
+    "HBM AI 데이터센터 메모리 가격 회복 재고 조정 애널리스트 목표주가 상향 하향"
+).split()
+
+def _synthetic_article(i: int, n_paragraphs: int = 8) -> Tuple[str, str]:
+    rnd = random.Random(i)
+    title = f"{rnd.choice(_WORDS)} {rnd.choice(_WORDS)} {rnd.choice(_WORDS)} 기사 {i}"
+    paras = []
+    for _ in range(n_paragraphs):
+        sent = " ".join(rnd.choice(_WORDS) for _ in range(rnd.randint(25, 45)))
+        paras.append(f"<p>{sent}. {rnd.randint(1, 99)}조 {rnd.randint(1, 999)}억원을 기록했다.</p>")
+    body = (
+        f"<html><head><title>{html.escape(title)}</title></head><body>"
+        f"<article><h1>{html.escape(title)}</h1>{''.join(paras)}</article></body></html>"
+    )
+    return title, body
+
+class Fixtures:
+    def __init__(self, root: Optional[str] = None, n_articles: int = 20):
+        self.articles: Dict[str, Tuple[str, str]] = {}
+        self.rss_items: List[Tuple[str, str]] = []  # (id, title)
+        if root and os.path.isdir(root):
+            self._load(root)
+        if not self.articles:
+            for i in range(n_articles):
+                aid = f"a{i:04d}"
+                self.articles[aid] = _synthetic_article(i)
+                self.rss_items.append((aid, self.articles[aid][0]))
+
+    def _load(self, root: str) -> None:
+        import xml.etree.ElementTree as ET
+        art_dir = os.path.join(root, "articles")
+        if os.path.isdir(art_dir):
+            for fn in sorted(os.listdir(art_dir)):
+                if fn.endswith(".html"):
+                    with open(os.path.join(art_dir, fn), encoding="utf-8") as f:
+                        body = f.read()
+                    aid = fn[:-5]
+                    self.articles[aid] = (aid, body)
+        rss = os.path.join(root, "rss.xml")
+        if os.path.exists(rss):
+            tree = ET.parse(rss)
+            ids = list(self.articles.keys())
+            for i, item in enumerate(tree.getroot().findall(".//item")):
+                title = (item.findtext("title") or "").strip()
+                aid = ids[i % len(ids)] if ids else f"a{i:04d}"
+                self.rss_items.append((aid, title))
+        if self.articles and not self.rss_items:
+            self.rss_items = [(aid, t) for aid, (t, _b) in self.articles.items()]
+
+    def etag(self, aid: str) -> str:
+        return '"' + hashlib.sha1(self.articles[aid][1].encode("utf-8")).hexdigest()[:16] + '"'
+
+def _make_handler(fx: Fixtures, base_url: str, latency: Dict[str, float], counters: Dict[str, int],
+                  lock: threading.Lock, llm: StandinConfig):
+    last_modified = formatdate(time.time() - 3600, usegmt=True)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args) -> None:  # 조용히
+            pass
+
+        def _count(self, key: str) -> None:
+            with lock:
+                counters[key] = counters.get(key, 0) + 1
+
+        def _send(self, code: int, body: bytes, ctype: str, headers: Optional[dict] = None) -> None:
+            self.send_response(code)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            u = urlparse(self.path)
+            if u.path.startswith("/rss"):
+                self._count("rss")
+                time.sleep(latency.get("rss", 0.0))
+                items = "".join(
+                    f"<item><title>{html.escape(t)}</title><link>{base_url}/r/{aid}</link></item>"
+                    for aid, t in fx.rss_items
+                )
+                xml = f'<?xml version="1.0" encoding="UTF-8"?><rss><channel>{items}</channel></rss>'
+                return self._send(200, xml.encode("utf-8"), "application/rss+xml; charset=utf-8")
+            if u.path.startswith("/r/"):
+                self._count("redirect")
+                time.sleep(latency.get("redirect", 0.0))
+                aid = u.path[3:]
+                return self._send(302, b"", "text/plain", {"Location": f"{base_url}/article/{aid}"})
+            if u.path.startswith("/article/"):
+                aid = u.path[len("/article/"):]
+                if aid not in fx.articles:
+                    return self._send(404, b"not found", "text/plain")
+                et = fx.etag(aid)
+                if self.headers.get("If-None-Match") == et:
+                    self._count("article_304")
+                    return self._send(304, b"", "text/plain", {"ETag": et})
+                self._count("article")
+                time.sleep(latency.get("article", 0.0))
+                return self._send(
+                    200, fx.articles[aid][1].encode("utf-8"), "text/html; charset=utf-8",
+                    {"ETag": et, "Last-Modified": last_modified},
+                )
+            self._send(404, b"not found", "text/plain")
+
+        def do_POST(self) -> None:
+            u = urlparse(self.path)
+            n = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(n) or b"{}")
+            if not u.path.endswith("/chat/completions"):
+                return self._send(404, b"not found", "text/plain")
+            respond(self, payload, llm)
+
+    return Handler
+
+class FixtureServer:
+    """with FixtureServer(...) as srv: srv.base_url"""
+    def __init__(self, fixtures: Optional[Fixtures] = None, host: str = "127.0.0.1", port: int = 0,
+                 latency: Optional[Dict[str, float]] = None, llm: Optional[StandinConfig] = None):
+        self.fixtures = fixtures or Fixtures()
+        self.latency = dict(latency or {})
+        self.counters: Dict[str, int] = {}
+        self.llm = llm or StandinConfig(latency=self.latency.get("llm", 0.0))
+        self.llm.counters = self.counters
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), BaseHTTPRequestHandler)
+        self.base_url = f"http://{host}:{self._httpd.server_address[1]}"
+        self._httpd.RequestHandlerClass = _make_handler(
+            self.fixtures, self.base_url, self.latency, self.counters, self._lock, self.llm
+        )
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True, name="fixture-http")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="벤치마크용 로컬 픽스처 서버")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--fixtures", default=None)
+    args = ap.parse_args()
+    srv = FixtureServer(Fixtures(args.fixtures), port=args.port).start()
+    print(f"[fixture] serving on {srv.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        srv.stop()
@@ -0,0 +1,174 @@
+# backend/bench/llm_standin.py
+"""OpenAI 호환 /v1/chat/completions 로컬 스탠드인 (테스트·벤치마크용).
+
+지연 분포와 장애를 주입해 llm_gateway의 재시도/헤징/마감을 재현한다.
+
+    cd backend
+    python -m bench.llm_standin --port 8766 --latency 0.4 --slow-rate 0.05 --slow-sec 6 \\
+        --error-rate 0.02 --rate-limit-rate 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:8766/v1 OPENAI_API_KEY=x LLM_HEDGE=1 uvicorn app.main:app
+
+fixture_server.py 도 같은 응답기를 쓴다 (POST /v1/chat/completions).
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+ANSWER = "가짜 응답입니다. 제공된 문맥에 따르면 실적이 개선되었습니다 [1]."
+
+@dataclass
+class StandinConfig:
+    latency: float = 0.0          # 기본 응답 지연(초)
+    jitter: float = 0.0           # 지연에 더할 균등분포 폭
+    slow_rate: float = 0.0        # 이 확률로 slow_sec 만큼 느린 응답 (꼬리 지연)
+    slow_sec: float = 5.0
+    error_rate: float = 0.0       # 이 확률로 500
+    rate_limit_rate: float = 0.0  # 이 확률로 429 (+ Retry-After)
+    seed: Optional[int] = None
+    counters: Dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _rnd: random.Random = field(default_factory=random.Random, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.seed is not None:
+            self._rnd.seed(self.seed)
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def draw(self) -> float:
+        with self._lock:
+            return self._rnd.random()
+
+    def delay(self) -> float:
+        with self._lock:
+            d = self.latency + (self._rnd.uniform(0, self.jitter) if self.jitter else 0.0)
+            if self.slow_rate and self._rnd.random() < self.slow_rate:
+                d += self.slow_sec
+        return d
+
+def _send_json(h: BaseHTTPRequestHandler, code: int, body: dict, headers: Optional[dict] = None) -> None:
+    raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+    h.send_response(code)
+    h.send_header("Content-Type", "application/json")
+    h.send_header("Content-Length", str(len(raw)))
+    for k, v in (headers or {}).items():
+        h.send_header(k, v)
+    h.end_headers()
+    h.wfile.write(raw)
+
+def respond(h: BaseHTTPRequestHandler, payload: dict, cfg: StandinConfig) -> None:
+    """chat.completions 요청 하나에 응답 (stream 지원)."""
+    cfg.count("llm")
+    r = cfg.draw()
+    if r < cfg.rate_limit_rate:
+        cfg.count("llm_429")
+        return _send_json(h, 429, {"error": {"message": "rate limited (stand-in)", "type": "rate_limit"}},
+                          {"Retry-After": "0.2"})
+    if r < cfg.rate_limit_rate + cfg.error_rate:
+        cfg.count("llm_500")
+        return _send_json(h, 500, {"error": {"message": "internal error (stand-in)", "type": "server_error"}})
+
+    model = payload.get("model", "fake")
+    delay = cfg.delay()
+    if payload.get("stream"):
+        h.send_response(200)
+        h.send_header("Content-Type", "text/event-stream")
+        h.send_header("Connection", "close")
+        h.end_headers()
+        step = delay / max(1, len(ANSWER) // 4)
+        for i in range(0, len(ANSWER), 4):
+            time.sleep(step)
+            chunk = {
+                "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": ANSWER[i:i + 4]}, "finish_reason": None}],
+            }
+            h.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            h.wfile.flush()
+        h.wfile.write(b"data: [DONE]\n\n")
+        h.close_connection = True
+        return
+    time.sleep(delay)
+    _send_json(h, 200, {
+        "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": ANSWER}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    })
+
+class LLMStandin:
+    """with LLMStandin(StandinConfig(latency=0.3)) as srv: srv.base_url  (→ OPENAI_BASE_URL)"""
+    def __init__(self, cfg: Optional[StandinConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.cfg = cfg or StandinConfig()
+        cfg_ = self.cfg
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                n = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(n) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    return _send_json(self, 404, {"error": {"message": "not found"}})
+                respond(self, payload, cfg_)
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self.base_url = f"http://{host}:{self._httpd.server_address[1]}/v1"
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "LLMStandin":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True, name="llm-standin")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "LLMStandin":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+def parse_faults(spec: str) -> dict:
+    """'slow_rate=0.05,slow_sec=5,error_rate=0.02' → StandinConfig kwargs"""
+    out = {}
+    for kv in (spec or "").split(","):
+        if "=" in kv:
+            k, v = kv.split("=", 1)
+            out[k.strip()] = float(v)
+    return out
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="OpenAI 호환 LLM 스탠드인 서버")
+    ap.add_argument("--port", type=int, default=8766)
+    ap.add_argument("--latency", type=float, default=0.3)
+    ap.add_argument("--jitter", type=float, default=0.1)
+    ap.add_argument("--slow-rate", type=float, default=0.0)
+    ap.add_argument("--slow-sec", type=float, default=5.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--rate-limit-rate", type=float, default=0.0)
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args()
+    srv = LLMStandin(StandinConfig(
+        latency=args.latency, jitter=args.jitter, slow_rate=args.slow_rate, slow_sec=args.slow_sec,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed,
+    ), port=args.port).start()
+    print(f"[llm-standin] OPENAI_BASE_URL={srv.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        srv.stop()
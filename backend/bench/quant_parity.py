@@ -0,0 +1,109 @@
+# backend/bench/quant_parity.py
+"""양자화(int8) / ONNX 임베딩 백엔드의 fp32 대비 정합성 + 처리량 비교.
+
+픽스처 코퍼스(기본: fixture_server의 합성 한국어 기사, 또는 --fixtures 디렉터리)를
+청크로 나눠 torch(fp32)와 대상 백엔드로 각각 임베딩하고,
+청크별 코사인 유사도(드리프트)와 top-k 검색 결과 일치율, 초당 청크 수를 출력한다.
+
+    cd backend
+    FORCE_CPU=1 python -m bench.quant_parity --backends int8,onnx
+    python -m bench.quant_parity --backends int8 --min-cosine 0.98   # 기준 미달 시 종료코드 1
+"""
+from __future__ import annotations
+import argparse
+import json
+import re
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .fixture_server import Fixtures
+
+_TAG = re.compile(r"<[^>]+>")
+
+def _corpus(fixtures: Optional[str], n_articles: int) -> List[str]:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    # rag.textsplitter 와 같은 설정 (rag import 시 Chroma/OpenAI까지 올라오므로 직접 생성)
+    textsplitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=120)
+    fx = Fixtures(fixtures, n_articles=n_articles)
+    texts: List[str] = []
+    for _title, html in fx.articles.values():
+        body = _TAG.sub(" ", html)
+        texts.extend(c for c in textsplitter.split_text(body) if c.strip())
+    return texts
+
+def _embed(backend: str, texts: List[str], model: Optional[str], repeat: int) -> Dict:
+    from app.embeddings import get_embeddings
+    t0 = time.perf_counter()
+    emb = get_embeddings(model, backend=backend)
+    emb.embed_query("warmup")
+    load_sec = time.perf_counter() - t0
+
+    best = float("inf")
+    vecs: List[List[float]] = []
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        vecs = emb.embed_documents(texts)
+        best = min(best, time.perf_counter() - t0)
+    m = np.asarray(vecs, dtype=np.float32)
+    m /= np.maximum(np.linalg.norm(m, axis=1, keepdims=True), 1e-12)
+    return {"vecs": m, "load_sec": load_sec, "embed_sec": best}
+
+def _topk_overlap(ref: np.ndarray, cand: np.ndarray, queries: np.ndarray, k: int) -> float:
+    """같은 질의 벡터로 두 인덱스를 검색했을 때 top-k 집합 겹침 비율 평균."""
+    k = min(k, ref.shape[0])
+    ra = np.argsort(-(queries @ ref.T), axis=1)[:, :k]
+    ca = np.argsort(-(queries @ cand.T), axis=1)[:, :k]
+    return float(np.mean([len(set(a) & set(b)) / k for a, b in zip(ra, ca)]))
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="양자화 임베딩 정합성/처리량 비교")
+    ap.add_argument("--backends", default="int8", help="비교 대상 (int8,onnx)")
+    ap.add_argument("--embed-model", default=None)
+    ap.add_argument("--fixtures", default=None, help="articles/*.html 디렉터리")
+    ap.add_argument("--articles", type=int, default=40)
+    ap.add_argument("--repeat", type=int, default=3, help="처리량 측정 반복(최솟값 사용)")
+    ap.add_argument("-k", type=int, default=5)
+    ap.add_argument("--min-cosine", type=float, default=None, help="평균 코사인이 이보다 낮으면 실패")
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args(argv)
+
+    texts = _corpus(args.fixtures, args.articles)
+    print(f"[parity] corpus chunks={len(texts)}")
+    ref = _embed("torch", texts, args.embed_model, args.repeat)
+    # 질의 = 코퍼스 앞부분 청크 (fp32 기준 벡터)
+    queries = ref["vecs"][: min(32, len(texts))]
+
+    report: Dict[str, Dict] = {
+        "torch": {
+            "load_sec": round(ref["load_sec"], 3),
+            "chunks_per_sec": round(len(texts) / ref["embed_sec"], 1),
+        }
+    }
+    failed = False
+    for backend in [b.strip().lower() for b in args.backends.split(",") if b.strip()]:
+        res = _embed(backend, texts, args.embed_model, args.repeat)
+        cos = np.sum(ref["vecs"] * res["vecs"], axis=1)
+        row = {
+            "load_sec": round(res["load_sec"], 3),
+            "chunks_per_sec": round(len(texts) / res["embed_sec"], 1),
+            "speedup": round(ref["embed_sec"] / res["embed_sec"], 2),
+            "cosine_mean": round(float(cos.mean()), 5),
+            "cosine_min": round(float(cos.min()), 5),
+            "cosine_p5": round(float(np.percentile(cos, 5)), 5),
+            f"top{args.k}_overlap": round(_topk_overlap(ref["vecs"], res["vecs"], queries, args.k), 4),
+        }
+        report[backend] = row
+        if args.min_cosine is not None and row["cosine_mean"] < args.min_cosine:
+            failed = True
+
+    for name, row in report.items():
+        print(f"{name:>6}  " + "  ".join(f"{k}={v}" for k, v in row.items()))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"chunks": len(texts), "results": report}, f, ensure_ascii=False, indent=2)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
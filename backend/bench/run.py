@@ -0,0 +1,331 @@
+# backend/bench/run.py
+"""Live-RAG 파이프라인 오프라인 벤치마크.
+
+Google News / 언론사 / OpenAI 대신 로컬 픽스처 서버(fixture_server.py)를 띄우고
+/query 경로(answer_with_live_async, 기본) 또는 동기 answer_with_live(--path sync)를
+시나리오별로 돌려 단계별 p50/p95/p99를 JSON으로 남긴다.
+
+    cd backend
+    python -m bench.run                                  # 기본 시나리오 전부
+    python -m bench.run --scenarios cold,warm -n 20
+    python -m bench.run --compare bench/results/base.json --fail-on-regression 0.2
+    python -m bench.run --path sync                      # /query/stream 쪽 동기 파이프라인
+
+시나리오
+    cold           : 매번 새 대화 + 캐시/원장 비활성 → 검색→추출→분할→임베딩→저장→LLM 전체
+    warm           : 같은 대화에 반복 질의 → 검색 + LLM (답변 캐시는 --answer-cache 로만)
+    conversations  : 대화 N개가 같은 주제로 한 번씩 → 원장 재사용/핸들 캐시 경로
+    concurrent     : 스레드 C개가 공용 컬렉션에 동시 질의
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from .fixture_server import Fixtures, FixtureServer
+from .llm_standin import StandinConfig, parse_faults
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+ALL_SCENARIOS = ("cold", "warm", "conversations", "concurrent")
+
+# -----------------------------
+# 단계별 타이머 (모듈 함수 감싸기)
+# -----------------------------
+class StageTimer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = {}
+        self._undo: List[Callable[[], None]] = []
+
+    def add(self, stage: str, sec: float) -> None:
+        with self._lock:
+            self.samples.setdefault(stage, []).append(sec)
+
+    def wrap(self, owner, attr: str, stage: str) -> None:
+        orig = getattr(owner, attr)
+
+        if inspect.iscoroutinefunction(orig):
+            async def timed(*a, **kw):
+                t0 = time.perf_counter()
+                try:
+                    return await orig(*a, **kw)
+                finally:
+                    self.add(stage, time.perf_counter() - t0)
+        else:
+            def timed(*a, **kw):
+                t0 = time.perf_counter()
+                try:
+                    return orig(*a, **kw)
+                finally:
+                    self.add(stage, time.perf_counter() - t0)
+
+        setattr(owner, attr, timed)
+        self._undo.append(lambda: setattr(owner, attr, orig))
+
+    def reset(self) -> None:
+        with self._lock:
+            self.samples = {}
+
+    def restore(self) -> None:
+        while self._undo:
+            self._undo.pop()()
+
+def _pct(xs: List[float], p: float) -> float:
+    if not xs:
+        return 0.0
+    s = sorted(xs)
+    i = min(len(s) - 1, max(0, int(round(p / 100.0 * (len(s) - 1)))))
+    return s[i]
+
+def summarize(xs: List[float]) -> dict:
+    return {
+        "count": len(xs),
+        "mean": round(statistics.fmean(xs), 6) if xs else 0.0,
+        "p50": round(_pct(xs, 50), 6),
+        "p95": round(_pct(xs, 95), 6),
+        "p99": round(_pct(xs, 99), 6),
+        "max": round(max(xs), 6) if xs else 0.0,
+    }
+
+# -----------------------------
+# 환경 구성: import 전에 ENV를 로컬 스탠드인으로
+# -----------------------------
+def _configure_env(base_url: str, workdir: str, args) -> None:
+    os.environ.update({
+        "GN_RSS_URL": f"{base_url}/rss/search",
+        "OPENAI_BASE_URL": f"{base_url}/v1",
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "bench-key"),
+        "CHROMA_DIR": os.path.join(workdir, "vectorstore"),
+        "FINNEWS_DB": os.path.join(workdir, "finnews.db"),
+        "EXTRACT_CACHE_PATH": os.path.join(workdir, "extract_cache.db"),
+        "MAX_LINKS_PER_QUERY": str(args.max_links),
+        "WATCHLIST_ENABLED": "0",
+        "EMBED_WARMUP": "0",
+    })
+    if args.embed_model:
+        os.environ["EMBED_MODEL"] = args.embed_model
+    if args.vs_backend:
+        os.environ["VS_BACKEND"] = args.vs_backend
+
+def _instrument(timer: StageTimer, path: str) -> None:
+    from app import crawler_google, rag, rag_async
+    timer.wrap(crawler_google.NaverNewsCrawler, "extract_via_selenium", "selenium")
+    timer.wrap(rag, "_store_article", "store")
+    timer.wrap(rag, "_retrieve", "retrieval")
+    if path == "async":
+        timer.wrap(rag_async, "_search_links", "search")
+        timer.wrap(rag_async, "_extract", "extract")
+        timer.wrap(rag_async, "_fetch_and_store_async", "crawl")
+    else:
+        timer.wrap(crawler_google.NaverNewsCrawler, "search_links", "search")
+        timer.wrap(crawler_google.NaverNewsCrawler, "extract_article_text", "extract")
+        timer.wrap(rag, "_fetch_and_store", "crawl")
+    try:
+        from openai.resources.chat.completions import AsyncCompletions, Completions
+        timer.wrap(AsyncCompletions if path == "async" else Completions, "create", "llm")
+    except Exception:
+        pass
+
+def _set_caches(enabled: bool, answer_cache_enabled: bool) -> None:
+    from app import answer_cache, extract_cache, ledger
+    extract_cache.EXTRACT_CACHE_ENABLED = enabled
+    ledger.LEDGER_ENABLED = enabled
+    answer_cache.ANSWER_CACHE_ENABLED = answer_cache_enabled
+
+# -----------------------------
+# 시나리오
+# -----------------------------
+class _Loop:
+    """비동기 경로용 상주 이벤트 루프 (서버처럼 httpx/LLM 클라이언트를 요청 간 공유)."""
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._t = threading.Thread(target=self.loop.run_forever, daemon=True, name="bench-loop")
+        self._t.start()
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def close(self) -> None:
+        from app.rag_async import aclose
+        try:
+            self.run(aclose())
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._t.join(timeout=5)
+
+_LOOP: Optional[_Loop] = None
+_PATH = "async"
+
+def _ask(question: str, conversation_id: Optional[str], fast: bool = False) -> float:
+    t0 = time.perf_counter()
+    if _PATH == "async":
+        from app.rag_async import answer_with_live_async
+        _LOOP.run(answer_with_live_async(question, k=4, fast=fast, conversation_id=conversation_id))
+    else:
+        from app.rag import answer_with_live
+        answer_with_live(question, k=4, fast=fast, conversation_id=conversation_id)
+    return time.perf_counter() - t0
+
+def run_scenario(name: str, args, timer: StageTimer, server: FixtureServer) -> dict:
+    timer.reset()
+    server.counters.clear()
+    totals: List[float] = []
+    run_id = f"{name}-{int(time.time() * 1000)}"
+
+    if name == "cold":
+        _set_caches(False, False)
+        for i in range(args.n):
+            totals.append(_ask(f"반도체 실적 전망 {i}", f"{run_id}-{i}"))
+    elif name == "warm":
+        _set_caches(True, args.answer_cache)
+        conv = f"{run_id}-w"
+        _ask("반도체 실적 전망", conv)  # 데우기(집계 제외)
+        timer.reset()
+        for _ in range(args.n):
+            totals.append(_ask("반도체 실적 전망", conv))
+    elif name == "conversations":
+        _set_caches(True, args.answer_cache)
+        for i in range(args.conversations):
+            totals.append(_ask("코스피 외국인 순매수", f"{run_id}-{i}"))
+    elif name == "concurrent":
+        _set_caches(True, args.answer_cache)
+        _ask("금리 환율 전망", None)
+        timer.reset()
+        qs = [f"금리 환율 전망 {i % 5}" for i in range(args.n * args.clients)]
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as ex:
+            totals = list(ex.map(lambda q: _ask(q, None, fast=True), qs))
+        wall = time.perf_counter() - t0
+    else:
+        raise ValueError(f"unknown scenario: {name}")
+
+    out = {
+        "total": summarize(totals),
+        "stages": {k: summarize(v) for k, v in sorted(timer.samples.items())},
+        "server": dict(server.counters),
+    }
+    if name == "concurrent":
+        out["throughput_qps"] = round(len(totals) / wall, 3) if wall > 0 else 0.0
+        out["clients"] = args.clients
+    return out
+
+# -----------------------------
+# 비교
+# -----------------------------
+def compare(base: dict, cur: dict, threshold: float) -> List[str]:
+    regressions: List[str] = []
+    print(f"{'scenario/stage':40s} {'base p50':>10s} {'cur p50':>10s} {'base p95':>10s} {'cur p95':>10s}  Δp95")
+    for sc, cur_sc in cur.get("scenarios", {}).items():
+        base_sc = base.get("scenarios", {}).get(sc)
+        if not base_sc:
+            continue
+        rows = [("total", base_sc["total"], cur_sc["total"])]
+        rows += [
+            (st, base_sc["stages"][st], cur_sc["stages"][st])
+            for st in cur_sc["stages"] if st in base_sc.get("stages", {})
+        ]
+        for st, b, c in rows:
+            delta = (c["p95"] - b["p95"]) / b["p95"] if b["p95"] else 0.0
+            flag = "  <-- regression" if delta > threshold else ""
+            print(f"{sc + '/' + st:40s} {b['p50']:10.4f} {c['p50']:10.4f} {b['p95']:10.4f} {c['p95']:10.4f}  {delta:+.1%}{flag}")
+            if flag:
+                regressions.append(f"{sc}/{st}")
+    return regressions
+
+def _git_rev() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return ""
+
+def _max_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(kb / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Live-RAG 오프라인 벤치마크")
+    ap.add_argument("--scenarios", default=",".join(ALL_SCENARIOS))
+    ap.add_argument("-n", type=int, default=10, help="시나리오별 반복 횟수")
+    ap.add_argument("--conversations", type=int, default=20)
+    ap.add_argument("--clients", type=int, default=8)
+    ap.add_argument("--max-links", type=int, default=4)
+    ap.add_argument("--articles", type=int, default=20)
+    ap.add_argument("--fixtures", default=None, help="녹화된 rss.xml / articles/*.html 디렉터리")
+    ap.add_argument("--latency", default="", help="예: article=0.2,llm=0.5,rss=0.1")
+    ap.add_argument("--embed-model", default=None)
+    ap.add_argument("--answer-cache", action="store_true")
+    ap.add_argument("--vs-backend", default=None, choices=("chroma", "flat"))
+    ap.add_argument("--path", default="async", choices=("async", "sync"),
+                    help="async: /query(answer_with_live_async), sync: answer_with_live")
+    ap.add_argument("--llm-faults", default="", help="예: slow_rate=0.05,slow_sec=5,error_rate=0.02")
+    ap.add_argument("--out", default=None)
+    ap.add_argument("--compare", default=None)
+    ap.add_argument("--fail-on-regression", type=float, default=None)
+    args = ap.parse_args(argv)
+
+    latency = {k: float(v) for k, v in (kv.split("=") for kv in args.latency.split(",") if kv)}
+    workdir = tempfile.mkdtemp(prefix="rag-bench-")
+    llm = StandinConfig(latency=latency.get("llm", 0.0), **parse_faults(args.llm_faults))
+    server = FixtureServer(Fixtures(args.fixtures, n_articles=args.articles), latency=latency, llm=llm).start()
+    _configure_env(server.base_url, workdir, args)
+
+    global _LOOP, _PATH
+    _PATH = args.path
+    timer = StageTimer()
+    _instrument(timer, args.path)
+    if args.path == "async":
+        _LOOP = _Loop()
+    result = {
+        "meta": {
+            "git": _git_rev(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "args": vars(args),
+            "workdir": workdir,
+        },
+        "scenarios": {},
+    }
+    try:
+        for name in [s.strip() for s in args.scenarios.split(",") if s.strip()]:
+            print(f"[bench] scenario={name}")
+            result["scenarios"][name] = run_scenario(name, args, timer, server)
+            tot = result["scenarios"][name]["total"]
+            print(f"[bench] {name}: p50={tot['p50']:.3f}s p95={tot['p95']:.3f}s p99={tot['p99']:.3f}s")
+        result["meta"]["max_rss_mb"] = _max_rss_mb()
+    finally:
+        if _LOOP is not None:
+            _LOOP.close()
+        timer.restore()
+        server.stop()
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out = args.out or os.path.join(RESULTS_DIR, f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"[bench] saved {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            base = json.load(f)
+        regressions = compare(base, result, args.fail_on_regression or 0.2)
+        if regressions and args.fail_on_regression is not None:
+            print(f"[bench] regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+# backend/tests/conftest.py
+import os
+import sys
+
+# `app` 패키지를 backend/ 기준으로 import (uvicorn app.main:app 과 같은 방식)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
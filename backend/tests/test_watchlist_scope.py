@@ -0,0 +1,72 @@
+# backend/tests/test_watchlist_scope.py
+"""워치리스트(conversation_id=None)로 적재된 청크가 대화 범위 질의에서도 검색되는지."""
+import hashlib
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("chromadb")
+pytest.importorskip("langchain_chroma")
+pytest.importorskip("langchain_text_splitters")
+pytest.importorskip("langchain_community")
+
+try:
+    from app import lexical, rag
+except ImportError as e:  # 크롤러/LLM 의존성이 없는 환경
+    pytest.skip(f"app.rag import failed: {e}", allow_module_level=True)
+
+class _HashEmbeddings:
+    """모델 다운로드 없이 결정적인 임베딩 (문자 bigram 해시 버킷)."""
+    dim = 64
+
+    def _vec(self, text: str):
+        v = [0.0] * self.dim
+        t = "".join(text.split())
+        for i in range(max(1, len(t) - 1)):
+            b = int(hashlib.md5(t[i:i + 2].encode("utf-8")).hexdigest(), 16) % self.dim
+            v[b] += 1.0
+        return v
+
+    def embed_documents(self, texts):
+        return [self._vec(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._vec(text)
+
+BODY = (
+    "삼성전자가 3분기 잠정 실적을 발표했다. 반도체 부문 영업이익이 시장 예상을 웃돌며 "
+    "메모리 가격 반등 효과가 본격적으로 나타났다는 분석이 나온다. " * 4
+)
+
+@pytest.fixture(params=["per_conversation", "shared"])
+def layout(request, tmp_path, monkeypatch):
+    monkeypatch.setattr(rag, "CHROMA_DIR", str(tmp_path / "vs"))
+    monkeypatch.setattr(rag, "SHARED_VS", request.param == "shared")
+    monkeypatch.setattr(rag, "VS_BACKEND", "chroma")
+    monkeypatch.setattr(rag, "RETRIEVE_GLOBAL", True)
+    monkeypatch.setattr(rag, "_embeddings", lambda: _HashEmbeddings())
+    monkeypatch.setattr(rag, "get_ledger", lambda: None)
+    monkeypatch.setattr(rag.neardup, "get_index", lambda: None)
+    monkeypatch.setattr(rag.analyzer, "ANALYZE_ON_INGEST", False)
+    rag._VS_CACHE.clear()
+    lexical.close_index()
+    yield request.param
+    rag._VS_CACHE.clear()
+    lexical.close_index()
+
+def test_watchlist_chunk_visible_from_conversation(layout):
+    url = "https://news.example.com/article/1"
+    with rag._vs_lease(None) as vs:
+        assert rag._store_article(vs, url, "삼성전자 실적", BODY, "삼성전자", conversation_id=None) > 0
+
+    docs = rag._retrieve("삼성전자 반도체 실적", 4, conversation_id="x")
+    assert url in {d.metadata.get("source") for d in docs}
+
+def test_global_scope_can_be_disabled(layout, monkeypatch):
+    monkeypatch.setattr(rag, "RETRIEVE_GLOBAL", False)
+    url = "https://news.example.com/article/2"
+    with rag._vs_lease(None) as vs:
+        rag._store_article(vs, url, "삼성전자 실적", BODY, "삼성전자", conversation_id=None)
+
+    docs = rag._retrieve("삼성전자 반도체 실적", 4, conversation_id="x")
+    assert url not in {d.metadata.get("source") for d in docs}